@@ -0,0 +1,250 @@
+"""
+End-to-end offload benchmark: scan, compare, copy+verify, hash, readback, render.
+
+    python -m benchmarks.bench_offload [--layout mixed] [--scale 0.25] [--repeat 3]
+                                       [--save baseline.json] [--baseline baseline.json]
+                                       [--preallocate off|file|batch]
+
+A synthetic card (see benchmarks/synthetic_card.py) is written to tmpfs
+(/dev/shm) when available, otherwise the system temp dir; pass --card to time a
+real card instead. Each phase is timed (best of --repeat) and reported as
+seconds, files/s, MB/s and peak RSS. --save writes the results as JSON, and
+--baseline compares against a saved run and exits 1 if any phase got slower
+than --tolerance.
+
+--cold asks the kernel to drop the card from the page cache before each
+reading phase (posix_fadvise DONTNEED; Linux, no root needed). Without it the
+copy/hash numbers are warm-cache numbers.
+
+--preallocate sets the engine's destination preallocation for copy_verify.
+"readback" hashes the copies on the destination, so fragmentation shows up
+there. Compare the two like this:
+
+    python -m benchmarks.bench_offload --workdir /mnt/raid --cold --preallocate off --save off.json
+    python -m benchmarks.bench_offload --workdir /mnt/raid --cold --preallocate file --baseline off.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from src.core.allocation import Preallocation
+from src.core.engine import TransferEngine
+from src.core.hashing import HashEngine
+from src.core.scanner import Scanner
+from src.model.list_model import FileListModel
+from src.model.sequence import SequenceObj
+from src.model.types import SyncStatus
+from src.ui.viewport import ViewportWindow
+from .synthetic_card import LAYOUTS, generate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+NOISE_FLOOR = 0.005  # Phases faster than this on both runs are never called a regression
+
+# --- HELPERS ---
+def peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+
+def units(files, dest=None):
+    """(path, size) of every physical file (sequences expanded to frames); with dest, of its copy"""
+    for f in files:
+        frames = [f.frame_file(i) for i in range(f.frame_count)] if isinstance(f, SequenceObj) else [f]
+        for frame in frames:
+            yield (os.path.join(dest, frame.dest_rel_path) if dest else frame.path), frame.size
+
+def drop_cache(paths):
+    if not hasattr(os, "posix_fadvise"): return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+def default_workdir():
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return tempfile.gettempdir()
+
+# --- PHASES ---
+def phase_scan(card, dest):
+    Scanner.scan_directory(card)
+
+def phase_compare(card, dest):
+    Scanner.compare_directories(Scanner.scan_directory(card), dest)
+
+PREALLOCATION = None  # --preallocate (None: the engine default / $LASTLOOK_PREALLOCATE)
+
+def phase_copy(card, dest):
+    shutil.rmtree(dest, ignore_errors=True)
+    os.makedirs(dest)
+    files = Scanner.compare_directories(Scanner.scan_directory(card), dest)
+    done = threading.Event()
+    engine = TransferEngine()
+    if PREALLOCATION: engine.preallocation = PREALLOCATION
+    engine.run_transfer(files, dest, lambda msg, f=None: None, done.set)
+    done.wait()
+    errors = [f.filename for f in files if f.status != SyncStatus.SYNCED]
+    if errors:
+        raise RuntimeError(f"copy left {len(errors)} entries unsynced (e.g. {errors[0]})")
+
+def phase_hash(card, dest):
+    for path, _ in units(Scanner.scan_directory(card)):
+        HashEngine.calculate_md5(path)
+
+def phase_readback(card, dest):
+    for path, _ in units(Scanner.scan_directory(card), dest):
+        HashEngine.calculate_md5(path)
+
+def phase_render(card, dest, viewport_px=600):
+    """Headless list binding: model load + a full top-to-bottom scroll, reading every row a slot would paint"""
+    files = Scanner.compare_directories(Scanner.scan_directory(card), dest)
+    model = FileListModel()
+    model.set_files(files, destination=dest)
+    window = ViewportWindow(row_height=32, overscan=4)
+    window.set_height(viewport_px)
+    window.set_count(model.row_count(FileListModel.SOURCE))
+    bound = set()
+    while True:
+        first, last = window.visible_range()
+        for i in range(first, last):
+            if i not in bound:
+                f = model[i]
+                _row = (f.filename, f.formatted_size, model.status_for(f, FileListModel.SOURCE),
+                        model.status_for(f, FileListModel.DEST))
+        bound = set(range(first, last))
+        if window.top >= window.max_top: break
+        window.scroll_by(window.row_height * 3)
+
+# (name, fn, reads file data?)
+PHASES = [
+    ("scan", phase_scan, False),
+    ("compare_empty", phase_compare, False),
+    ("copy_verify", phase_copy, True),
+    ("compare_synced", phase_compare, False),
+    ("hash", phase_hash, True),
+    ("readback", phase_readback, True),
+    ("render", phase_render, False),
+]
+
+def run(card, workdir, repeat=1, cold=False, expected=None):
+    """`expected`: generate()'s counts, so a card the scanner only partly reads fails loudly"""
+    dest = os.path.join(workdir, "dest")
+    empty = os.path.join(workdir, "empty")
+    os.makedirs(empty, exist_ok=True)
+
+    scanned = Scanner.scan_directory(card)
+    paths = [p for p, _ in units(scanned)]
+    copies = [p for p, _ in units(scanned, dest)]
+    total_files = len(paths)
+    total_bytes = sum(s for _, s in units(scanned))
+    if expected and (total_files, total_bytes) != (expected["files"], expected["bytes"]):
+        raise RuntimeError(f"scan found {total_files:,} files / {total_bytes / MB:,.0f} MB of the "
+                           f"{expected['files']:,} files / {expected['bytes'] / MB:,.0f} MB generated; "
+                           f"the timings would not cover the card")
+
+    results = {}
+    for name, fn, reads_data in PHASES:
+        target = empty if name == "compare_empty" else dest
+        best = None
+        for _ in range(max(1, repeat)):
+            if cold and reads_data: drop_cache(copies if name == "readback" else paths)
+            start = time.perf_counter()
+            fn(card, target)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        # MB/s is card bytes per second (copy_verify also re-reads both sides for MD5)
+        data = total_bytes if reads_data else 0
+        results[name] = {
+            "seconds": round(best, 4),
+            "files_per_s": round(total_files / best, 1) if best else None,
+            "mb_per_s": round(data / MB / best, 1) if data and best else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        print(f"  {name:<15} {best:9.3f} s  {results[name]['files_per_s'] or 0:>11,.0f} files/s  "
+              f"{results[name]['mb_per_s'] or 0:>8,.1f} MB/s  rss {results[name]['peak_rss_mb']} MB")
+    return {"files": total_files, "entries": len(scanned), "bytes": total_bytes, "phases": results}
+
+def compare_baseline(current, baseline, tolerance):
+    """Returns the phases that got slower than the tolerance allows"""
+    regressions = []
+    for name, now in current["phases"].items():
+        then = baseline.get("phases", {}).get(name)
+        if not then or not then.get("seconds"): continue
+        ratio = now["seconds"] / then["seconds"]
+        verdict = "SLOWER" if ratio > 1 + tolerance else ("faster" if ratio < 1 - tolerance else "same")
+        if max(now["seconds"], then["seconds"]) < NOISE_FLOOR: verdict = "same"
+        print(f"  {name:<15} {then['seconds']:9.3f} s -> {now['seconds']:9.3f} s  ({ratio:5.2f}x)  {verdict}")
+        if verdict == "SLOWER": regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--card", help="Benchmark an existing folder instead of generating one")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="mixed")
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--workdir", default=None, help="Where the card/dest go (default: tmpfs if available)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the generated card")
+    parser.add_argument("--save", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against a saved results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--preallocate", choices=[p.value for p in Preallocation])
+    args = parser.parse_args()
+    global PREALLOCATION
+    PREALLOCATION = Preallocation(args.preallocate) if args.preallocate else None
+
+    workdir = tempfile.mkdtemp(prefix="lastlook_bench_", dir=args.workdir or default_workdir())
+    try:
+        card, info = args.card, None
+        if not card:
+            card = os.path.join(workdir, "card")
+            info = generate(card, args.layout, args.scale)
+            print(f"[card] {args.layout} x{args.scale}: {info['files']:,} files, "
+                  f"{info['bytes'] / MB:,.0f} MB in {info['seconds']:.1f} s ({workdir})")
+
+        result = run(card, workdir, args.repeat, args.cold, expected=info)
+        result.update({
+            "layout": None if args.card else args.layout,
+            "scale": None if args.card else args.scale,
+            "cold": args.cold,
+            "preallocate": args.preallocate,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            print(f"[saved] {args.save}")
+
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            print(f"[baseline] {args.baseline} (tolerance {args.tolerance:.0%})")
+            if compare_baseline(result, baseline, args.tolerance):
+                sys.exit(1)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Cold-start benchmark for the desktop app.
+
+    python -m benchmarks.bench_startup [--runs 5]
+
+Launches `main.py` with LASTLOOK_EXIT_AFTER_STARTUP=1 (the window closes itself
+on its first idle callback) and reports the median of the app's own
+"[startup]" timings (imports / window / interactive) plus the whole process
+wall time, which also includes interpreter start and teardown. Needs a display.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+LINE = re.compile(r"\[startup\] (.*)")
+PART = re.compile(r"(\w+) ([\d.]+) ms")
+
+def run_once(root):
+    env = dict(os.environ, LASTLOOK_EXIT_AFTER_STARTUP="1")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "main.py"], cwd=root, env=env,
+                          capture_output=True, text=True, timeout=60)
+    wall = (time.perf_counter() - start) * 1000
+    match = LINE.search(proc.stdout)
+    if not match:
+        raise RuntimeError(f"no [startup] line (exit {proc.returncode}): {proc.stderr.strip()[-300:]}")
+    timings = {k: float(v) for k, v in PART.findall(match.group(1))}
+    timings["process_wall"] = wall
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    runs = []
+    for i in range(args.runs):
+        try:
+            runs.append(run_once(root))
+        except Exception as e:
+            print(f"[startup] skipped ({e})")
+            return
+    for key in runs[0]:
+        values = [r[key] for r in runs if key in r]
+        print(f"  {key:<13} median {statistics.median(values):7.0f} ms   min {min(values):7.0f} ms")
+
+if __name__ == "__main__":
+    main()
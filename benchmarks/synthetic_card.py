@@ -0,0 +1,112 @@
+"""
+Synthetic camera cards for benchmarking.
+
+    python -m benchmarks.synthetic_card <dir> [--layout mixed] [--scale 1.0]
+
+Layouts:
+    stills     many small RAW-sized stills at the card root
+    clips      a few huge video clips
+    deep       folder-heavy: many small per-shot folders of TIFF frames, one level deep
+    sequences  DPX shots + CinemaDNG clip folders
+    mixed      all of the above
+
+File contents come from one random 1 MB block with a per-file salt in each
+chunk, so files are incompressible and no two files hash the same, and a
+multi-GB card can be written at disk speed.
+"""
+import argparse
+import os
+import time
+
+CHUNK = 1024 * 1024
+_BLOCK = os.urandom(CHUNK)
+
+# (count, size_bytes) per layout at scale 1.0
+LAYOUTS = {
+    "stills":    {"stills": (2000, 2 * 1024 * 1024)},
+    "clips":     {"clips": (4, 512 * 1024 * 1024)},
+    "deep":      {"deep": (1000, 256 * 1024)},   # Frames, DEEP_FRAMES_PER_FOLDER per shot folder
+    "sequences": {"dpx": (2, 480), "cdng": (2, 240)},
+}
+LAYOUTS["mixed"] = {k: v for layout in LAYOUTS.values() for k, v in layout.items()}
+
+DPX_FRAME = 12 * 1024 * 1024 // 4   # Scaled-down 4K DPX frame
+CDNG_FRAME = 6 * 1024 * 1024 // 4
+# The scanner reads the card root plus one folder level (clip / shot folders); deeper files are never offloaded
+DEEP_FRAMES_PER_FOLDER = 10
+
+def write_file(path: str, size: int, salt: int):
+    """Writes `size` incompressible bytes; the salt makes every file's hash unique."""
+    tag = salt.to_bytes(8, "little")
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            n = min(CHUNK, remaining)
+            f.write(tag + _BLOCK[8:n] if n > 8 else tag[:n])
+            remaining -= n
+
+def generate(root: str, layout: str = "mixed", scale: float = 1.0) -> dict:
+    """Builds the card under `root` and returns {"files": n, "bytes": total, "seconds": t}."""
+    spec = LAYOUTS[layout]
+    os.makedirs(root, exist_ok=True)
+    count_total = bytes_total = 0
+    salt = 0
+    start = time.perf_counter()
+
+    def emit(path, size):
+        nonlocal count_total, bytes_total, salt
+        salt += 1
+        write_file(path, size, salt)
+        count_total += 1
+        bytes_total += size
+
+    scaled = lambda n: max(1, int(n * scale))
+
+    if "stills" in spec:
+        count, size = spec["stills"]
+        for i in range(scaled(count)):
+            emit(os.path.join(root, f"DSC{i:05d}.ARW"), size)
+
+    if "clips" in spec:
+        count, size = spec["clips"]
+        for i in range(count):
+            emit(os.path.join(root, f"A001C{i + 1:03d}_250101.MP4"), scaled(size))
+
+    if "deep" in spec:
+        count, size = spec["deep"]
+        for i in range(scaled(count)):
+            shot = f"A{1 + i // 500:03d}_S{(i // DEEP_FRAMES_PER_FOLDER) % 50 + 1:03d}"
+            folder = os.path.join(root, shot)
+            os.makedirs(folder, exist_ok=True)
+            emit(os.path.join(folder, f"{shot}.{i % DEEP_FRAMES_PER_FOLDER:06d}.tif"), size)
+
+    if "dpx" in spec:
+        shots, frames = spec["dpx"]
+        for s in range(shots):
+            for frame in range(1001, 1001 + scaled(frames)):
+                emit(os.path.join(root, f"sh{(s + 1) * 10:03d}_plate.{frame:04d}.dpx"), DPX_FRAME)
+
+    if "cdng" in spec:
+        clips, frames = spec["cdng"]
+        for c in range(clips):
+            name = f"B001C{c + 1:03d}"
+            folder = os.path.join(root, name)
+            os.makedirs(folder, exist_ok=True)
+            for frame in range(scaled(frames)):
+                emit(os.path.join(folder, f"{name}_{frame:06d}.dng"), CDNG_FRAME)
+
+    return {"files": count_total, "bytes": bytes_total, "seconds": time.perf_counter() - start}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("root")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="mixed")
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    info = generate(args.root, args.layout, args.scale)
+    print(f"{args.layout}: {info['files']:,} files, {info['bytes'] / 1024 ** 2:,.0f} MB "
+          f"in {info['seconds']:.1f} s -> {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Headless entry point (no GUI):
+
+    python -m lastlook --help
+
+The desktop app is still started with `python main.py`.
+"""
+import sys
+from src.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
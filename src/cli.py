@@ -0,0 +1,239 @@
+"""
+Headless LastLook: the core engines without Tk.
+
+    python -m lastlook scan    <source>
+    python -m lastlook compare <source> [dest] [--manifest PATH ...]
+    python -m lastlook copy    <source> <dest> [--prometheus PATH] [--durability POLICY] [--limit MB/S]
+    python -m lastlook verify  <source> <dest>
+
+Every line on stdout is one JSON event ("file", "status", "progress",
+"metrics", "verify", "catalog", "summary"). Diagnostics go to stderr. Exit
+code is 0 when everything matches, 1 on any missing file / mismatch / error,
+2 on bad usage.
+
+NOTE: This module must never import customtkinter or PIL (ingest scripts and
+SSH sessions start it hundreds of times; it has to be instant).
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Iterator, List
+from .core.durability import Durability
+from .core.engine import TransferEngine
+from .core.governor import GOVERNOR, MB
+from .core.hashing import HashEngine
+from .core.manifest import ManifestCatalog
+from .core.scanner import Scanner
+from .model.file_obj import FileObj
+from .model.sequence import SequenceObj
+from .model.types import SyncStatus
+
+EXIT_OK = 0
+EXIT_MISMATCH = 1
+EXIT_USAGE = 2
+
+PROGRESS_INTERVAL = 0.25  # Seconds between "progress" events during a copy
+
+class JsonLines:
+    """Writes one JSON object per line to the real stdout (core print() calls are sent to stderr)."""
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        line = json.dumps({"event": event, "time": round(time.time(), 3), **fields})
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def _describe(f: FileObj) -> dict:
+    info = {
+        "id": f.id,
+        "name": f.filename,
+        "rel_path": f.dest_rel_path,
+        "size": f.size,
+        "type": f.file_type.name.lower(),
+        "status": f.status.value,
+    }
+    if isinstance(f, SequenceObj):
+        info["frames"] = f.frame_count
+        info["range"] = [f.first_frame, f.last_frame]
+        info["gaps"] = f.gaps()
+        info["frames_synced"] = f.count_with_status(SyncStatus.SYNCED)
+    return info
+
+def _units(files: List[FileObj]) -> Iterator[FileObj]:
+    """Physical files: sequences expand to their frames"""
+    for f in files:
+        if isinstance(f, SequenceObj):
+            for i in range(f.frame_count):
+                yield f.frame_file(i)
+        else:
+            yield f
+
+def _status_summary(files: List[FileObj]) -> dict:
+    counts = Counter(f.status.value for f in files)
+    missing_bytes = sum(f.missing_size for f in files if f.status == SyncStatus.MISSING)
+    return {"entries": len(files), "bytes": sum(f.size for f in files),
+            "statuses": dict(counts), "missing_bytes": missing_bytes}
+
+def _check_dir(path: str, role: str):
+    if not os.path.isdir(path):
+        raise SystemExit(f"{role} is not a directory: {path}")
+
+# --- COMMANDS ---
+def cmd_scan(args, out: JsonLines) -> int:
+    _check_dir(args.source, "Source")
+    start = time.perf_counter()
+    files = Scanner.scan_directory(args.source)
+    for f in files:
+        out.emit("file", **_describe(f))
+    out.emit("summary", command="scan", seconds=round(time.perf_counter() - start, 4),
+             entries=len(files), bytes=sum(f.size for f in files))
+    return EXIT_OK
+
+def cmd_compare(args, out: JsonLines) -> int:
+    _check_dir(args.source, "Source")
+    if not args.dest and not args.manifest:
+        raise SystemExit("compare needs a destination, one or more --manifest, or both")
+    start = time.perf_counter()
+    catalog = None
+    if args.manifest:
+        catalog = ManifestCatalog.load(args.manifest)
+        out.emit("catalog", manifests=len(catalog.manifests), entries=len(catalog),
+                 seconds=round(time.perf_counter() - start, 4))
+    files = Scanner.compare_directories(Scanner.scan_directory(args.source), args.dest, catalog)
+    for f in files:
+        out.emit("file", **_describe(f))
+    summary = _status_summary(files)
+    out.emit("summary", command="compare", seconds=round(time.perf_counter() - start, 4), **summary)
+    return EXIT_OK if summary["statuses"].get(SyncStatus.SYNCED.value, 0) == len(files) else EXIT_MISMATCH
+
+def cmd_copy(args, out: JsonLines) -> int:
+    _check_dir(args.source, "Source")
+    os.makedirs(args.dest, exist_ok=True)
+    files = Scanner.compare_directories(Scanner.scan_directory(args.source), args.dest)
+    todo = [f for f in files if f.status == SyncStatus.MISSING]
+    out.emit("plan", entries=len(todo), bytes=sum(f.size for f in todo), already_synced=len(files) - len(todo))
+
+    if todo:
+        done = threading.Event()
+        last_status = {}
+        last_progress = [0.0]
+
+        def on_progress(msg, file_obj=None):
+            # Runs on the engine thread. Status changes always go out; chatter is throttled.
+            if file_obj is not None and last_status.get(file_obj.id) != file_obj.status:
+                last_status[file_obj.id] = file_obj.status
+                out.emit("status", id=file_obj.id, name=file_obj.filename, status=file_obj.status.value)
+            now = time.monotonic()
+            if now - last_progress[0] >= PROGRESS_INTERVAL:
+                last_progress[0] = now
+                out.emit("progress", message=msg)
+
+        engine = TransferEngine()
+        if args.prometheus:
+            engine.prometheus_path = args.prometheus
+        if args.durability:
+            engine.durability = Durability(args.durability)
+        if args.limit:
+            GOVERNOR.set_transfer_cap(args.limit * MB)
+        start = time.perf_counter()
+        engine.run_transfer(todo, args.dest, on_progress, done.set)
+        done.wait()
+        elapsed = time.perf_counter() - start
+        copied = sum(f.size for f in todo)
+        out.emit("transfer", seconds=round(elapsed, 4), bytes=copied,
+                 mb_per_s=round(copied / elapsed / (1024 * 1024), 2) if elapsed > 0 else None)
+        if engine.last_metrics:
+            out.emit("metrics", **engine.last_metrics.summary())
+
+    # Trust the disk, not the engine's bookkeeping
+    final = Scanner.compare_directories(Scanner.scan_directory(args.source), args.dest)
+    summary = _status_summary(final)
+    errors = sum(1 for f in todo if f.status == SyncStatus.ERROR)
+    out.emit("summary", command="copy", errors=errors, **summary)
+    all_synced = summary["statuses"].get(SyncStatus.SYNCED.value, 0) == len(final)
+    return EXIT_OK if all_synced and not errors else EXIT_MISMATCH
+
+def cmd_verify(args, out: JsonLines) -> int:
+    _check_dir(args.source, "Source")
+    _check_dir(args.dest, "Destination")
+    start = time.perf_counter()
+    counts = Counter()
+    total_bytes = 0
+
+    for unit in _units(Scanner.scan_directory(args.source)):
+        dest_path = os.path.join(args.dest, unit.dest_rel_path)
+        if not os.path.isfile(dest_path):
+            result, src_hash, dst_hash = "missing", None, None
+        elif os.path.getsize(dest_path) != unit.size:
+            result, src_hash, dst_hash = "size_mismatch", None, None
+        else:
+            src_hash = HashEngine.calculate_md5(unit.path)
+            dst_hash = HashEngine.calculate_md5(dest_path)
+            result = "ok" if src_hash and src_hash == dst_hash else "hash_mismatch"
+            total_bytes += unit.size
+        counts[result] += 1
+        out.emit("verify", rel_path=unit.dest_rel_path, size=unit.size, result=result,
+                 source_md5=src_hash, dest_md5=dst_hash)
+
+    elapsed = time.perf_counter() - start
+    out.emit("summary", command="verify", seconds=round(elapsed, 4), files=sum(counts.values()),
+             results=dict(counts), hashed_bytes=total_bytes,
+             mb_per_s=round(total_bytes * 2 / elapsed / (1024 * 1024), 2) if elapsed > 0 else None)
+    return EXIT_OK if set(counts) <= {"ok"} else EXIT_MISMATCH
+
+# --- ENTRY ---
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="lastlook", description="LastLook headless offload tools (JSON-lines output).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scan", help="List the source (sequences collapsed)")
+    p.add_argument("source")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("compare", help="Name + size comparison; exit 1 if anything is missing")
+    p.add_argument("source")
+    p.add_argument("dest", nargs="?")
+    p.add_argument("--manifest", action="append", metavar="PATH",
+                   help="Prior LastLook manifest (or a folder of them) counted as already copied; repeatable. "
+                        "With no dest, the drive is never read")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("copy", help="Copy + MD5-verify everything missing from dest; exit 1 on any error")
+    p.add_argument("source")
+    p.add_argument("dest")
+    p.add_argument("--prometheus", metavar="PATH",
+                   help="Also write per-phase metrics as a node-exporter textfile (.prom)")
+    p.add_argument("--limit", type=float, metavar="MB/S",
+                   help="Cap the copy bandwidth (default: none, or $LASTLOOK_TRANSFER_CAP_MBPS)")
+    p.add_argument("--durability", choices=[d.value for d in Durability],
+                   help="When copies are fsynced before counting as verified (default: batch, or $LASTLOOK_DURABILITY)")
+    p.set_defaults(func=cmd_copy)
+
+    p = sub.add_parser("verify", help="Full MD5 of every source file against dest; exit 1 on any mismatch")
+    p.add_argument("source")
+    p.add_argument("dest")
+    p.set_defaults(func=cmd_verify)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    out = JsonLines(sys.stdout)
+    try:
+        # Core modules report problems with print(): keep stdout pure JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.func(args, out)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            print(e.code, file=sys.stderr)
+            return EXIT_USAGE
+        raise
+    except KeyboardInterrupt:
+        return 130
@@ -0,0 +1,110 @@
+import errno
+import os
+import shutil
+import struct
+import sys
+from enum import Enum
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+class Preallocation(Enum):
+    OFF = "off"      # Let the file grow chunk by chunk (old behaviour)
+    FILE = "file"    # Reserve each destination file at its final size before the first write
+    BATCH = "batch"  # FILE, plus refuse to start a job that cannot fit on the destination
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Preallocation":
+        if not value: return DEFAULT_PREALLOCATION
+        try:
+            return cls(value.strip().lower())
+        except ValueError:
+            print(f"Unknown preallocation mode '{value}', using '{DEFAULT_PREALLOCATION.value}'")
+            return DEFAULT_PREALLOCATION
+
+DEFAULT_PREALLOCATION = Preallocation.FILE
+
+# Errors that mean "there is no room", as opposed to "this filesystem cannot preallocate"
+NO_SPACE = {errno.ENOSPC, errno.EDQUOT, errno.EFBIG}
+
+# Linux fallocate(2): reserve blocks without changing st_size, so an interrupted copy never
+# looks complete to the name+size compare
+FALLOC_FL_KEEP_SIZE = 0x01
+
+# macOS fcntl(F_PREALLOCATE) with an fstore_t
+F_PREALLOCATE = 42
+F_ALLOCATECONTIG = 0x2
+F_ALLOCATEALL = 0x4
+F_PEOFPOSMODE = 3
+
+class InsufficientSpaceError(OSError):
+    """The destination cannot hold the file (or the job) being copied"""
+
+def _format_bytes(n: int) -> str:
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if n < 1024: return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} PB"
+
+_linux_fallocate = None
+
+def _fallocate_linux(fd: int, size: int) -> bool:
+    global _linux_fallocate
+    import ctypes
+    if _linux_fallocate is None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        _linux_fallocate = libc.fallocate
+        _linux_fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    # Direct syscall: glibc's posix_fallocate silently falls back to writing zeros (exFAT, NFS)
+    if _linux_fallocate(fd, FALLOC_FL_KEEP_SIZE, 0, size) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in NO_SPACE: raise OSError(err, os.strerror(err))
+    return False  # EOPNOTSUPP etc.: the filesystem cannot do it, copy anyway
+
+def _fallocate_darwin(fd: int, size: int) -> bool:
+    # Try one contiguous extent first, then accept any extents
+    for flags in (F_ALLOCATECONTIG | F_ALLOCATEALL, F_ALLOCATEALL):
+        store = struct.pack("IiqqQ", flags, F_PEOFPOSMODE, 0, size, 0)
+        try:
+            fcntl.fcntl(fd, F_PREALLOCATE, store)
+            return True
+        except OSError as e:
+            if e.errno in NO_SPACE and flags == F_ALLOCATEALL: raise
+    return False
+
+def preallocate(fd: int, size: int) -> bool:
+    """
+    Reserves `size` bytes for an open, empty destination file.
+    True if space was reserved, False if this platform/filesystem cannot preallocate.
+    Raises OSError(ENOSPC/EDQUOT/EFBIG) when the space does not exist.
+    """
+    if size <= 0: return False
+    try:
+        if sys.platform.startswith("linux"):
+            return _fallocate_linux(fd, size)
+        if sys.platform == "darwin" and fcntl is not None:
+            return _fallocate_darwin(fd, size)
+        if hasattr(os, "posix_fallocate"):
+            # BSDs: extends st_size, so the engine truncates back if the copy is interrupted
+            os.posix_fallocate(fd, 0, size)
+            return True
+    except (AttributeError, OSError) as e:
+        if isinstance(e, OSError) and e.errno in NO_SPACE: raise
+        return False
+    return False
+
+def check_batch_space(dest_folder: str, nbytes: int):
+    """BATCH mode: raises InsufficientSpaceError before anything is written"""
+    free = shutil.disk_usage(dest_folder).free
+    if nbytes > free:
+        raise InsufficientSpaceError(errno.ENOSPC,
+                                     f"Not enough space on destination: job needs {_format_bytes(nbytes)}, "
+                                     f"{_format_bytes(free)} free")
+
+def space_error(file_name: str, size: int, error: OSError) -> InsufficientSpaceError:
+    return InsufficientSpaceError(error.errno,
+                                  f"Not enough space on destination for {file_name} ({_format_bytes(size)})")
@@ -0,0 +1,243 @@
+import os
+import shutil
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from .job_queue import JobQueue, JobState
+
+DEFAULT_BLOCK = 4096
+# Per copied file: text manifest line (~170 B) + JSON sidecar (~150 B) + metrics detail (~620 B)
+MANIFEST_BYTES_PER_FILE = 1024
+MANIFEST_FILES = 3  # Transfer_Log .txt + .json, Transfer_Metrics .json
+REFRESH_SECONDS = 2.0
+
+class Volume(NamedTuple):
+    path: str
+    device: Optional[int]
+    block_size: int               # Allocation unit (exFAT cluster, APFS/ext4 block)
+    free: int                     # Bytes available to this user
+    total: int
+    inodes_free: Optional[int]    # None: not reported (FAT/exFAT, Windows)
+
+class CapacityPlan(NamedTuple):
+    volume: Volume
+    required: int                 # On-disk bytes: block-rounded data + folders + manifests
+    inodes: int
+    reserved: int                 # Still to be written by running / queued jobs on this volume
+    reserved_inodes: int
+    jobs: int                     # How many jobs hold a reservation
+
+    @property
+    def available(self) -> int:
+        return max(0, self.volume.free - self.reserved)
+
+    @property
+    def shortfall(self) -> int:
+        return max(0, self.required - self.available)
+
+    @property
+    def out_of_inodes(self) -> bool:
+        if self.volume.inodes_free is None: return False
+        return self.inodes > self.volume.inodes_free - self.reserved_inodes
+
+    @property
+    def ok(self) -> bool:
+        return self.shortfall == 0 and not self.out_of_inodes
+
+def allocated_size(size: int, block_size: int) -> int:
+    """Bytes a file of `size` really takes: whole blocks (empty files take none)"""
+    return -(-size // block_size) * block_size
+
+def manifest_overhead(files: int, block_size: int) -> int:
+    return allocated_size(files * MANIFEST_BYTES_PER_FILE, block_size) + MANIFEST_FILES * block_size
+
+def probe(path: str) -> Optional[Volume]:
+    """One statvfs (or GetDiskFreeSpace) call. The nearest existing parent is used for new folders."""
+    target = os.path.abspath(path)
+    while not os.path.exists(target):
+        parent = os.path.dirname(target)
+        if parent == target: return None
+        target = parent
+    try:
+        device = JobQueue.device_of(target)
+        if hasattr(os, "statvfs"):
+            st = os.statvfs(target)
+            block = st.f_frsize or st.f_bsize or DEFAULT_BLOCK
+            # FAT/exFAT report no inode table (f_files == 0)
+            inodes = st.f_favail if st.f_files else None
+            return Volume(path, device, block, st.f_bavail * block, st.f_blocks * block, inodes)
+        total, _, free = shutil.disk_usage(target)
+        return Volume(path, device, _cluster_size(target), free, total, None)
+    except OSError as e:
+        print(f"Capacity probe failed for {path}: {e}")
+        return None
+
+def _cluster_size(path: str) -> int:
+    """Windows: sectors per cluster * bytes per sector"""
+    try:
+        import ctypes
+        sectors, sector_bytes = ctypes.c_ulong(), ctypes.c_ulong()
+        free_clusters, total_clusters = ctypes.c_ulong(), ctypes.c_ulong()
+        root = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+        if ctypes.windll.kernel32.GetDiskFreeSpaceW(ctypes.c_wchar_p(root), ctypes.byref(sectors),
+                                                    ctypes.byref(sector_bytes), ctypes.byref(free_clusters),
+                                                    ctypes.byref(total_clusters)):
+            return sectors.value * sector_bytes.value or DEFAULT_BLOCK
+    except (AttributeError, OSError, ValueError):
+        pass
+    return DEFAULT_BLOCK
+
+class CapacityPlanner:
+    """
+    Will the selection fit, given what else is about to be written?
+
+    Sizes are on-disk sizes: every file rounded up to the volume's allocation
+    unit (a 2 KB sidecar takes a whole 128 KB exFAT cluster), plus a block for
+    each clip folder and the manifest/metrics files the job leaves behind.
+    Volumes with an inode table are also checked for inodes.
+
+    Jobs in the JobQueue hold reservations. A queued (or paused) job reserves
+    its full footprint on every destination volume. A running job reserves what
+    its engine has not started yet, plus the unwritten rest of the file in
+    flight. That rest is dropped only when the engine reports the file was
+    preallocated (its blocks are then already missing from `free`).
+
+    A daemon thread re-probes the watched destinations every REFRESH_SECONDS
+    (one statvfs each, never a directory walk) and calls on_change() only
+    when the free space or the reservations moved. poke() refreshes now.
+    """
+
+    def __init__(self, job_queue=None, on_change: Optional[Callable[[], None]] = None,
+                 interval: float = REFRESH_SECONDS):
+        self.job_queue = job_queue
+        self.on_change = on_change
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._watched: List[str] = []
+        self._volumes: Dict[str, Volume] = {}
+        self._reserved: Dict[int, Tuple[int, int, int]] = {}   # device -> (bytes, inodes, jobs)
+        self._job_footprints: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    # --- PUBLIC ---
+    def watch(self, path: Optional[str]) -> Optional[Volume]:
+        """Makes `path` the destination to track (probed now, then in the background)"""
+        with self._lock:
+            self._watched = [path] if path else []
+        if not path: return None
+        volume = probe(path)
+        if volume:
+            with self._lock:
+                self._volumes[path] = volume
+        self._refresh_reservations()
+        self.poke()
+        return volume
+
+    def volume(self, path: str) -> Optional[Volume]:
+        with self._lock:
+            return self._volumes.get(path)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def poke(self):
+        self._wake.set()
+
+    def plan(self, path: str, required: int, inodes: int) -> Optional[CapacityPlan]:
+        """`required` / `inodes`: the data footprint to add (SelectionModel totals at this block size)"""
+        volume = self.volume(path)
+        if volume is None: return None
+        with self._lock:
+            reserved, reserved_inodes, jobs = self._reserved.get(volume.device, (0, 0, 0))
+        if inodes:
+            required += manifest_overhead(inodes, volume.block_size)
+            inodes += MANIFEST_FILES
+        return CapacityPlan(volume, required, inodes, reserved, reserved_inodes, jobs)
+
+    # --- BACKGROUND ---
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            changed = False
+            with self._lock:
+                watched = list(self._watched)
+            for path in watched:
+                volume = probe(path)
+                if volume is None: continue
+                with self._lock:
+                    previous = self._volumes.get(path)
+                    self._volumes[path] = volume
+                if previous is None or (previous.free, previous.inodes_free) != (volume.free, volume.inodes_free):
+                    changed = True
+            if self._refresh_reservations(): changed = True
+            if changed and self.on_change:
+                try:
+                    self.on_change()
+                except Exception as e:
+                    print(f"Capacity callback error: {e}")
+
+    def _refresh_reservations(self) -> bool:
+        """Recomputes device -> reservation from the job queue. True if anything moved."""
+        with self._lock:
+            volumes = {v.device: v for v in self._volumes.values() if v.device is not None}
+        reserved: Dict[int, Tuple[int, int, int]] = {}
+        live = set()
+        for job in (self.job_queue.jobs if self.job_queue else []):
+            if not job.is_active: continue  # Paused jobs keep their reservation: they still mean to run
+            live.add(job.id)
+            pending = job.destinations
+            if job.state == JobState.RUNNING and job.current_dest in job.destinations:
+                pending = job.destinations[job.destinations.index(job.current_dest):]
+            for dest in pending:
+                volume = volumes.get(JobQueue.device_of(dest))
+                if volume is None: continue
+                nbytes, inodes = self._job_footprint(job, volume.block_size)
+                frames = job.frames_total or inodes  # Files on disk (every frame), not list entries
+                files = frames
+                engine = job.engine
+                if dest == job.current_dest and engine is not None and engine.files_total:
+                    # Finished files are already on disk: keep only the rest (data + its share of rounding).
+                    # The engine counts frames, so the rounding slack is spread per frame too.
+                    files = engine.files_total - engine.files_started
+                    slack = max(0, nbytes - job.bytes_total) / max(1, frames)
+                    nbytes = (engine.bytes_total - engine.bytes_started) + int(slack * files)
+                    if not engine.current_reserved:
+                        # No preallocation (off, or refused by the filesystem): the file in flight still grows
+                        nbytes += max(0, engine.current_size - engine.current_written)
+                    inodes = files
+                nbytes += manifest_overhead(files, volume.block_size)
+                inodes += MANIFEST_FILES
+                b, i, n = reserved.get(volume.device, (0, 0, 0))
+                reserved[volume.device] = (b + nbytes, i + inodes, n + 1)
+        with self._lock:
+            changed = reserved != self._reserved
+            self._reserved = reserved
+            # Footprints of finished jobs are no longer needed
+            self._job_footprints = {k: v for k, v in self._job_footprints.items() if k[0] in live}
+        return changed
+
+    def _job_footprint(self, job, block_size: int) -> Tuple[int, int]:
+        """(on-disk bytes, inodes) of the job's files on one destination, cached per job"""
+        key = (job.id, block_size)
+        cached = self._job_footprints.get(key)
+        if cached is None:
+            files = job.files
+            if files is not None:
+                nbytes, inodes = 0, 0
+                for f in files:
+                    b, i = f.footprint(block_size)
+                    nbytes += b
+                    inodes += i
+            else:
+                # Restored after a restart: sizes only (one block of slack per frame, the worst case).
+                # Jobs saved before frames_total existed only know their entry count.
+                frames = job.frames_total or job.files_total
+                nbytes = job.bytes_total + frames * block_size
+                inodes = frames
+            cached = (nbytes, inodes)
+            with self._lock:
+                self._job_footprints[key] = cached
+        return cached
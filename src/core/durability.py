@@ -0,0 +1,192 @@
+import os
+import queue
+import sys
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+class Durability(Enum):
+    NONE = "none"    # Trust the page cache (fastest; pulling the drive can lose "verified" files)
+    FILE = "file"    # fsync every file before it is verified
+    BATCH = "batch"  # fsync on a background thread every BATCH_FILES files / BATCH_BYTES bytes
+    JOB = "job"      # One syncfs (or fsync pass) when the job ends
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Durability":
+        if not value: return DEFAULT_DURABILITY
+        try:
+            return cls(value.strip().lower())
+        except ValueError:
+            print(f"Unknown durability policy '{value}', using '{DEFAULT_DURABILITY.value}'")
+            return DEFAULT_DURABILITY
+
+DEFAULT_DURABILITY = Durability.BATCH
+BATCH_FILES = 64
+BATCH_BYTES = 256 * 1024 * 1024
+
+# --- PRIMITIVES ---
+def fsync_fd(fd: int):
+    """fsync, but on macOS ask the drive to empty its own write cache too (plain fsync does not)"""
+    if fcntl is not None and hasattr(fcntl, "F_FULLFSYNC"):
+        try:
+            fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+            return
+        except OSError:
+            pass  # Not supported by this filesystem (e.g. some network shares)
+    os.fsync(fd)
+
+def fsync_path(path: str):
+    # Windows only flushes handles opened for writing
+    flags = os.O_RDWR | getattr(os, "O_BINARY", 0) if os.name == "nt" else os.O_RDONLY
+    fd = os.open(path, flags)
+    try:
+        fsync_fd(fd)
+    finally:
+        os.close(fd)
+
+def fsync_dir(path: str):
+    """Makes new directory entries durable (POSIX). Windows has no directory handles to sync."""
+    if os.name == "nt": return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def syncfs(path: str) -> bool:
+    """Linux syncfs(2) on the filesystem holding `path`. False when unavailable (caller falls back)."""
+    if not sys.platform.startswith("linux"): return False
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        call = libc.syncfs
+    except (OSError, AttributeError):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if call(fd) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+    finally:
+        os.close(fd)
+    return True
+
+# --- TRACKER ---
+class SyncResult:
+    """One finished sync: which files are now durable, which failed, and what it cost"""
+    __slots__ = ("tokens", "failed", "seconds", "nbytes")
+
+    def __init__(self, tokens: List[Any], failed: Dict[int, str], seconds: float, nbytes: int):
+        self.tokens = tokens
+        self.failed = failed  # index into tokens -> error message
+        self.seconds = seconds
+        self.nbytes = nbytes
+
+class DurabilityTracker:
+    """
+    Holds verified files until their data is on stable storage (BATCH / JOB).
+
+    The engine add()s a file after its hash check and gets it back from
+    completed() once it has been synced. Only then is it reported SYNCED and
+    written to the manifest as VERIFIED. BATCH syncs on a background thread so
+    the copy loop keeps reading the card while the destination flushes. JOB
+    defers everything to one syncfs in finish(). FILE and NONE never hold
+    anything: the engine fsyncs (or not) inline.
+    """
+
+    def __init__(self, policy: Durability, dest_folder: str,
+                 batch_files: int = BATCH_FILES, batch_bytes: int = BATCH_BYTES):
+        self.policy = policy
+        self.dest_folder = dest_folder
+        self.batch_files = batch_files
+        self.batch_bytes = batch_bytes
+        self._batch: List[Tuple[Any, str, int]] = []
+        self._batch_bytes = 0
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def deferred(self) -> bool:
+        return self.policy in (Durability.BATCH, Durability.JOB)
+
+    def add(self, token: Any, path: str, size: int):
+        self._batch.append((token, path, size))
+        self._batch_bytes += size
+        if self.policy == Durability.BATCH and (len(self._batch) >= self.batch_files
+                                                or self._batch_bytes >= self.batch_bytes):
+            self._submit_batch()
+
+    def completed(self) -> List[SyncResult]:
+        """Non-blocking: results of the batches that finished since the last call"""
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def finish(self) -> List[SyncResult]:
+        """Blocks until everything added so far is durable (or failed)"""
+        if self.policy == Durability.BATCH:
+            self._submit_batch()
+            if self._thread:
+                self._jobs.put(None)
+                self._thread.join()
+                self._thread = None
+        elif self.policy == Durability.JOB and self._batch:
+            batch, self._batch, self._batch_bytes = self._batch, [], 0
+            self._results.put(self._sync_job(batch))
+        return self.completed()
+
+    # --- INTERNALS ---
+    def _submit_batch(self):
+        if not self._batch: return
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self._thread.start()
+        self._jobs.put(batch)
+
+    def _sync_loop(self):
+        while True:
+            batch = self._jobs.get()
+            if batch is None: return
+            self._results.put(self._sync_files(batch))
+
+    def _sync_files(self, batch) -> SyncResult:
+        start = time.perf_counter()
+        failed = {}
+        dirs: Set[str] = set()
+        for i, (_, path, _) in enumerate(batch):
+            try:
+                fsync_path(path)
+                dirs.add(os.path.dirname(path))
+            except OSError as e:
+                failed[i] = f"fsync failed: {e}"
+        # New files are only reachable after a crash once their directory entry is durable too
+        for d in dirs:
+            try:
+                fsync_dir(d)
+            except OSError as e:
+                for i, (_, path, _) in enumerate(batch):
+                    if os.path.dirname(path) == d: failed.setdefault(i, f"directory fsync failed: {e}")
+        return SyncResult([t for t, _, _ in batch], failed, time.perf_counter() - start, sum(s for _, _, s in batch))
+
+    def _sync_job(self, batch) -> SyncResult:
+        start = time.perf_counter()
+        try:
+            # One syscall for the whole destination filesystem instead of thousands of fsyncs
+            if syncfs(self.dest_folder):
+                return SyncResult([t for t, _, _ in batch], {}, time.perf_counter() - start,
+                                  sum(s for _, _, s in batch))
+        except OSError as e:
+            return SyncResult([t for t, _, _ in batch], {i: f"syncfs failed: {e}" for i in range(len(batch))},
+                              time.perf_counter() - start, sum(s for _, _, s in batch))
+        return self._sync_files(batch)
@@ -5,12 +5,36 @@ import time
 from datetime import datetime
 from typing import List, Callable, Optional
 from ..model.file_obj import FileObj, SyncStatus
+from ..model.sequence import SequenceObj
+from .allocation import NO_SPACE, InsufficientSpaceError, Preallocation, check_batch_space, preallocate, space_error
+from .governor import GOVERNOR
+from .durability import Durability, DurabilityTracker, fsync_fd, fsync_path
 from .hashing import HashEngine
+from .manifest import sidecar_path, write_sidecar
+from .metrics import TransferMetrics
+from .readahead import ReadAhead
+
+CHUNK_SIZE = 1024 * 1024
 
 class TransferEngine:
     def __init__(self):
         self._is_running = False
         self._stop_flag = False
+        # Per-phase timings of the last job (JSON next to the manifest; optional Prometheus textfile)
+        self.last_metrics: Optional[TransferMetrics] = None
+        self.prometheus_path = os.environ.get("LASTLOOK_PROMETHEUS_TEXTFILE")
+        # When copied data must be on the platters before a file counts as verified (see durability.py)
+        self.durability = Durability.parse(os.environ.get("LASTLOOK_DURABILITY"))
+        # Reserve each destination file at full size before writing (see allocation.py)
+        self.preallocation = Preallocation.parse(os.environ.get("LASTLOOK_PREALLOCATE"))
+        # Warm the next files on the card while the current one copies / verifies (see readahead.py)
+        self.readahead = os.environ.get("LASTLOOK_READAHEAD", "1") != "0"
+        # Live totals of the running transfer (the capacity planner reads them to shrink its reservation)
+        self.files_total = self.bytes_total = 0
+        self.files_started = self.bytes_started = 0
+        # File in flight: its blocks are only all allocated if preallocation succeeded
+        self.current_size = self.current_written = 0
+        self.current_reserved = False
 
     def run_transfer(self, 
                      files: List[FileObj], 
@@ -44,45 +68,162 @@ class TransferEngine:
         else:
             return f"{int(seconds // 3600)}h {int((seconds % 3600) // 60)}m"
 
+    @staticmethod
+    def _expand(files: List[FileObj]):
+        """
+        The work list: (row, file, frame_index). Plain files are their own row.
+        Sequences expand to their missing frames; progress is reported against the sequence row.
+        """
+        work = []
+        for f in files:
+            if isinstance(f, SequenceObj):
+                indices = list(f.frame_indices_with_status(SyncStatus.MISSING))
+                for i in indices:
+                    f.set_frame_status(i, SyncStatus.PENDING)  # Row reads "pending" until its first frame starts
+                work.extend((f, f.frame_file(i), i) for i in indices)
+            else:
+                work.append((f, f, None))
+        return work
+
+    @staticmethod
+    def _set_status(row: FileObj, file_obj: FileObj, frame_index: Optional[int], status: SyncStatus):
+        file_obj.status = status
+        if frame_index is not None:
+            row.set_frame_status(frame_index, status)  # Row status becomes the sequence aggregate
+
+    @staticmethod
+    def _discard_partial(dest_path: str, moved: int, reserved: bool, out_of_space):
+        """Failed copy: drop the reservation beyond what was written (and empty files on a full disk)"""
+        try:
+            if out_of_space and moved == 0 and os.path.exists(dest_path):
+                os.remove(dest_path)
+            elif reserved and os.path.exists(dest_path):
+                # No size check: KEEP_SIZE (Linux) and F_PREALLOCATE (macOS) reserve blocks past EOF
+                # without growing st_size. Truncating, even to the current size, hands those back.
+                os.truncate(dest_path, moved)
+        except OSError as e:
+            print(f"Could not clean up {dest_path}: {e}")
+
+    def _apply_durable(self, results, metrics: TransferMetrics, on_progress):
+        """Worker thread: files whose data reached stable storage become SYNCED / VERIFIED"""
+        for result in results:
+            metrics.add("fsync", result.seconds, result.nbytes, calls=len(result.tokens))
+            for i, (row, file_obj, frame_index, entry, fm) in enumerate(result.tokens):
+                error = result.failed.get(i)
+                if error:
+                    print(f"Transfer Error {file_obj.filename}: {error}")
+                    self._set_status(row, file_obj, frame_index, SyncStatus.ERROR)
+                    entry["status"] = f"ERROR: {error}"
+                    entry["hash"] = "N/A"
+                else:
+                    self._set_status(row, file_obj, frame_index, SyncStatus.SYNCED)
+                    entry["status"] = "VERIFIED"
+                metrics.finish_file(fm, entry["status"])
+                on_progress(f"{'Error on' if error else 'Synced'} {file_obj.filename}", row)
+
     def _transfer_worker(self, files: List[FileObj], dest_folder, on_progress, on_complete):
         # Local log to store transfer details for the Manifest
         transfer_log = [] 
+        metrics = None
+        durable = None
+        ahead = None
+        GOVERNOR.transfer_started()  # Background readers back off while this runs
         
         try:
+            work = self._expand(files)
+
             # --- IMPROVEMENT: Calculate Total Batch Size for Global Progress ---
-            total_files = len(files)
-            total_bytes = sum(f.size for f in files)
+            total_files = len(work)
+            total_bytes = sum(f.size for _, f, _ in work)
+            self.files_total, self.bytes_total = total_files, total_bytes
+            self.files_started = self.bytes_started = 0
+            self.current_size = self.current_written = 0
+            self.current_reserved = False
             bytes_transferred_global = 0
+            bytes_started = 0
             start_time_global = time.time()
+            metrics = TransferMetrics(dest_folder, total_files, total_bytes)
+            durable = DurabilityTracker(self.durability, dest_folder)
+            perf = time.perf_counter
+
+            if self.preallocation == Preallocation.BATCH:
+                try:
+                    check_batch_space(dest_folder, total_bytes)
+                except InsufficientSpaceError as e:
+                    # Fail before the first byte instead of 90% of the way through
+                    print(f"Transfer Error: {e.strerror}")
+                    on_progress(f"Transfer not started. {e.strerror}", None)
+                    work = []
+
+            if self.readahead and len(work) > 1:
+                ahead = ReadAhead([(f.path, f.size) for _, f, _ in work], chunk_size=CHUNK_SIZE)
+                ahead.start()
 
-            for index, file_obj in enumerate(files):
+            for index, (row, file_obj, frame_index) in enumerate(work):
                 if self._stop_flag: break
+                if ahead: ahead.advance(index)
+                self._apply_durable(durable.completed(), metrics, on_progress)
+                fm = metrics.start_file(file_obj.dest_rel_path, file_obj.size,
+                                        queue_files=total_files - index, queue_bytes=total_bytes - bytes_started)
+                bytes_started += file_obj.size
+                self.files_started, self.bytes_started = index + 1, bytes_started
+                self.current_size, self.current_written, self.current_reserved = file_obj.size, 0, False
 
                 # 1. COPY PHASE (Manual Loop for Speed Tracking)
-                file_obj.status = SyncStatus.TRANSFERRING
+                self._set_status(row, file_obj, frame_index, SyncStatus.TRANSFERRING)
                 
                 source_path = file_obj.path
-                dest_path = os.path.join(dest_folder, file_obj.filename)
+                dest_path = os.path.join(dest_folder, file_obj.dest_rel_path)
                 
                 # Track specific file stats
                 file_hash = "N/A"
                 transfer_status = "FAILED"
+                held = False  # Verified, but waiting for the durability tracker
+                reserved = False  # Destination blocks preallocated
+                moved = 0
+                out_of_space = None
 
                 try:
+                    # Sequence frames / clip folders keep their sub-folder on the destination
+                    if file_obj.rel_path:
+                        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
                     # IMPROVEMENT: Manual Copy Loop to measure speed
+                    t_open = perf()
                     with open(source_path, 'rb') as fsrc:
-                        with open(dest_path, 'wb') as fdst:
+                        fdst = open(dest_path, 'wb')
+                        metrics.add("open", perf() - t_open, fm=fm, calls=2)
+                        with fdst:
+                            if self.preallocation != Preallocation.OFF:
+                                # One extent up front: no fragmentation on busy RAIDs, and a full disk fails here
+                                with metrics.measure("allocate", fm, file_obj.size):
+                                    try:
+                                        reserved = preallocate(fdst.fileno(), file_obj.size)
+                                        self.current_reserved = reserved
+                                    except OSError as e:
+                                        raise space_error(file_obj.filename, file_obj.size, e)
+                            read_s = write_s = throttled = 0.0
+                            moved = chunks = 0
                             while True:
                                 if self._stop_flag: break
                                 
                                 # Read 1MB Chunk
-                                buf = fsrc.read(1024 * 1024) 
+                                t0 = perf()
+                                buf = fsrc.read(CHUNK_SIZE) 
+                                t1 = perf()
+                                read_s += t1 - t0
                                 if not buf: break
                                 
                                 fdst.write(buf)
+                                write_s += perf() - t1
+                                # User bandwidth cap (no-op when unset)
+                                throttled += GOVERNOR.throttle_transfer(len(buf))
                                 
                                 # Math: Speed & ETA
                                 chunk_size = len(buf)
+                                moved += chunk_size
+                                chunks += 1
+                                self.current_written = moved
                                 bytes_transferred_global += chunk_size
                                 
                                 elapsed = time.time() - start_time_global
@@ -97,61 +238,139 @@ class TransferEngine:
                                     
                                     # Limit updates to every 100ms to avoid flooding UI? 
                                     # For MVP we send every chunk (might be fast, but CTk handles it)
-                                    on_progress(msg, file_obj)
+                                    on_progress(msg, row)
+
+                            if self._stop_flag and reserved:
+                                fdst.truncate(moved)  # Never leave a full-size (but partial) file behind
+                            metrics.add("read", read_s, moved, fm, calls=chunks + 1)
+                            metrics.add("write", write_s, moved, fm, calls=chunks)
+                            if throttled: metrics.add("throttle", throttled, fm=fm, calls=0)
+                            if self.durability == Durability.FILE and not self._stop_flag:
+                                with metrics.measure("fsync", fm, moved):
+                                    fdst.flush()
+                                    fsync_fd(fdst.fileno())
+                            with metrics.measure("flush", fm):
+                                fdst.close()
 
                     if self._stop_flag: break
 
                     # CRITICAL: Restore metadata (timestamps) since we did a manual copy
-                    shutil.copystat(source_path, dest_path)
+                    with metrics.measure("copystat", fm):
+                        shutil.copystat(source_path, dest_path)
                     
                     # 2. VERIFICATION PHASE
-                    on_progress(f"[{index+1}/{total_files}] Verifying: {file_obj.filename}...", file_obj)
-                    file_obj.status = SyncStatus.VERIFYING
+                    on_progress(f"[{index+1}/{total_files}] Verifying: {file_obj.filename}...", row)
+                    self._set_status(row, file_obj, frame_index, SyncStatus.VERIFYING)
                     
                     # A. Quick Size Check
                     if os.path.getsize(dest_path) != file_obj.size:
                         raise ValueError("File size mismatch")
 
                     # B. Deep Hash Check
-                    src_hash = HashEngine.calculate_md5(source_path)
-                    dst_hash = HashEngine.calculate_md5(dest_path)
+                    with metrics.measure("hash_source", fm, file_obj.size):
+                        src_hash = HashEngine.calculate_md5(source_path)
+                    with metrics.measure("hash_dest", fm, file_obj.size):
+                        dst_hash = HashEngine.calculate_md5(dest_path)
 
                     if src_hash and dst_hash and src_hash == dst_hash:
-                        file_obj.status = SyncStatus.SYNCED
                         file_hash = dst_hash # Capture for log
-                        transfer_status = "VERIFIED"
+                        if durable.deferred:
+                            # CRITICAL: Stays VERIFYING until the data is durable (a yanked drive loses page cache)
+                            held = True
+                            transfer_status = "UNSYNCED"
+                        else:
+                            self._set_status(row, file_obj, frame_index, SyncStatus.SYNCED)
+                            transfer_status = "VERIFIED"
                     else:
                         raise ValueError(f"Checksum Mismatch! Src: {src_hash} != Dst: {dst_hash}")
 
                 except Exception as e:
                     print(f"Transfer Error {file_obj.filename}: {e}")
-                    file_obj.status = SyncStatus.ERROR
-                    on_progress(f"Error on {file_obj.filename}", file_obj)
+                    self._set_status(row, file_obj, frame_index, SyncStatus.ERROR)
+                    on_progress(f"Error on {file_obj.filename}", row)
                     transfer_status = f"ERROR: {str(e)}"
+                    if isinstance(e, OSError) and e.errno in NO_SPACE:
+                        out_of_space = e.strerror if isinstance(e, InsufficientSpaceError) else \
+                            f"Destination full while copying {file_obj.filename}"
+                        transfer_status = f"ERROR: {out_of_space}"
+                    self._discard_partial(dest_path, moved, reserved, out_of_space)
 
-                # Append to Log
-                transfer_log.append({
-                    "filename": file_obj.filename,
+                # Append to Log (one entry per frame for sequences)
+                entry = {
+                    "filename": file_obj.dest_rel_path,
                     "size": file_obj.formatted_size,
+                    "bytes": file_obj.size,
                     "status": transfer_status,
                     "hash": file_hash,
                     "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
+                }
+                transfer_log.append(entry)
+                if held:
+                    durable.add((row, file_obj, frame_index, entry, fm), dest_path, file_obj.size)
+                else:
+                    metrics.finish_file(fm, transfer_status)
+
+                on_progress(f"[{index+1}/{total_files}] Finished: {file_obj.filename}", row)
 
-                on_progress(f"[{index+1}/{total_files}] Finished: {file_obj.filename}", file_obj)
+                if out_of_space:
+                    # CRITICAL: Fail fast. Every later file would hit the same wall.
+                    on_progress(f"Transfer stopped. {out_of_space}", row)
+                    break
 
         except Exception as e:
             print(f"Critical Worker Error: {e}")
         finally:
+            GOVERNOR.transfer_finished()
+            if ahead:
+                ahead.close()
+                metrics.add("readahead", ahead.seconds, ahead.bytes, calls=ahead.files)
+            # Verified files still waiting for their sync (runs on stop too: what was copied is kept)
+            if durable and durable.deferred:
+                try:
+                    on_progress("Flushing to disk...", None)
+                    self._apply_durable(durable.finish(), metrics, on_progress)
+                except Exception as e:
+                    print(f"Durability Error: {e}")
+            # Frames that never started (stop / crash) go back to MISSING
+            for f in files:
+                if isinstance(f, SequenceObj):
+                    for i in list(f.frame_indices_with_status(SyncStatus.PENDING)):
+                        f.set_frame_status(i, SyncStatus.MISSING)
             self._is_running = False
             # Generate the Receipt
             if transfer_log:
-                self._write_manifest(dest_folder, transfer_log)
+                if metrics:
+                    with metrics.measure("manifest"):
+                        manifest_path = self._write_manifest(dest_folder, transfer_log, self.durability)
+                    for path in (manifest_path, manifest_path and sidecar_path(manifest_path)):
+                        if path and os.path.exists(path):
+                            metrics.bytes["manifest"] += os.path.getsize(path)
+                else:
+                    self._write_manifest(dest_folder, transfer_log, self.durability)
+            if metrics:
+                metrics.finish()
+                self.last_metrics = metrics
+                self._write_metrics(dest_folder, metrics)
             on_complete()
 
-    def _write_manifest(self, dest_folder, logs):
+    def _write_metrics(self, dest_folder, metrics: TransferMetrics):
+        """JSON next to the manifest, plus the Prometheus textfile if one is configured"""
+        if metrics.files:
+            stamp = datetime.fromtimestamp(metrics.started_at).strftime("%Y%m%d_%H%M%S")
+            try:
+                metrics.write_json(os.path.join(dest_folder, f"Transfer_Metrics_{stamp}.json"))
+            except Exception as e:
+                print(f"Failed to write metrics: {e}")
+        if self.prometheus_path:
+            try:
+                metrics.write_prometheus(self.prometheus_path)
+            except Exception as e:
+                print(f"Failed to write Prometheus textfile: {e}")
+
+    def _write_manifest(self, dest_folder, logs, durability: Durability = Durability.NONE):
         """Generates a text-based receipt in the destination folder"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         manifest_path = os.path.join(dest_folder, f"Transfer_Log_{timestamp}.txt")
         
         try:
@@ -159,8 +378,9 @@ class TransferEngine:
                 f.write("==================================================\n")
                 f.write("           LASTLOOK TRANSFER MANIFEST             \n")
                 f.write("==================================================\n")
-                f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Date: {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Destination: {dest_folder}\n")
+                f.write(f"Durability: {durability.value}\n")
                 f.write("--------------------------------------------------\n\n")
                 
                 success_count = 0
@@ -177,6 +397,18 @@ class TransferEngine:
                 f.write(f"\nSUMMARY: {success_count}/{len(logs)} files verified successfully.\n")
                 f.write("==================================================\n")
                 f.write("Generated by LastLook v0.9\n")
-                
+                if durability != Durability.NONE:
+                    f.flush()
+                    fsync_fd(f.fileno())
+        except Exception as e:
+            print(f"Failed to write manifest: {e}")
+            return None
+
+        # JSON twin with exact sizes: what ManifestCatalog reads for offline compares
+        try:
+            sidecar = write_sidecar(manifest_path, dest_folder, now.strftime('%Y-%m-%d %H:%M:%S'), durability.value, logs)
+            if durability != Durability.NONE:
+                fsync_path(sidecar)
         except Exception as e:
-            print(f"Failed to write manifest: {e}")
\ No newline at end of file
+            print(f"Failed to write manifest sidecar: {e}")
+        return manifest_path
\ No newline at end of file
@@ -0,0 +1,165 @@
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+MB = 1024 * 1024
+
+# While a transfer runs, background readers (thumbnails, UI rescans) get at most this much
+BACKGROUND_BYTES_PER_S = 16 * MB
+BACKGROUND_OPS_PER_S = 2000       # Directory entries listed per second by background scans
+BACKGROUND_NICE = 10
+
+# Linux ioprio_set(2) (no Python binding)
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+SYS_IOPRIO_SET = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289, "armv7l": 314}
+
+class TokenBucket:
+    """
+    Thread-safe rate limiter. consume() may overdraw the bucket: the caller
+    then sleeps off the debt, so a 1 MB chunk against a 1 MB/s cap still works.
+    rate <= 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, burst_seconds: float = 0.25):
+        self._lock = threading.Lock()
+        self.burst_seconds = burst_seconds
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self.rate = rate
+            self.burst = max(rate * self.burst_seconds, 1.0)
+            self._tokens = self.burst
+            self._stamp = time.monotonic()
+
+    def consume(self, amount: float) -> float:
+        """Takes `amount` tokens, sleeping if needed. Returns the seconds slept."""
+        if self.rate <= 0: return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0: time.sleep(wait)
+        return wait
+
+class IOGovernor:
+    """
+    One place that decides who gets the card and the drives.
+
+    - Transfers call transfer_started() / transfer_finished(). While any is
+      running, threads marked with background() / mark_background() (thumbnail
+      workers, UI rescans) are rate limited by token buckets, in bytes for
+      reads and directory entries for scans. With no transfer running they are
+      never slowed down.
+    - ffmpeg children always run at lower CPU and I/O priority (nice, ioprio
+      best-effort level 7, or BELOW_NORMAL on Windows). When they start during
+      a transfer they get the idle I/O class instead.
+    - set_transfer_cap() puts a user cap (bytes/s, shared by every running
+      transfer) on the copy loop, e.g. to leave headroom on a drive that is
+      also feeding live playback.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = 0
+        self.transfer_bucket = TokenBucket(0)
+        try:
+            self.set_transfer_cap(float(os.environ.get("LASTLOOK_TRANSFER_CAP_MBPS", 0)) * MB)
+        except ValueError:
+            print("LASTLOOK_TRANSFER_CAP_MBPS is not a number, transfer cap ignored")
+        self.background_bytes = TokenBucket(BACKGROUND_BYTES_PER_S)
+        self.background_ops = TokenBucket(BACKGROUND_OPS_PER_S)
+
+    # --- TRANSFERS ---
+    @property
+    def transfer_active(self) -> bool:
+        return self._active > 0
+
+    def transfer_started(self):
+        with self._lock:
+            self._active += 1
+
+    def transfer_finished(self):
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    @property
+    def transfer_cap(self) -> float:
+        return self.transfer_bucket.rate
+
+    def set_transfer_cap(self, bytes_per_s: float):
+        """0 removes the cap"""
+        self.transfer_bucket.set_rate(max(0.0, bytes_per_s))
+
+    def throttle_transfer(self, nbytes: int) -> float:
+        return self.transfer_bucket.consume(nbytes)
+
+    # --- BACKGROUND ---
+    def mark_background(self):
+        """For dedicated worker threads (thumbnail pool): everything this thread reads is background"""
+        self._local.background = True
+
+    @contextmanager
+    def background(self):
+        """Marks the current thread as background I/O for the duration"""
+        previous = getattr(self._local, "background", False)
+        self._local.background = True
+        try:
+            yield
+        finally:
+            self._local.background = previous
+
+    def _should_throttle(self) -> bool:
+        return self._active > 0 and getattr(self._local, "background", False)
+
+    def throttle_background(self, nbytes: int = 0, ops: int = 0) -> float:
+        """No-op on transfer threads, or when nothing is being transferred"""
+        if not self._should_throttle(): return 0.0
+        waited = 0.0
+        if nbytes: waited += self.background_bytes.consume(nbytes)
+        if ops: waited += self.background_ops.consume(ops)
+        return waited
+
+    # --- SUBPROCESSES ---
+    def popen_kwargs(self) -> dict:
+        """Extra Popen arguments for background children (Windows priority class)"""
+        if os.name == "nt":
+            flag = subprocess.IDLE_PRIORITY_CLASS if self.transfer_active else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            return {"creationflags": flag}
+        return {}
+
+    def lower_priority(self, pid: int):
+        """POSIX: nice + ioprio for a background child (right after spawn)"""
+        if os.name == "nt": return
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, BACKGROUND_NICE)
+        except (OSError, AttributeError):
+            pass
+        if sys.platform.startswith("linux"):
+            if self.transfer_active:
+                set_ioprio(pid, IOPRIO_CLASS_IDLE, 0)
+            else:
+                set_ioprio(pid, IOPRIO_CLASS_BE, 7)
+
+def set_ioprio(pid: int, io_class: int, level: int) -> bool:
+    number = SYS_IOPRIO_SET.get(platform.machine())
+    if number is None: return False
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.syscall(number, IOPRIO_WHO_PROCESS, pid, (io_class << IOPRIO_CLASS_SHIFT) | level) == 0
+    except (OSError, AttributeError):
+        return False
+
+# Process-wide: every engine, the thumbnail stack and the scanner go through this one
+GOVERNOR = IOGovernor()
@@ -0,0 +1,319 @@
+import json
+import os
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Set
+from ..model.file_obj import FileObj
+from ..model.sequence import SequenceObj
+from ..model.types import SyncStatus
+from ..utils.assets import get_data_dir
+from .engine import TransferEngine
+from .scanner import Scanner
+
+class JobState(Enum):
+    QUEUED = "queued"
+    PAUSED = "paused"      # Restored from the last session: waits for the user to resume (or cancel) it
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class IngestJob:
+    """One card -> one or more destinations. `rel_paths` None means "everything missing"."""
+
+    def __init__(self, source: str, destinations: List[str], rel_paths: Optional[List[str]] = None,
+                 job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.source = source
+        self.destinations = list(destinations)
+        self.rel_paths = rel_paths
+        self.state = JobState.QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.files_total = 0      # Entries (a sequence is one), as the progress label counts them
+        self.frames_total = 0     # Files on disk (every frame of a sequence), for capacity
+        self.bytes_total = 0
+        self.files_done = 0
+        self.errors = 0
+        self.message = ""
+        self.current_dest: Optional[str] = None
+        # In-memory only: the rows selected at submit. The runner works on copies of them
+        # and reports progress by id through on_progress; the UI applies it on its own thread.
+        self.files: Optional[List[FileObj]] = None
+        self.devices: Set[int] = set()
+        self.engine: Optional[TransferEngine] = None
+        self.cancel_requested = False
+
+    @property
+    def is_active(self) -> bool:
+        """Not finished: queued, paused or running"""
+        return self.state in (JobState.QUEUED, JobState.PAUSED, JobState.RUNNING)
+
+    @property
+    def label(self) -> str:
+        name = lambda p: os.path.basename(os.path.normpath(p)) or p
+        return f"{name(self.source)} -> {', '.join(name(d) for d in self.destinations)}"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id, "source": self.source, "destinations": self.destinations,
+            "rel_paths": self.rel_paths, "state": self.state.value,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "files_total": self.files_total, "frames_total": self.frames_total, "bytes_total": self.bytes_total,
+            "files_done": self.files_done, "errors": self.errors, "message": self.message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestJob":
+        job = cls(data["source"], data["destinations"], data.get("rel_paths"), job_id=data["id"])
+        job.state = JobState(data.get("state", "queued"))
+        for key in ("created", "started", "finished", "files_total", "frames_total", "bytes_total",
+                    "files_done", "errors", "message"):
+            if key in data: setattr(job, key, data[key])
+        return job
+
+    def set_totals(self, files: List[FileObj]):
+        self.files_total = len(files)
+        self.frames_total = sum(f.frame_count if isinstance(f, SequenceObj) else 1 for f in files)
+        self.bytes_total = sum(f.size for f in files)
+
+class JobQueue:
+    """
+    Persistent multi-card ingest queue.
+
+    Each job gets its own TransferEngine, so two cards on two readers copy at
+    the same time. A job reserves the devices (st_dev) of its source and all of
+    its destinations, and a queued job only starts when none of them is in use.
+    Jobs that share a card or a destination drive are therefore serialized
+    instead of thrashing the same disk. FIFO order is kept: a later job cannot
+    jump a blocked earlier job that wants the same device.
+
+    The queue is saved as JSON after every state change. On load, unfinished
+    jobs (including those RUNNING when the app died) come back PAUSED, so
+    nothing starts copying behind the user's back; resume() or cancel() each
+    one. Pass resume_saved=True to re-queue them instead. Re-running is safe
+    because the compare step skips files that were already copied.
+
+    on_change(job) and on_progress(job, msg, file_obj) fire on worker threads.
+    file_obj is the job's own copy of a row: match it by id on the UI thread
+    (FileListModel.publish_status), never by identity.
+    """
+    HISTORY = 50  # Finished jobs kept in the file
+
+    def __init__(self, store_path: Optional[str] = None,
+                 on_change: Optional[Callable[[IngestJob], None]] = None,
+                 on_progress: Optional[Callable[[IngestJob, str, Optional[FileObj]], None]] = None,
+                 autostart: bool = True, resume_saved: bool = False):
+        self.store_path = store_path or os.path.join(get_data_dir(), "jobs.json")
+        self.on_change = on_change
+        self.on_progress = on_progress
+        self._lock = threading.RLock()
+        self._jobs: List[IngestJob] = []
+        self._busy: Set[int] = set()
+        self._autostart = autostart
+        self._load(resume_saved)
+
+    # --- PUBLIC ---
+    @property
+    def jobs(self) -> List[IngestJob]:
+        with self._lock:
+            return list(self._jobs)
+
+    def submit(self, source: str, destinations: List[str], files: Optional[List[FileObj]] = None) -> IngestJob:
+        """Queues a card. `files` (optional) restricts the job to those entries."""
+        rel_paths = [f.dest_rel_path for f in files] if files is not None else None
+        job = IngestJob(source, destinations, rel_paths)
+        job.files = files
+        if files is not None:
+            job.set_totals(files)
+        with self._lock:
+            self._jobs.append(job)
+            self._save()
+        self._notify(job)
+        self.pump()
+        return job
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            job = self._find(job_id)
+            if job is None: return
+            if job.state in (JobState.QUEUED, JobState.PAUSED):
+                job.state = JobState.CANCELLED
+                job.finished = time.time()
+                job.message = "Cancelled"
+            elif job.state == JobState.RUNNING:
+                job.message = "Stopping..."
+                job.cancel_requested = True  # The runner marks it CANCELLED when the engine returns
+                if job.engine: job.engine.stop()
+            self._save()
+        self._notify(job)
+        self.pump()
+
+    def resume(self, job_id: str):
+        """A PAUSED job goes back in line"""
+        with self._lock:
+            job = self._find(job_id)
+            if job is None or job.state != JobState.PAUSED: return
+            job.state = JobState.QUEUED
+            job.message = ""
+            self._save()
+        self._notify(job)
+        self.pump()
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [j for j in self._jobs if j.is_active]
+            self._save()
+
+    def counts(self) -> Dict[JobState, int]:
+        with self._lock:
+            result = {s: 0 for s in JobState}
+            for job in self._jobs:
+                result[job.state] += 1
+            return result
+
+    def pump(self):
+        """Starts every queued job whose devices are free (FIFO, no overtaking on a shared device)."""
+        if not self._autostart: return
+        to_start = []
+        with self._lock:
+            reserved = set(self._busy)
+            for job in self._jobs:
+                if job.state != JobState.QUEUED: continue
+                if not os.path.isdir(job.source):
+                    job.message = "Waiting for source"
+                    continue
+                job.devices = self._devices_for(job)
+                if job.devices & reserved:
+                    reserved |= job.devices  # Later jobs may not overtake on these devices
+                    job.message = "Waiting for device"
+                    continue
+                reserved |= job.devices
+                self._busy |= job.devices
+                job.state = JobState.RUNNING
+                job.started = time.time()
+                job.message = ""
+                to_start.append(job)
+            if to_start: self._save()
+        for job in to_start:
+            self._notify(job)
+            threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    # --- DEVICES ---
+    @staticmethod
+    def device_of(path: str) -> Optional[int]:
+        """st_dev of the path, or of its nearest existing parent (destinations may not exist yet)."""
+        path = os.path.abspath(path)
+        while True:
+            try:
+                return os.stat(path).st_dev
+            except OSError:
+                parent = os.path.dirname(path)
+                if parent == path: return None
+                path = parent
+
+    def _devices_for(self, job: IngestJob) -> Set[int]:
+        devices = {self.device_of(job.source)}
+        devices.update(self.device_of(d) for d in job.destinations)
+        devices.discard(None)
+        return devices
+
+    # --- RUNNER ---
+    def _run_job(self, job: IngestJob):
+        try:
+            for dest in job.destinations:
+                if job.cancel_requested: break
+                job.current_dest = dest
+                os.makedirs(dest, exist_ok=True)
+
+                if job.files is not None:
+                    # Fresh copies per destination: compare / transfer never write to the UI's rows
+                    files = [f.copy() for f in job.files]
+                else:
+                    # Restored after a restart (or submitted headless): rescan the card
+                    files = Scanner.scan_directory(job.source)
+                    if job.rel_paths is not None:
+                        wanted = set(job.rel_paths)
+                        files = [f for f in files if f.dest_rel_path in wanted]
+                todo = [f for f in Scanner.compare_directories(files, dest) if f.status == SyncStatus.MISSING]
+                if job.files_total == 0 or job.frames_total == 0:
+                    job.set_totals(files)
+                if not todo: continue
+                if job.cancel_requested: break  # Cancelled while scanning
+
+                job.message = f"Copying {len(todo)} to {dest}"
+                self._notify(job)
+                done = threading.Event()
+                job.engine = TransferEngine()
+
+                def on_progress(msg, file_obj=None, job=job):
+                    if self.on_progress: self.on_progress(job, msg, file_obj)
+
+                job.engine.run_transfer(todo, dest, on_progress, done.set)
+                done.wait()
+                job.engine = None
+                job.errors += sum(1 for f in todo if f.status == SyncStatus.ERROR)
+                job.files_done += sum(1 for f in todo if f.status == SyncStatus.SYNCED)
+
+            if job.cancel_requested:
+                job.state = JobState.CANCELLED
+                job.message = "Stopped"
+            else:
+                job.state = JobState.FAILED if job.errors else JobState.DONE
+                job.message = f"{job.errors} errors" if job.errors else "Verified"
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.state = JobState.FAILED
+            job.message = str(e)
+        finally:
+            job.finished = time.time()
+            job.current_dest = None
+            job.files = None  # Drop the FileObj references once the job is over
+            with self._lock:
+                self._busy -= job.devices
+                self._save()
+            self._notify(job)
+            self.pump()
+
+    # --- PERSISTENCE ---
+    def _find(self, job_id: str) -> Optional[IngestJob]:
+        return next((j for j in self._jobs if j.id == job_id), None)
+
+    def _load(self, resume_saved: bool = False):
+        try:
+            with open(self.store_path, encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("jobs", []):
+                job = IngestJob.from_dict(item)
+                if job.is_active:
+                    # Interrupted by a quit/crash (or left queued): only restarts when asked to
+                    job.state = JobState.QUEUED if resume_saved else JobState.PAUSED
+                    job.message = "Resumed after restart" if resume_saved else "Paused after restart"
+                self._jobs.append(job)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Job queue could not be loaded: {e}")
+
+    def _save(self):
+        """Holds self._lock. Atomic write; finished history is trimmed."""
+        finished = [j for j in self._jobs if not j.is_active]
+        drop = set(id(j) for j in finished[:-self.HISTORY]) if len(finished) > self.HISTORY else set()
+        self._jobs = [j for j in self._jobs if id(j) not in drop]
+        try:
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "jobs": [j.to_dict() for j in self._jobs]}, f, indent=2)
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            print(f"Job queue could not be saved: {e}")
+
+    def _notify(self, job: IngestJob):
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception as e:
+                print(f"Job queue callback error: {e}")
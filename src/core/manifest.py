@@ -0,0 +1,163 @@
+import glob
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from ..model.file_obj import FileObj
+
+MANIFEST_VERSION = 1
+TEXT_PATTERN = "Transfer_Log_*.txt"
+JSON_PATTERN = "Transfer_Log_*.json"
+
+class ManifestEntry(NamedTuple):
+    rel_path: str             # As written by the engine (dest_rel_path)
+    size: Optional[int]       # Bytes (None for text-only manifests)
+    size_text: str            # FileObj.formatted_size, all a text manifest records
+    md5: Optional[str]
+    status: str               # VERIFIED / ERROR: ... / FAILED / UNSYNCED
+    destination: str          # Destination folder at the time of the transfer
+    manifest: str             # File it was read from
+
+    @property
+    def verified(self) -> bool:
+        return self.status == "VERIFIED"
+
+def catalog_key(rel_path: str) -> str:
+    """Manifest paths from Windows and POSIX offloads compare equal"""
+    return rel_path.replace("\\", "/")
+
+def sidecar_path(manifest_path: str) -> str:
+    return os.path.splitext(manifest_path)[0] + ".json"
+
+def write_sidecar(manifest_path: str, dest_folder: str, date: str, durability: str, logs: List[dict]) -> str:
+    """Machine-readable twin of the text manifest: exact sizes, same entries"""
+    path = sidecar_path(manifest_path)
+    doc = {
+        "version": MANIFEST_VERSION,
+        "date": date,
+        "destination": dest_folder,
+        "durability": durability,
+        "files": [{"path": item["filename"], "size": item.get("bytes"), "size_text": item["size"],
+                   "status": item["status"], "md5": item["hash"] if item["hash"] not in (None, "N/A") else None}
+                  for item in logs],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, separators=(",", ":"))
+    return path
+
+class ManifestCatalog:
+    """
+    Every file the given LastLook manifests say was verified, indexed in memory.
+
+    Lets compare run against prior offloads instead of the drive itself: an
+    archive HDD that is spun down, a slow share, or a shuttle drive that has
+    already left set. Lookups are dicts, by relative path (the destination
+    layout the engine writes) and by MD5 digest, so checking a card costs the
+    same whether it is 1 manifest or every backup of the show.
+
+    Reads the JSON sidecar the engine writes next to each Transfer_Log_*.txt.
+    Older text-only manifests are parsed too. Those only carry the formatted
+    size ("1.23 GB"), so they match on the path plus that text.
+    """
+
+    def __init__(self):
+        self.by_path: Dict[str, List[ManifestEntry]] = {}
+        self.by_digest: Dict[str, List[ManifestEntry]] = {}
+        self.manifests: List[str] = []
+        self.entries = 0
+
+    # --- LOADING ---
+    @classmethod
+    def load(cls, paths: Iterable[str]) -> "ManifestCatalog":
+        """Manifest files (.txt or .json) and/or folders to search for Transfer_Log_* manifests"""
+        catalog = cls()
+        for path in paths:
+            for manifest in cls._expand(path):
+                try:
+                    catalog.add_manifest(manifest)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not read manifest {manifest}: {e}")
+        return catalog
+
+    @staticmethod
+    def _expand(path: str) -> List[str]:
+        if not os.path.isdir(path):
+            return [path]
+        sidecars = sorted(glob.glob(os.path.join(glob.escape(path), JSON_PATTERN)))
+        have = {os.path.splitext(p)[0] for p in sidecars}
+        texts = [p for p in sorted(glob.glob(os.path.join(glob.escape(path), TEXT_PATTERN)))
+                 if os.path.splitext(p)[0] not in have]
+        return sidecars + texts
+
+    def add_manifest(self, path: str):
+        if path.lower().endswith(".txt") and os.path.exists(sidecar_path(path)):
+            path = sidecar_path(path)  # Exact sizes beat the formatted ones
+        entries = self._read_json(path) if path.lower().endswith(".json") else self._read_text(path)
+        self.manifests.append(path)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: ManifestEntry):
+        self.entries += 1
+        self.by_path.setdefault(catalog_key(entry.rel_path), []).append(entry)
+        if entry.md5:
+            self.by_digest.setdefault(entry.md5.lower(), []).append(entry)
+
+    @staticmethod
+    def _read_json(path: str) -> List[ManifestEntry]:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        destination = doc.get("destination", "")
+        return [ManifestEntry(item["path"], item.get("size"), item.get("size_text", ""), item.get("md5"),
+                              item.get("status", ""), destination, path)
+                for item in doc.get("files", [])]
+
+    @staticmethod
+    def _read_text(path: str) -> List[ManifestEntry]:
+        """The human-readable receipt (_write_manifest), blocks of 'Key:   value' lines"""
+        entries, destination, current = [], "", {}
+
+        def flush():
+            if "File" in current:
+                md5 = current.get("MD5")
+                entries.append(ManifestEntry(current["File"], None, current.get("Size", ""),
+                                             md5 if md5 not in (None, "", "N/A", "None") else None,
+                                             current.get("Status", ""), destination, path))
+            current.clear()
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("-----"):
+                    flush()
+                    continue
+                key, sep, value = line.partition(":")
+                if not sep: continue
+                key, value = key.strip(), value.strip()
+                if key == "Destination" and not destination:
+                    destination = value
+                elif key in ("File", "Size", "Status", "MD5"):
+                    if key == "File": flush()
+                    current[key] = value
+        flush()
+        return entries
+
+    # --- LOOKUPS ---
+    def __len__(self):
+        return self.entries
+
+    def lookup(self, rel_path: str, size: int) -> Optional[ManifestEntry]:
+        """A verified copy of this path with this size, if any manifest has one"""
+        for entry in self.by_path.get(catalog_key(rel_path), ()):
+            if not entry.verified: continue
+            if entry.size is not None:
+                if entry.size == size: return entry
+            elif entry.size_text == FileObj.format_size(size):
+                return entry
+        return None
+
+    def lookup_digest(self, md5: str) -> List[ManifestEntry]:
+        """Every verified copy with this content, wherever it landed (renamed / re-foldered files)"""
+        return [e for e in self.by_digest.get(md5.lower(), ()) if e.verified]
+
+    def contains(self, file_obj: FileObj) -> bool:
+        return self.lookup(file_obj.dest_rel_path, file_obj.size) is not None
@@ -0,0 +1,195 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Phases of one file's trip, in order. "readahead" is the background warm-up of upcoming source
+# files (overlaps the others), "allocate" is the up-front reservation of the destination,
+# "flush" the user-space flush + close of the destination, "fsync" the time spent making it durable
+# (inline per file, or background batches / job-end syncfs), "throttle" the time the user's
+# bandwidth cap held the copy loop back.
+PHASES = ("readahead", "open", "allocate", "read", "write", "throttle", "flush", "fsync", "copystat", "hash_source", "hash_dest", "manifest")
+
+# Which side of the cart each phase mostly exercises (for the bottleneck hint)
+PHASE_DEVICE = {
+    "readahead": "source",
+    "open": "metadata",
+    "allocate": "destination",
+    "read": "source",
+    "write": "destination",
+    "throttle": "cap",
+    "flush": "destination",
+    "fsync": "destination",
+    "copystat": "metadata",
+    "hash_source": "source",
+    "hash_dest": "destination",
+    "manifest": "destination",
+}
+
+class FileMetrics:
+    __slots__ = ("name", "size", "status", "queue_files", "queue_bytes", "seconds", "bytes", "started", "elapsed")
+
+    def __init__(self, name: str, size: int, queue_files: int, queue_bytes: int):
+        self.name = name
+        self.size = size
+        self.status = "FAILED"
+        self.queue_files = queue_files     # Files still waiting (including this one) when it started
+        self.queue_bytes = queue_bytes
+        self.seconds: Dict[str, float] = {}
+        self.bytes: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "status": self.status,
+            "elapsed": round(self.elapsed, 6),
+            "queue_files": self.queue_files,
+            "queue_bytes": self.queue_bytes,
+            "seconds": {k: round(v, 6) for k, v in self.seconds.items()},
+            "bytes": self.bytes,
+        }
+
+class TransferMetrics:
+    """
+    Per-phase timings for one transfer job.
+
+    The engine wraps each step (readahead / open / allocate / read / write / throttle / flush / fsync /
+    copystat / hash_source / hash_dest / manifest) in measure(). Totals are kept per job
+    and per file, together with the bytes each phase moved and the queue depth
+    when each file started. At the end of the job the metrics go to a JSON file
+    next to the manifest and, optionally, to a Prometheus textfile-collector file.
+    This tells you whether the card, the SSD or the CPU is holding the cart up.
+    """
+
+    def __init__(self, dest_folder: str, total_files: int, total_bytes: int):
+        self.dest_folder = dest_folder
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.elapsed = 0.0
+
+        self.seconds: Dict[str, float] = {p: 0.0 for p in PHASES}
+        self.bytes: Dict[str, int] = {p: 0 for p in PHASES}
+        self.calls: Dict[str, int] = {p: 0 for p in PHASES}
+        self.files: List[FileMetrics] = []
+        self.status_counts: Dict[str, int] = {}
+
+    # --- RECORDING ---
+    def start_file(self, name: str, size: int, queue_files: int, queue_bytes: int) -> FileMetrics:
+        fm = FileMetrics(name, size, queue_files, queue_bytes)
+        self.files.append(fm)
+        return fm
+
+    def add(self, phase: str, seconds: float, nbytes: int = 0, fm: Optional[FileMetrics] = None, calls: int = 1):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.bytes[phase] = self.bytes.get(phase, 0) + nbytes
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+        if fm is not None:
+            fm.seconds[phase] = fm.seconds.get(phase, 0.0) + seconds
+            if nbytes: fm.bytes[phase] = fm.bytes.get(phase, 0) + nbytes
+
+    @contextmanager
+    def measure(self, phase: str, fm: Optional[FileMetrics] = None, nbytes: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start, nbytes, fm)
+
+    def finish_file(self, fm: FileMetrics, status: str):
+        fm.status = status
+        fm.elapsed = time.perf_counter() - fm.started
+        key = "VERIFIED" if status == "VERIFIED" else "ERROR"
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self._t0
+
+    # --- REPORTING ---
+    def summary(self) -> dict:
+        phases = {}
+        for p in self.seconds:
+            secs, nbytes = self.seconds[p], self.bytes[p]
+            phases[p] = {
+                "seconds": round(secs, 6),
+                "bytes": nbytes,
+                "calls": self.calls[p],
+                "mb_per_s": round(nbytes / secs / (1024 * 1024), 2) if secs > 0 and nbytes else None,
+            }
+        devices: Dict[str, float] = {}
+        for p, secs in self.seconds.items():
+            device = PHASE_DEVICE.get(p, "other")
+            devices[device] = devices.get(device, 0.0) + secs
+        busiest = max(devices, key=devices.get) if any(devices.values()) else None
+        queue = [f.queue_files for f in self.files]
+        return {
+            "started_at": self.started_at,
+            "elapsed": round(self.elapsed, 6),
+            "files": len(self.files),
+            "planned_files": self.total_files,
+            "planned_bytes": self.total_bytes,
+            "statuses": self.status_counts,
+            "phases": phases,
+            "device_seconds": {k: round(v, 6) for k, v in devices.items()},
+            "bottleneck": busiest,
+            "queue_depth_max": max(queue) if queue else 0,
+            "queue_depth_mean": round(sum(queue) / len(queue), 2) if queue else 0,
+        }
+
+    def to_dict(self) -> dict:
+        data = self.summary()
+        data["destination"] = self.dest_folder
+        data["per_file"] = [f.to_dict() for f in self.files]
+        return data
+
+    def write_json(self, path: str):
+        self._atomic_write(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str, job: str = "lastlook"):
+        """Node-exporter textfile format (job totals only; per-file detail lives in the JSON)"""
+        s = self.summary()
+        label = f'job="{job}"'
+        lines = [
+            "# HELP lastlook_transfer_phase_seconds Time spent per transfer phase in the last job.",
+            "# TYPE lastlook_transfer_phase_seconds gauge",
+        ]
+        lines += [f'lastlook_transfer_phase_seconds{{{label},phase="{p}"}} {v["seconds"]}' for p, v in s["phases"].items()]
+        lines += [
+            "# HELP lastlook_transfer_phase_bytes Bytes moved per transfer phase in the last job.",
+            "# TYPE lastlook_transfer_phase_bytes gauge",
+        ]
+        lines += [f'lastlook_transfer_phase_bytes{{{label},phase="{p}"}} {v["bytes"]}' for p, v in s["phases"].items()]
+        lines += [
+            "# HELP lastlook_transfer_files Files finished in the last job, by result.",
+            "# TYPE lastlook_transfer_files gauge",
+        ]
+        lines += [f'lastlook_transfer_files{{{label},result="{k.lower()}"}} {v}' for k, v in s["statuses"].items()]
+        lines += [
+            "# HELP lastlook_transfer_elapsed_seconds Wall time of the last job.",
+            "# TYPE lastlook_transfer_elapsed_seconds gauge",
+            f"lastlook_transfer_elapsed_seconds{{{label}}} {s['elapsed']}",
+            "# HELP lastlook_transfer_queue_depth_max Most files waiting at once in the last job.",
+            "# TYPE lastlook_transfer_queue_depth_max gauge",
+            f"lastlook_transfer_queue_depth_max{{{label}}} {s['queue_depth_max']}",
+            "# HELP lastlook_transfer_last_run_timestamp_seconds When the last job started.",
+            "# TYPE lastlook_transfer_last_run_timestamp_seconds gauge",
+            f"lastlook_transfer_last_run_timestamp_seconds{{{label}}} {s['started_at']:.0f}",
+        ]
+        self._atomic_write(path, "\n".join(lines) + "\n")
+
+    @staticmethod
+    def _atomic_write(path: str, text: str):
+        # Atomic: the collector (or a tailing script) never sees a half-written file
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path): os.remove(tmp_path)  # e.g. destination full
+            raise
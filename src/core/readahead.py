@@ -0,0 +1,119 @@
+import os
+import struct
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+WINDOW_FILES = 8                   # How many files ahead of the copy loop to look
+WINDOW_BYTES = 64 * 1024 * 1024    # Most card data requested ahead at once
+HEAD_BYTES = 16 * 1024 * 1024      # Per file: the kernel's own sequential read-ahead takes over after this
+F_RDADVISE = 44                    # macOS fcntl: struct radvisory { off_t ra_offset; int ra_count; }
+
+class ReadAhead:
+    """
+    Keeps the source card streaming across file boundaries.
+
+    Between two files the engine closes, copystats, hashes and verifies, and
+    only then opens the next file cold. This runs next to the copy loop and
+    asks the OS to start reading the first HEAD_BYTES of the next few files,
+    within WINDOW_FILES / WINDOW_BYTES. On Linux that is
+    posix_fadvise(WILLNEED), and on macOS fcntl(F_RDADVISE). Both are
+    asynchronous hints that fill the page cache. Elsewhere the bytes are
+    pre-read in chunks and thrown away. Either way the cache is warm, and
+    memory stays bounded by the window. Opening the files early also pulls
+    their directory entries off the card.
+
+    The engine calls advance(index) as it starts each file, and close() when done.
+    """
+
+    def __init__(self, items: List[Tuple[str, int]], window_files: int = WINDOW_FILES,
+                 window_bytes: int = WINDOW_BYTES, head_bytes: int = HEAD_BYTES, chunk_size: int = 1024 * 1024):
+        self.items = items
+        self.window_files = window_files
+        self.window_bytes = window_bytes
+        self.head_bytes = head_bytes
+        self.chunk_size = chunk_size
+        self._current = -1
+        self._issued = 0  # Next item to warm
+        self._ahead: List[Tuple[int, int]] = []  # (index, bytes requested) for items past the copy loop
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        # Totals for the metrics (written by the read-ahead thread, read after close())
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def start(self):
+        self._thread.start()
+
+    def advance(self, index: int):
+        with self._cond:
+            self._current = index
+            self._ahead = [(i, n) for i, n in self._ahead if i > index]
+            self._issued = max(self._issued, index + 1)  # Never warm what is already being copied
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    # --- INTERNALS ---
+    def _next(self):
+        """Under the lock: the next (index, path, nbytes) that fits in the window, or None"""
+        if self._issued >= len(self.items): return None
+        if self._issued > self._current + self.window_files: return None
+        in_flight = sum(n for _, n in self._ahead)
+        if in_flight >= self.window_bytes: return None
+        path, size = self.items[self._issued]
+        nbytes = min(size, self.head_bytes, self.window_bytes - in_flight)
+        index = self._issued
+        self._issued += 1
+        self._ahead.append((index, nbytes))
+        return index, path, nbytes
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next()
+                if self._closed: return
+            start = time.perf_counter()
+            try:
+                self._warm(job[1], job[2])
+                self.files += 1
+                self.bytes += job[2]
+            except OSError:
+                pass  # Only a hint: the copy loop reports real read errors
+            self.seconds += time.perf_counter() - start
+
+    def _warm(self, path: str, nbytes: int):
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, nbytes, os.POSIX_FADV_WILLNEED)
+                return
+            if sys.platform == "darwin" and fcntl is not None:
+                try:
+                    fcntl.fcntl(fd, F_RDADVISE, struct.pack("qi4x", 0, nbytes))
+                    return
+                except OSError:
+                    pass
+            # Fallback: read and discard (bounded by nbytes; stops early if the engine moved past it)
+            done = 0
+            while done < nbytes and not self._closed:
+                chunk = os.read(fd, min(self.chunk_size, nbytes - done))
+                if not chunk: break
+                done += len(chunk)
+        finally:
+            os.close(fd)
@@ -1,6 +1,19 @@
 import os
-from typing import List, Dict
+import re
+from typing import List, Dict, Optional
 from ..model.file_obj import FileObj, SyncStatus
+from ..model.sequence import SequenceObj
+from .governor import GOVERNOR
+from .manifest import ManifestCatalog
+
+# --- IMAGE SEQUENCES ---
+# Numbered frames with these extensions collapse into one SequenceObj.
+SEQUENCE_EXTENSIONS = {'.dpx', '.exr', '.tif', '.tiff', '.dng'}
+# Loose numbered DNGs / TIFFs at the card root are stills (DSC_0001.dng, IMG_0001.tif),
+# not CinemaDNG or TIFF plates. Those always live in their own folder.
+ROOT_SEQUENCE_EXTENSIONS = SEQUENCE_EXTENSIONS - {'.dng', '.tif', '.tiff'}
+MIN_SEQUENCE_FRAMES = 2
+FRAME_PATTERN = re.compile(r'^(.*?)(\d+)(\.[^.]+)$')
 
 class Scanner:
     @staticmethod
@@ -8,58 +21,150 @@ class Scanner:
         """
         Scans a directory and returns a list of FileObj instances.
         Uses os.scandir for better performance on large directories.
+        Numbered frame sequences (at the top level, or one folder deep for
+        CinemaDNG / per-shot folders) come back as a single SequenceObj each.
         """
         results = []
         if not path or not os.path.exists(path):
             return results
 
+        subfolders = []
         try:
-            with os.scandir(path) as it:
-                for entry in it:
-                    if entry.is_file() and not entry.name.startswith('.'):
-                        stat = entry.stat()
-                        file_obj = FileObj(
-                            id=entry.path, # Using path as ID for MVP
-                            filename=entry.name,
-                            path=entry.path,
-                            size=stat.st_size,
-                            date_modified=stat.st_mtime,
-                            file_type=FileObj.determine_type(entry.name),
-                            status=SyncStatus.MISSING # Default to Missing
-                        )
-                        results.append(file_obj)
+            results = Scanner._scan_folder(path, "", ROOT_SEQUENCE_EXTENSIONS, subfolders, loose_files=True)
         except PermissionError:
             print(f"Permission denied accessing {path}")
-        
+
+        # Sub-folders only contribute sequences (a clip folder per shot)
+        for name in subfolders:
+            try:
+                results.extend(Scanner._scan_folder(os.path.join(path, name), name, SEQUENCE_EXTENSIONS,
+                                                    None, loose_files=False))
+            except PermissionError:
+                print(f"Permission denied accessing {os.path.join(path, name)}")
+
         return results
 
     @staticmethod
-    def compare_directories(source_files: List[FileObj], dest_path: str) -> List[FileObj]:
-        """
-        The 'Heartbeat' Logic. 
-        Iterates through source files and checks if they exist in the destination 
-        with matching file size.
-        """
-        # Create a map of destination files for O(1) lookup speed
-        dest_map = {} # Key: Filename, Value: Size
-        
-        if os.path.exists(dest_path):
+    def _scan_folder(folder: str, rel_dir: str, seq_exts, subfolders, loose_files: bool) -> List[FileObj]:
+        # Order of first appearance: each entry is a FileObj or a sequence group key
+        order = []
+        groups: Dict[tuple, list] = {}
+        entries = 0
+
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.startswith('.'): continue
+                if entry.is_dir():
+                    if subfolders is not None: subfolders.append(entry.name)
+                    continue
+                if not entry.is_file(): continue
+
+                stat = entry.stat()
+                match = FRAME_PATTERN.match(entry.name)
+                if match and match.group(3).lower() in seq_exts:
+                    key = (match.group(1), match.group(3))
+                    if key not in groups:
+                        groups[key] = []
+                        order.append(key)
+                    groups[key].append((match.group(2), stat.st_size, stat.st_mtime, entry))
+                    continue
+
+                if loose_files:
+                    order.append(Scanner._file_obj(entry, stat, rel_dir))
+                entries += 1
+
+        # UI rescans during a transfer are metered (no-op for the transfer's own scans)
+        GOVERNOR.throttle_background(ops=entries)
+
+        results = []
+        for item in order:
+            if isinstance(item, FileObj):
+                results.append(item)
+                continue
+            members = groups[item]
+            sequence = Scanner._build_sequence(folder, rel_dir, item, members)
+            if sequence:
+                results.append(sequence)
+            elif loose_files:
+                results.extend(Scanner._file_obj(entry, None, rel_dir) for _, _, _, entry in members)
+        return results
+
+    @staticmethod
+    def _build_sequence(folder, rel_dir, key, members):
+        if len(members) < MIN_SEQUENCE_FRAMES: return None
+        padding = min(len(digits) for digits, _, _, _ in members)
+        # Frame names must rebuild exactly from (prefix, number, padding); mixed padding stays as files
+        for digits, _, _, _ in members:
+            if f"{int(digits):0{padding}d}" != digits: return None
+        prefix, extension = key
+        entries = [(int(digits), size, mtime) for digits, size, mtime, _ in members]
+        return SequenceObj.build(folder, rel_dir, prefix, extension, padding, entries)
+
+    @staticmethod
+    def _file_obj(entry, stat, rel_dir) -> FileObj:
+        stat = stat or entry.stat()
+        return FileObj(
+            id=entry.path, # Using path as ID for MVP
+            filename=entry.name,
+            path=entry.path,
+            size=stat.st_size,
+            date_modified=stat.st_mtime,
+            file_type=FileObj.determine_type(entry.name),
+            status=SyncStatus.MISSING, # Default to Missing
+            rel_path=os.path.join(rel_dir, entry.name) if rel_dir else ""
+        )
+
+    @staticmethod
+    def _dest_listing(dest_path: str, rel_dir: str, cache: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+        """filename -> size for one destination folder (each folder is listed once)"""
+        if rel_dir in cache:
+            return cache[rel_dir]
+        listing = {}
+        folder = os.path.join(dest_path, rel_dir) if rel_dir else dest_path
+        if os.path.exists(folder):
             try:
-                with os.scandir(dest_path) as it:
+                with os.scandir(folder) as it:
                     for entry in it:
                         if entry.is_file():
-                            dest_map[entry.name] = entry.stat().st_size
+                            listing[entry.name] = entry.stat().st_size
+                GOVERNOR.throttle_background(ops=len(listing))
             except Exception as e:
                 print(f"Error scanning destination: {e}")
+        cache[rel_dir] = listing
+        return listing
+
+    @staticmethod
+    def compare_directories(source_files: List[FileObj], dest_path: Optional[str],
+                            catalog: Optional[ManifestCatalog] = None) -> List[FileObj]:
+        """
+        The 'Heartbeat' Logic.
+        Iterates through source files and checks if they exist in the destination
+        with matching file size. Sequences are compared frame by frame.
+        With a ManifestCatalog, a file is also SYNCED when a prior manifest
+        verified it. dest_path may then be None: the drive is never touched.
+        """
+        # Maps of destination folders for O(1) lookup speed
+        listings = {} # Key: rel_dir, Value: {filename: size}
+        dest_map = Scanner._dest_listing(dest_path, "", listings) if dest_path else {}
 
         # Compare logic
         for src_file in source_files:
+            if isinstance(src_file, SequenceObj):
+                frames_map = Scanner._dest_listing(dest_path, src_file.rel_dir, listings) if dest_path else {}
+                src_file.set_all_status(SyncStatus.MISSING)
+                for i in range(src_file.frame_count):
+                    size = src_file.frame_sizes[i]
+                    if frames_map.get(src_file.frame_name(i)) == size or \
+                            (catalog and catalog.lookup(src_file.frame_rel_path(i), size)):
+                        src_file.set_frame_status(i, SyncStatus.SYNCED)
+                continue
+
             dest_size = dest_map.get(src_file.filename)
-            
-            # MATCH CONDITION: Filename exists AND Size matches
-            if dest_size is not None and dest_size == src_file.size:
+
+            # MATCH CONDITION: Filename exists AND Size matches (on the drive, or in a manifest)
+            if (dest_size is not None and dest_size == src_file.size) or (catalog and catalog.contains(src_file)):
                 src_file.status = SyncStatus.SYNCED
             else:
                 src_file.status = SyncStatus.MISSING
-                
-        return source_files
\ No newline at end of file
+
+        return source_files
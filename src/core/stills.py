@@ -0,0 +1,200 @@
+import io
+import os
+import struct
+from typing import List, Optional, Tuple
+from PIL import Image
+from .governor import GOVERNOR
+
+RAW_EXTENSIONS = {'.arw', '.cr2', '.dng', '.nef', '.raf'}
+
+# TIFF tags we care about
+TAG_NEW_SUBFILE_TYPE = 0x00FE
+TAG_COMPRESSION = 0x0103
+TAG_STRIP_OFFSETS = 0x0111
+TAG_ORIENTATION = 0x0112
+TAG_STRIP_BYTE_COUNTS = 0x0117
+TAG_SUB_IFDS = 0x014A
+TAG_JPEG_OFFSET = 0x0201
+TAG_JPEG_LENGTH = 0x0202
+
+# TIFF type -> (struct code, byte size)
+TIFF_TYPES = {3: ("H", 2), 4: ("I", 4), 13: ("I", 4)}
+
+# EXIF orientation -> PIL transpose
+ORIENTATION_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+class StillPreviewExtractor:
+    """
+    Fast previews for stills.
+
+    RAW (ARW/CR2/NEF/DNG/RAF): every one of these carries a camera-rendered JPEG
+    preview. We walk only the TIFF IFD headers (a few KB), pick the smallest
+    embedded JPEG that is still big enough, and read just those bytes instead of
+    the whole 60 MB file.
+
+    JPEG: PIL's draft() asks libjpeg to decode at 1/2, 1/4 or 1/8 scale, so a
+    24 MP frame is never fully decoded.
+    """
+    MAX_IFDS = 32
+    PROBE_BYTES = 4096  # Enough to reach the SOF marker of an embedded preview
+
+    # --- PUBLIC ---
+    @staticmethod
+    def generate_preview(path: str, token=None, size: Tuple[int, int] = (400, 220)) -> Optional[Image.Image]:
+        """Returns a PIL image fitting inside `size`, or None."""
+        if token and token.cancelled:
+            return None
+        ext = os.path.splitext(path)[1].lower()
+        try:
+            if ext in RAW_EXTENSIONS:
+                found = StillPreviewExtractor.extract_embedded_jpeg(path, min_width=size[0])
+                if not found:
+                    return None
+                data, orientation = found
+                GOVERNOR.throttle_background(len(data))
+                img = Image.open(io.BytesIO(data))
+                img = StillPreviewExtractor._decode_reduced(img, size)
+                transpose = ORIENTATION_TRANSPOSE.get(orientation)
+                return img.transpose(transpose) if transpose is not None else img
+
+            GOVERNOR.throttle_background(os.path.getsize(path))
+            with Image.open(path) as f:
+                orientation = f.getexif().get(TAG_ORIENTATION, 1)
+                img = StillPreviewExtractor._decode_reduced(f, size)
+            transpose = ORIENTATION_TRANSPOSE.get(orientation)
+            return img.transpose(transpose) if transpose is not None else img
+
+        except Exception as e:
+            print(f"Still preview failed for {path}: {e}")
+            return None
+
+    @staticmethod
+    def extract_embedded_jpeg(path: str, min_width: int = 400) -> Optional[Tuple[bytes, int]]:
+        """Returns (jpeg_bytes, exif_orientation) for the best embedded preview, or None."""
+        with open(path, "rb") as f:
+            head = f.read(16)
+            if head.startswith(b"FUJIFILMCCD-RAW"):
+                return StillPreviewExtractor._raf_preview(f)
+            if head[:4] in (b"II*\x00", b"MM\x00*"):
+                return StillPreviewExtractor._tiff_preview(f, "<" if head[:2] == b"II" else ">", min_width)
+        return None
+
+    # --- DECODING ---
+    @staticmethod
+    def _decode_reduced(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        # draft() only has an effect on JPEGs; it picks the smallest DCT scale >= size
+        img.draft("RGB", size)
+        img = img.convert("RGB")
+        img.thumbnail(size, Image.BILINEAR)
+        return img
+
+    # --- RAF (Fuji) ---
+    @staticmethod
+    def _raf_preview(f) -> Optional[Tuple[bytes, int]]:
+        # Fixed header: big-endian JPEG offset/length at byte 84
+        f.seek(84)
+        offset, length = struct.unpack(">II", f.read(8))
+        f.seek(offset)
+        data = f.read(length)
+        return (data, 1) if data[:2] == b"\xff\xd8" else None
+
+    # --- TIFF-based RAW (ARW, CR2, NEF, DNG) ---
+    @staticmethod
+    def _read_ifd(f, endian: str, offset: int):
+        """Returns ({tag: [values]}, next_ifd_offset). Only SHORT/LONG tags are decoded."""
+        f.seek(offset)
+        raw = f.read(2)
+        if len(raw) < 2: return {}, 0
+        (count,) = struct.unpack(endian + "H", raw)
+        entries = f.read(count * 12 + 4)
+        if len(entries) < count * 12 + 4: return {}, 0
+
+        tags = {}
+        for i in range(count):
+            tag, typ, n, value = struct.unpack_from(endian + "HHI4s", entries, i * 12)
+            if typ not in TIFF_TYPES or n == 0: continue
+            code, width = TIFF_TYPES[typ]
+            if n * width <= 4:
+                tags[tag] = list(struct.unpack_from(endian + code * n, value))
+            elif n <= 64:  # Out-of-line arrays (e.g. SubIFDs); keep it bounded
+                (ptr,) = struct.unpack(endian + "I", value)
+                here = f.tell()
+                f.seek(ptr)
+                tags[tag] = list(struct.unpack(endian + code * n, f.read(n * width)))
+                f.seek(here)
+        (next_offset,) = struct.unpack_from(endian + "I", entries, count * 12)
+        return tags, next_offset
+
+    @staticmethod
+    def _jpeg_size(f, offset: int) -> Optional[Tuple[int, int]]:
+        """Reads (width, height) from the SOF marker near the start of an embedded JPEG."""
+        f.seek(offset)
+        data = f.read(StillPreviewExtractor.PROBE_BYTES)
+        if data[:2] != b"\xff\xd8": return None
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xC0, 0xC1, 0xC2):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            if marker == 0xD8 or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            (seg_len,) = struct.unpack(">H", data[i + 2:i + 4])
+            i += 2 + seg_len
+        return None
+
+    @staticmethod
+    def _tiff_preview(f, endian: str, min_width: int) -> Optional[Tuple[bytes, int]]:
+        f.seek(4)
+        (first,) = struct.unpack(endian + "I", f.read(4))
+
+        candidates: List[Tuple[int, int]] = []  # (offset, length)
+        orientation = 1
+        pending, seen = [first], set()
+
+        while pending and len(seen) < StillPreviewExtractor.MAX_IFDS:
+            offset = pending.pop(0)
+            if not offset or offset in seen: continue
+            seen.add(offset)
+            tags, next_offset = StillPreviewExtractor._read_ifd(f, endian, offset)
+            if offset == first:
+                orientation = tags.get(TAG_ORIENTATION, [1])[0]
+            pending.append(next_offset)
+            pending.extend(tags.get(TAG_SUB_IFDS, []))
+
+            # a) Classic embedded JPEG (ARW, NEF, CR2 thumbnail, DNG previews)
+            if TAG_JPEG_OFFSET in tags and TAG_JPEG_LENGTH in tags:
+                candidates.append((tags[TAG_JPEG_OFFSET][0], tags[TAG_JPEG_LENGTH][0]))
+
+            # b) JPEG stored as a single strip (CR2 IFD0, DNG reduced-resolution previews).
+            # Compression 7 in a full-resolution DNG IFD is *lossless* JPEG raw data: skip it.
+            compression = tags.get(TAG_COMPRESSION, [1])[0]
+            is_preview = tags.get(TAG_NEW_SUBFILE_TYPE, [0])[0] & 1
+            strips, counts = tags.get(TAG_STRIP_OFFSETS, []), tags.get(TAG_STRIP_BYTE_COUNTS, [])
+            if len(strips) == 1 and len(counts) == 1 and (compression == 6 or (compression == 7 and is_preview)):
+                candidates.append((strips[0], counts[0]))
+
+        # Smallest preview that is at least min_width wide, else the biggest we found
+        sized = []
+        for offset, length in candidates:
+            dims = StillPreviewExtractor._jpeg_size(f, offset)
+            if dims: sized.append((dims[0], length, offset))
+        if not sized:
+            return None
+        big_enough = [c for c in sized if c[0] >= min_width]
+        _, length, offset = min(big_enough, key=lambda c: c[0]) if big_enough else max(sized)
+
+        f.seek(offset)
+        return f.read(length), orientation
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from PIL import Image
+from ..utils.assets import get_cache_dir
+
+class ThumbnailCache:
+    """
+    Two-tier thumbnail cache.
+
+    Tier 1 (RAM): LRU of decoded PIL images, bounded by decoded bytes.
+    Tier 2 (Disk): small JPEGs keyed by (path, size, mtime), bounded by total
+    bytes on disk. It survives restarts, so a reopened card doesn't pay
+    ffmpeg again. A changed file gets a new key, so stale entries simply age out.
+    """
+    THUMB_SIZE = (400, 220)   # 2x the Inspector preview, for HiDPI
+    JPEG_QUALITY = 85
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 memory_limit: int = 64 * 1024 * 1024,
+                 disk_limit: int = 512 * 1024 * 1024):
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._lock = threading.Lock()
+
+        # Tier 1
+        self._memory: "OrderedDict[str, Tuple[Image.Image, int]]" = OrderedDict()
+        self._memory_bytes = 0
+
+        # Tier 2
+        try:
+            self.cache_dir = cache_dir or get_cache_dir("thumbnails")
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Thumbnail disk cache disabled: {e}")
+            self.cache_dir = None
+        self._disk_bytes = None  # Measured lazily on the first write (keeps startup off the disk)
+
+        # Counters (for tuning)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions_memory = 0
+        self.evictions_disk = 0
+
+    # --- KEYS ---
+    @staticmethod
+    def key_for(path: str, size: int, mtime: float, kind: str = "thumb") -> str:
+        raw = f"{kind}|{os.path.abspath(path)}|{size}|{int(mtime)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str, ext: str = ".jpg") -> str:
+        # Two-level fan-out keeps directories small on big caches
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    # --- LOOKUP ---
+    def get_memory(self, key: str) -> Optional[Image.Image]:
+        """RAM tier only. Cheap enough for the main thread."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """RAM, then disk (promoting to RAM). Disk reads belong on a worker thread."""
+        img = self.get_memory(key)
+        if img is not None:
+            return img
+
+        if self.cache_dir:
+            disk_path = self._disk_path(key)
+            try:
+                with Image.open(disk_path) as f:
+                    img = f.convert("RGB")
+                os.utime(disk_path)  # Bump recency for disk eviction
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, img)
+                return img
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # --- STORE ---
+    def put(self, key: str, img: Image.Image) -> Image.Image:
+        """Downscales to THUMB_SIZE, keeps it in RAM and persists it. Returns the stored image."""
+        if img.width > self.THUMB_SIZE[0] or img.height > self.THUMB_SIZE[1]:
+            img = img.copy()
+            img.thumbnail(self.THUMB_SIZE, Image.BILINEAR)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        self._remember(key, img)
+
+        if self.cache_dir:
+            disk_path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+                tmp_path = disk_path + ".tmp"
+                img.save(tmp_path, "JPEG", quality=self.JPEG_QUALITY)
+                os.replace(tmp_path, disk_path)  # Atomic: never leave a half-written thumbnail
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._measure_disk()
+                else:
+                    with self._lock:
+                        self._disk_bytes += os.path.getsize(disk_path)
+                over = self._disk_bytes > self.disk_limit
+                if over:
+                    self._evict_disk()
+            except OSError as e:
+                print(f"Thumbnail cache write failed: {e}")
+        return img
+
+    def _remember(self, key: str, img: Image.Image):
+        cost = img.width * img.height * len(img.getbands())
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old: self._memory_bytes -= old[1]
+            self._memory[key] = (img, cost)
+            self._memory_bytes += cost
+            # Evict least-recently-used until we fit (always keep the newest)
+            while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+                _, (_, evicted_cost) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_cost
+                self.evictions_memory += 1
+
+    # --- DISK HOUSEKEEPING ---
+    def _disk_entries(self):
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"): continue
+                full = os.path.join(root, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                yield full, st.st_size, st.st_mtime
+
+    def _measure_disk(self) -> int:
+        if not self.cache_dir: return 0
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _evict_disk(self):
+        """Drops the least-recently-used files until the store is back under 90% of its limit."""
+        target = int(self.disk_limit * 0.9)
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        with self._lock:
+            total = sum(size for _, size, _ in entries)
+            for full, size, _ in entries:
+                if total <= target: break
+                try:
+                    os.remove(full)
+                    total -= size
+                    self.evictions_disk += 1
+                except OSError:
+                    pass
+            self._disk_bytes = total
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes or 0,
+                "evictions_memory": self.evictions_memory,
+                "evictions_disk": self.evictions_disk,
+            }
@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import threading
+from enum import IntEnum
+from typing import Callable, Dict, Iterable, List, Optional
+from ..model.file_obj import FileObj
+from ..model.types import FileType, PREVIEW_TYPES
+from .governor import GOVERNOR
+from .stills import StillPreviewExtractor
+from .thumb_cache import ThumbnailCache
+from .thumbnails import CancelToken, ThumbnailGenerator
+from .waveform import WaveformGenerator
+
+def generate_preview(file_obj: FileObj, token: CancelToken):
+    """Picks the generator by type: stills never touch ffmpeg, audio gets a waveform."""
+    if file_obj.file_type == FileType.IMAGE:
+        return StillPreviewExtractor.generate_preview(file_obj.path, token)
+    if file_obj.file_type == FileType.AUDIO:
+        return WaveformGenerator.generate(file_obj.path, token)
+    return ThumbnailGenerator.generate_thumbnail(file_obj.path, token)
+
+class ThumbPriority(IntEnum):
+    SELECTED = 0   # The file in the Inspector right now
+    VISIBLE = 1    # Rows on screen
+    NEIGHBOR = 2   # Rows just off screen / next to the selection
+
+class ThumbnailJob:
+    def __init__(self, key: str, file_obj: FileObj, priority: ThumbPriority):
+        self.key = key
+        self.file_obj = file_obj
+        self.priority = priority
+        self.token = CancelToken()
+        self.callbacks: List[Callable] = []
+        self.started = False
+
+class ThumbnailService:
+    """
+    Prioritized, cancellable thumbnail pool.
+
+    Jobs are ordered SELECTED > VISIBLE > NEIGHBOR and run on up to
+    `max_workers` threads, so a whole visible page fills in parallel while the
+    clip in the Inspector always jumps the queue. Stale jobs are cancelled,
+    including killing an ffmpeg that is already decoding.
+    Results land in the shared ThumbnailCache; callbacks fire on the worker
+    thread with (file_obj, pil_image_or_None).
+    """
+
+    def __init__(self, cache: ThumbnailCache, max_workers: int = 3,
+                 generate: Callable[[FileObj, CancelToken], object] = generate_preview):
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self._generate = generate
+
+        self._cond = threading.Condition()
+        self._heap = []                     # (priority, seq, job) with lazy deletion
+        self._seq = itertools.count()
+        self._jobs: Dict[str, ThumbnailJob] = {}
+        self._selected_key: Optional[str] = None
+        self._visible_keys = set()
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+        # Counters (for tuning)
+        self.completed = 0
+        self.cancelled = 0
+
+    @staticmethod
+    def key_for(file_obj: FileObj) -> str:
+        return ThumbnailCache.key_for(file_obj.path, file_obj.size, file_obj.date_modified)
+
+    # --- REQUESTS ---
+    def request(self, file_obj: FileObj, priority: ThumbPriority, callback: Optional[Callable] = None) -> str:
+        """Queues (or re-prioritizes) a thumbnail. Duplicate requests share one job."""
+        key = self.key_for(file_obj)
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is None:
+                job = ThumbnailJob(key, file_obj, priority)
+                self._jobs[key] = job
+                self._push(job)
+            elif priority < job.priority and not job.started:
+                job.priority = priority
+                self._push(job)  # Old heap entry becomes stale and is skipped
+            if callback:
+                job.callbacks.append(callback)
+            self._ensure_workers()
+        return key
+
+    def select(self, file_obj: FileObj, callback: Callable, neighbors: Iterable[FileObj] = ()):
+        """The Inspector's file: runs first. The previous selection is cancelled unless it is on screen."""
+        self.release_selection(keep_key=self.key_for(file_obj))
+        with self._cond:
+            self._selected_key = self.key_for(file_obj)
+        self.request(file_obj, ThumbPriority.SELECTED, callback)
+        for neighbor in neighbors:
+            self.request(neighbor, ThumbPriority.NEIGHBOR)
+
+    def release_selection(self, keep_key: Optional[str] = None):
+        """The Inspector moved on: drop (or demote, if still on screen) the selected job."""
+        with self._cond:
+            old_key, self._selected_key = self._selected_key, None
+            old = self._jobs.get(old_key) if old_key != keep_key else None
+            if old is None or old.priority != ThumbPriority.SELECTED: return
+            old.callbacks.clear()
+            if old_key in self._visible_keys:
+                # Still on screen: keep it as a prefetch instead of throwing the work away
+                old.priority = ThumbPriority.VISIBLE
+                if not old.started: self._push(old)
+            else:
+                self._cancel(old)
+
+    def set_visible(self, visible: Iterable[FileObj], neighbors: Iterable[FileObj] = ()):
+        """Replaces the prefetch set. Prefetch jobs that scrolled away are cancelled."""
+        wanted = {}
+        for f in neighbors:
+            wanted[self.key_for(f)] = (f, ThumbPriority.NEIGHBOR)
+        for f in visible:
+            wanted[self.key_for(f)] = (f, ThumbPriority.VISIBLE)
+
+        with self._cond:
+            self._visible_keys = set(wanted)
+            for key, job in list(self._jobs.items()):
+                if job.priority != ThumbPriority.SELECTED and key not in wanted:
+                    self._cancel(job)
+        for f, priority in wanted.values():
+            self.request(f, priority)
+
+    def cancel_all(self):
+        with self._cond:
+            for job in list(self._jobs.values()):
+                self._cancel(job)
+            self._selected_key = None
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+    # --- INTERNALS (hold self._cond) ---
+    def _push(self, job: ThumbnailJob):
+        heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+        self._cond.notify()
+
+    def _cancel(self, job: ThumbnailJob):
+        job.token.cancel()  # Kills ffmpeg if it is already running
+        job.callbacks.clear()
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        self.cancelled += 1
+
+    def _ensure_workers(self):
+        pending = sum(1 for j in self._jobs.values() if not j.started)
+        while len(self._workers) < min(self.max_workers, pending):
+            worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self) -> Optional[ThumbnailJob]:
+        with self._cond:
+            while True:
+                if self._shutdown:
+                    self._workers.remove(threading.current_thread())
+                    return None
+                while self._heap:
+                    priority, _, job = heapq.heappop(self._heap)
+                    # Lazy deletion: skip cancelled, finished, started or re-prioritized entries
+                    if job.started or job.token.cancelled or priority != job.priority: continue
+                    if self._jobs.get(job.key) is not job: continue
+                    job.started = True
+                    return job
+                # Idle workers exit after a while; _ensure_workers restarts them on demand
+                if not self._cond.wait(timeout=30) and not self._heap:
+                    self._workers.remove(threading.current_thread())
+                    return None
+
+    # --- WORKER ---
+    def _worker_loop(self):
+        GOVERNOR.mark_background()
+        while True:
+            job = self._next_job()
+            if job is None: return
+
+            img = None
+            try:
+                img = self.cache.get(job.key)
+                if img is None and not job.token.cancelled:
+                    img = self._generate(job.file_obj, job.token)
+                    if img is not None and not job.token.cancelled:
+                        img = self.cache.put(job.key, img)
+            except Exception as e:
+                print(f"Thumbnail job failed for {job.file_obj.filename}: {e}")
+                img = None
+
+            with self._cond:
+                callbacks = list(job.callbacks) if not job.token.cancelled else []
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                if not job.token.cancelled:
+                    self.completed += 1
+
+            for callback in callbacks:
+                try:
+                    callback(job.file_obj, img)
+                except Exception as e:
+                    print(f"Thumbnail callback error: {e}")
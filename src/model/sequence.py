@@ -0,0 +1,169 @@
+import os
+from array import array
+from dataclasses import dataclass, field, replace
+from typing import Iterator, List, Tuple
+from .file_obj import FileObj
+from .types import FileType, SyncStatus
+
+# Per-frame status is stored as one byte per frame (index into this tuple)
+STATUS_ORDER = tuple(SyncStatus)
+STATUS_CODE = {status: code for code, status in enumerate(STATUS_ORDER)}
+
+@dataclass
+class SequenceObj(FileObj):
+    """
+    One row for a whole numbered frame sequence (DPX/EXR/TIFF/CinemaDNG).
+
+    The frames themselves live in compact arrays (frame number, size, status),
+    so a 10,000-frame pull costs one FileObj and ~13 bytes per frame instead of
+    10,000 FileObjs and 10,000 rows. `size` is the total, `status` is the
+    aggregate (ERROR > in-flight > MISSING > SYNCED).
+    Transfer, compare and the manifest still work per frame via frame_file().
+    """
+    directory: str = ""      # Absolute folder holding the frames
+    rel_dir: str = ""        # Folder relative to the source root ("" = top level)
+    prefix: str = ""         # "A001_C003." in "A001_C003.001001.dpx"
+    extension: str = ""      # ".dpx"
+    padding: int = 0         # Minimum digit count of the frame number
+    frames: array = field(default_factory=lambda: array('q'), repr=False)
+    frame_sizes: array = field(default_factory=lambda: array('q'), repr=False)
+    frame_status: array = field(default_factory=lambda: array('B'), repr=False)
+    _counts: List[int] = field(default_factory=lambda: [0] * len(STATUS_ORDER), repr=False, compare=False)
+
+    # --- CONSTRUCTION ---
+    @classmethod
+    def build(cls, directory: str, rel_dir: str, prefix: str, extension: str, padding: int,
+              entries: List[Tuple[int, int, float]]) -> "SequenceObj":
+        """entries: (frame_number, size, mtime) in any order"""
+        entries = sorted(entries)
+        first, last = entries[0][0], entries[-1][0]
+        pattern = f"{prefix}{'#' * max(padding, 1)}{extension}"
+        label = f"{prefix}[{first:0{padding}d}-{last:0{padding}d}]{extension}"
+        seq = cls(
+            id=os.path.join(directory, pattern),
+            filename=os.path.join(rel_dir, label) if rel_dir else label,
+            path=os.path.join(directory, pattern),
+            size=sum(e[1] for e in entries),
+            date_modified=max(e[2] for e in entries),
+            file_type=FileType.SEQUENCE,
+            rel_path=os.path.join(rel_dir, pattern) if rel_dir else pattern,
+            directory=directory,
+            rel_dir=rel_dir,
+            prefix=prefix,
+            extension=extension,
+            padding=padding,
+            frames=array('q', (e[0] for e in entries)),
+            frame_sizes=array('q', (e[1] for e in entries)),
+            frame_status=array('B', bytes(len(entries))),
+        )
+        seq.set_all_status(SyncStatus.MISSING)
+        return seq
+
+    # --- FRAME RANGE ---
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def first_frame(self) -> int:
+        return self.frames[0]
+
+    @property
+    def last_frame(self) -> int:
+        return self.frames[-1]
+
+    def gaps(self) -> List[Tuple[int, int]]:
+        """Missing frame numbers as inclusive (start, end) ranges"""
+        result = []
+        for prev, cur in zip(self.frames, self.frames[1:]):
+            if cur - prev > 1:
+                result.append((prev + 1, cur - 1))
+        return result
+
+    def footprint(self, block_size: int) -> Tuple[int, int]:
+        """Every frame rounded to whole blocks, plus a block and an inode for the clip folder"""
+        nbytes = sum(-(-size // block_size) for size in self.frame_sizes) * block_size
+        if self.rel_dir:
+            return nbytes + block_size, self.frame_count + 1
+        return nbytes, self.frame_count
+
+    # --- PER-FRAME ACCESS ---
+    def frame_name(self, index: int) -> str:
+        return f"{self.prefix}{self.frames[index]:0{self.padding}d}{self.extension}"
+
+    def frame_rel_path(self, index: int) -> str:
+        name = self.frame_name(index)
+        return os.path.join(self.rel_dir, name) if self.rel_dir else name
+
+    def frame_file(self, index: int) -> FileObj:
+        """A transient FileObj for one frame (built on demand, never stored)"""
+        name = self.frame_name(index)
+        path = os.path.join(self.directory, name)
+        return FileObj(
+            id=path,
+            filename=name,
+            path=path,
+            size=self.frame_sizes[index],
+            date_modified=self.date_modified,
+            file_type=FileType.OTHER,
+            status=STATUS_ORDER[self.frame_status[index]],
+            rel_path=self.frame_rel_path(index),
+        )
+
+    def frame_indices_with_status(self, status: SyncStatus) -> Iterator[int]:
+        code = STATUS_CODE[status]
+        return (i for i, c in enumerate(self.frame_status) if c == code)
+
+    # --- STATUS ---
+    def count_with_status(self, status: SyncStatus) -> int:
+        return self._counts[STATUS_CODE[status]]
+
+    def bytes_with_status(self, status: SyncStatus) -> int:
+        return sum(self.frame_sizes[i] for i in self.frame_indices_with_status(status))
+
+    @property
+    def missing_size(self) -> int:
+        """Only the frames not on the destination yet (a stopped offload leaves some synced)"""
+        return self.bytes_with_status(SyncStatus.MISSING)
+
+    def copy(self) -> "SequenceObj":
+        # Frame numbers and sizes never change after a scan; only the status arrays are per copy
+        return replace(self, frame_status=array('B', self.frame_status), _counts=list(self._counts))
+
+    def apply_status(self, other: FileObj):
+        if isinstance(other, SequenceObj) and other.frames == self.frames:
+            self.frame_status = array('B', other.frame_status)
+            self._counts = list(other._counts)
+        self.status = other.status
+
+    def set_frame_status(self, index: int, status: SyncStatus):
+        """O(1): keeps per-status counts so the aggregate never rescans the frames"""
+        old, new = self.frame_status[index], STATUS_CODE[status]
+        if old == new: return
+        self._counts[old] -= 1
+        self._counts[new] += 1
+        self.frame_status[index] = new
+        self.status = self._aggregate()
+
+    def set_all_status(self, status: SyncStatus):
+        code = STATUS_CODE[status]
+        self.frame_status = array('B', bytes([code]) * len(self.frames))
+        self._counts = [0] * len(STATUS_ORDER)
+        self._counts[code] = len(self.frames)
+        self.status = status
+
+    def _aggregate(self) -> SyncStatus:
+        count = lambda status: self._counts[STATUS_CODE[status]]
+        if count(SyncStatus.ERROR):
+            return SyncStatus.ERROR
+        # Queued + in-flight frames read as one transfer (no flicker between frames)
+        active = count(SyncStatus.TRANSFERRING) + count(SyncStatus.VERIFYING)
+        if active:
+            in_flight = active + count(SyncStatus.PENDING)
+            return SyncStatus.VERIFYING if in_flight == count(SyncStatus.VERIFYING) else SyncStatus.TRANSFERRING
+        # Only queued frames: waiting behind another file of the job
+        if count(SyncStatus.PENDING):
+            return SyncStatus.PENDING
+        if count(SyncStatus.MISSING):
+            return SyncStatus.MISSING
+        return SyncStatus.SYNCED
@@ -4,8 +4,12 @@ class FileType(Enum):
     IMAGE = auto()
     VIDEO = auto()
     AUDIO = auto()
+    SEQUENCE = auto()  # Numbered frames (DPX/EXR/TIFF/CinemaDNG) collapsed into one entry
     OTHER = auto()
 
+# Types the Inspector can show a picture for (video frame grab / embedded still preview / waveform)
+PREVIEW_TYPES = (FileType.VIDEO, FileType.IMAGE, FileType.AUDIO)
+
 class SyncStatus(Enum):
     MISSING = "missing"           # Exists in Source, NOT in Destination (Red)
     SYNCED = "synced"             # Exists in both (Name + Size match) (Green)
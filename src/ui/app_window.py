@@ -1,16 +1,28 @@
 import customtkinter as ctk
 import tkinter.filedialog as filedialog
 import os
+import time
 import concurrent.futures
-from PIL import Image
-from .panels import FileListPanel, InspectorPanel
+from .panels import FileListPanel, InspectorPanel, JobQueuePanel
+from .scheduler import FrameScheduler, Priority
 from ..core.scanner import Scanner
-from ..core.engine import TransferEngine
-from ..model.file_obj import SyncStatus
+from ..core.governor import GOVERNOR, MB
+from ..core.capacity import CapacityPlanner
+from ..core.job_queue import JobQueue
+from ..model.file_obj import FileObj, SyncStatus
+from ..model.selection import SelectionModel
+from ..model.list_model import FileListModel
 from ..utils.assets import get_asset_path
 
 class AppWindow(ctk.CTk):
-    def __init__(self):
+    # Speed cap menu: label -> MB/s (0 = unlimited)
+    SPEED_CAPS = {"No Speed Cap": 0, "Cap 400 MB/s": 400, "Cap 200 MB/s": 200, "Cap 100 MB/s": 100, "Cap 50 MB/s": 50}
+
+    def __init__(self, launch_time=None, imports_done=None):
+        # Startup timing: launch -> imports -> window built -> first idle (interactive)
+        self.launch_time = launch_time or time.perf_counter()
+        self.startup_ms = {}
+        if imports_done: self.startup_ms["imports"] = (imports_done - self.launch_time) * 1000
         super().__init__()
 
         self.title("LastLook - Professional DIT Tool")
@@ -20,15 +32,25 @@ class AppWindow(ctk.CTk):
         self.source_path = None
         self.dest_path = None
         self.source_files = []
-        self.selected_ids = set() 
-        self.highlighted_id = None 
-        self.transfer_engine = TransferEngine()
+        # Selection + running totals (count/bytes/status) kept in O(1) per toggle
+        self.selection = SelectionModel()
+        # One list model, two views (Source + Destination columns)
+        self.list_model = FileListModel()
+        # Ingest jobs: one engine per job, cards on separate devices copy in parallel
+        self.job_queue = JobQueue(on_change=self._on_job_changed, on_progress=self._on_job_progress)
+        # Destination space: block-rounded footprint vs free space minus what queued/running jobs will write
+        self.capacity = CapacityPlanner(self.job_queue, on_change=self._on_capacity_changed)
+        self._capacity_state = (False, None)
         self.night_shift_on = False
         
+        # PERFORMANCE: One frame-budgeted pump for all queued UI work
+        self.scheduler = FrameScheduler(self)
+
         # PERFORMANCE: Background Scanner Thread
         self.scan_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
         try:
+            from PIL import Image
             self.icon_folder = ctk.CTkImage(Image.open(get_asset_path("folder.png")), size=(24, 24))
             self.icon_disk = ctk.CTkImage(Image.open(get_asset_path("disk.png")), size=(24, 24))
         except Exception as e:
@@ -69,15 +91,27 @@ class AppWindow(ctk.CTk):
         self.btn_night_shift.pack(side="right", padx=20, pady=10)
 
         # --- PANELS ---
-        self.panel_source = FileListPanel(self, title="SOURCE MEDIA", on_select_missing=self.select_all_missing, on_background_click=self.deselect_all)
+        self.panel_source = FileListPanel(self, title="SOURCE MEDIA", model=self.list_model,
+                                          on_select_missing=self.select_all_missing, on_background_click=self.deselect_all,
+                                          on_select_type=self.select_all_of_type, on_select_folder=self.select_highlighted_folder,
+                                          on_row_click=self.on_file_click, on_row_toggle=self.on_file_toggle,
+                                          is_checked=self.selection.is_selected,
+                                          on_viewport_changed=self._on_source_viewport, scheduler=self.scheduler,
+                                          on_query_changed=lambda: self.panel_dest.reset_scroll())
         self.panel_source.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 
-        self.panel_dest = FileListPanel(self, title="DESTINATION BACKUP", is_dest=True, on_background_click=self.deselect_all)
+        self.panel_dest = FileListPanel(self, title="DESTINATION BACKUP", model=self.list_model, is_dest=True,
+                                        on_background_click=self.deselect_all, on_row_click=self.on_file_click,
+                                        scheduler=self.scheduler)
         self.panel_dest.grid(row=1, column=1, sticky="nsew", padx=5, pady=5)
 
-        self.panel_inspector = InspectorPanel(self)
+        self.panel_inspector = InspectorPanel(self, scheduler=self.scheduler)
         self.panel_inspector.grid(row=1, column=2, sticky="ns", padx=5, pady=5)
 
+        self.panel_jobs = JobQueuePanel(self.panel_inspector, on_clear=self.clear_finished_jobs,
+                                        on_cancel=self.cancel_job, on_resume=self.resume_job)
+        self.panel_jobs.pack(side="bottom", fill="x", padx=20, pady=10)
+
         # --- FOOTER ---
         self.footer = ctk.CTkFrame(self, height=60, corner_radius=0)
         self.footer.grid(row=2, column=0, columnspan=3, sticky="ew")
@@ -88,17 +122,39 @@ class AppWindow(ctk.CTk):
                                           state="disabled",
                                           command=self.start_transfer)
         self.btn_transfer.pack(side="right", padx=20, pady=15)
+
+        # User bandwidth cap for all transfers (e.g. headroom for a drive feeding live playback)
+        self.opt_speed_cap = ctk.CTkOptionMenu(self.footer, values=list(self.SPEED_CAPS), width=140,
+                                               command=self.set_speed_cap)
+        self.opt_speed_cap.set(self._speed_cap_label(GOVERNOR.transfer_cap))
+        self.opt_speed_cap.pack(side="right", padx=5, pady=15)
         
         self.lbl_status = ctk.CTkLabel(self.footer, text="Ready.")
         self.lbl_status.pack(side="left", padx=20)
 
+        self.startup_ms["window"] = (time.perf_counter() - self.launch_time) * 1000
+        # First idle callback == the event loop is running and the window has been drawn
+        self.after_idle(self._report_startup)
+        # Queued jobs whose card is not mounted yet (saved jobs come back paused until resumed in the panel)
+        self.after(500, self._pump_jobs)
+        self.capacity.start()
+
+    def _report_startup(self):
+        self.startup_ms["interactive"] = (time.perf_counter() - self.launch_time) * 1000
+        parts = ", ".join(f"{k} {v:.0f} ms" for k, v in self.startup_ms.items())
+        print(f"[startup] {parts}")
+        if os.environ.get("LASTLOOK_EXIT_AFTER_STARTUP"):
+            self.after(0, self.destroy)  # Used by benchmarks/bench_startup.py
+
     def select_source(self):
         path = filedialog.askdirectory()
         if path:
             self.source_path = path
             self.panel_source.lbl_title.configure(text=f"SOURCE: {os.path.basename(path)}")
-            self.selected_ids.clear() 
-            self.highlighted_id = None
+            self.selection.clear()
+            self.list_model.set_highlight(None)
+            self.panel_source.reset_scroll()
+            self.panel_dest.reset_scroll()
             self.refresh_view()
 
     def select_dest(self):
@@ -107,6 +163,8 @@ class AppWindow(ctk.CTk):
             self.dest_path = path
             self.panel_dest.lbl_title.configure(text=f"DEST: {os.path.basename(path)}")
             self.panel_dest.update_storage(path)
+            volume = self.capacity.watch(path)
+            if volume: self.selection.set_block_size(volume.block_size)
             self.refresh_view()
 
     def refresh_view(self):
@@ -122,168 +180,234 @@ class AppWindow(ctk.CTk):
     def _threaded_scan(self, src, dst):
         """Runs in Background"""
         try:
-            # 1. Heavy Disk I/O
-            files = Scanner.scan_directory(src)
-            
-            # 2. Heavy Comparison Logic
-            if dst:
-                files = Scanner.compare_directories(files, dst)
+            # Metered while a transfer is running (the card and drive belong to the offload)
+            with GOVERNOR.background():
+                # 1. Heavy Disk I/O
+                files = Scanner.scan_directory(src)
+                
+                # 2. Heavy Comparison Logic
+                if dst:
+                    files = Scanner.compare_directories(files, dst)
             
             # 3. Return to Main Thread
-            self.after(0, lambda: self._on_scan_complete(files))
+            self.scheduler.post(lambda: self._on_scan_complete(files), Priority.VISIBLE, key="scan_complete")
         except Exception as e:
             print(f"Scan Error: {e}")
-            self.after(0, lambda: self.lbl_status.configure(text="Scan Error"))
+            self.scheduler.post(lambda: self.lbl_status.configure(text="Scan Error"), Priority.NORMAL, key="status_label")
 
     def _on_scan_complete(self, files):
         """Runs on Main Thread - Updates UI with results"""
         self.source_files = files
+        self.selection.reset(files, keep_ids=self.selection.selected_ids)
         self.lbl_status.configure(text="Ready.")
 
-        # Trigger the optimized renderer (which we fixed in the previous step)
-        self.panel_source.render_files(
-            self.source_files, 
-            on_row_click=self.on_file_click, 
-            on_row_toggle=self.on_file_toggle,
-            selected_ids=self.selected_ids
-        )
-
-        if self.dest_path:
-            self.panel_dest.render_files(
-                self.source_files,
-                on_row_click=self.on_file_click, 
-                on_row_toggle=None, 
-                selected_ids=set() 
-            )
+        # Published once: both panes re-bind their visible rows from the shared model
+        self.list_model.set_files(self.source_files, destination=self.dest_path)
 
         self.update_ui_state()
 
     def on_file_click(self, file_obj):
-        if self.highlighted_id == file_obj.id:
+        if self.list_model.highlight_id == file_obj.id:
             self.deselect_all()
             return
 
-        self.highlighted_id = file_obj.id
-        self.panel_inspector.show_file(file_obj)
-        self.panel_source.highlight_file(file_obj.id)
-        if self.dest_path:
-            self.panel_dest.highlight_file(file_obj.id)
+        # Mirror Logic: one model change highlights the row in both panes
+        self.list_model.set_highlight(file_obj.id)
+        # Highlight paints this frame; the heavier Inspector update runs first thing next frame
+        neighbors = self._neighbors(file_obj)
+        self.scheduler.post(lambda: self.panel_inspector.show_file(file_obj, neighbors), Priority.INPUT, key="inspector")
+
+    def _neighbors(self, file_obj, radius=2):
+        """Rows right above/below a file (their thumbnails are the next likely clicks)"""
+        index = self.list_model.index_of(file_obj.id)
+        if index is None: return []
+        lo, hi = max(0, index - radius), min(len(self.list_model), index + radius + 1)
+        return [self.list_model[i] for i in range(lo, hi) if i != index]
+
+    def _on_source_viewport(self, first, last):
+        # Coalesced per frame: a fast scroll only prefetches for where it lands
+        self.scheduler.post(lambda: self._prefetch_thumbnails(first, last), Priority.BACKGROUND, key="prefetch")
+
+    def _prefetch_thumbnails(self, first, last):
+        page = last - first
+        model = self.list_model
+        visible = [model[i] for i in range(first, min(last, len(model)))]
+        neighbors = [model[i] for i in range(max(0, first - page), first)]
+        neighbors += [model[i] for i in range(last, min(len(model), last + page))]
+        self.panel_inspector.prefetch(visible, neighbors)
 
     def deselect_all(self):
-        self.highlighted_id = None
-        self.panel_source.highlight_file(None)
-        if self.dest_path: self.panel_dest.highlight_file(None)
+        self.scheduler.cancel("inspector")
+        self.list_model.set_highlight(None)
         
-        if len(self.selected_ids) == 0:
+        if self.selection.selected_count == 0:
             self.panel_inspector.clear_view()
         else:
             self.update_ui_state()
 
     def on_file_toggle(self, file_obj, is_checked):
-        if is_checked:
-            self.selected_ids.add(file_obj.id)
-        else:
-            self.selected_ids.discard(file_obj.id)
-        
+        self.selection.toggle(file_obj.id, bool(is_checked))
         self.update_ui_state()
 
     def select_all_missing(self):
-        count = 0
-        for f in self.source_files:
-            if f.status == SyncStatus.MISSING:
-                self.selected_ids.add(f.id)
-                count += 1
-        
-        # We don't need to re-scan, just re-render visuals
-        # Using the cached file list is instant
-        self.panel_source.render_files(
-            self.source_files,
-            on_row_click=self.on_file_click,
-            on_row_toggle=self.on_file_toggle,
-            selected_ids=self.selected_ids
-        )
+        # Mask-based: only the newly added rows need their checkbox ticked
+        added = self.selection.select_by_status(SyncStatus.MISSING)
+        self.panel_source.refresh_checked(added)
         self.update_ui_state()
 
-    def update_ui_state(self):
-        total_size = 0
-        warning_msg = None
-        is_blocked = False
+    def select_all_of_type(self, file_type):
+        added = self.selection.select_by_type(file_type)
+        self.panel_source.refresh_checked(added)
+        self.update_ui_state()
+
+    def select_highlighted_folder(self):
+        # Folder of the last clicked row (e.g. one camera roll / clip folder)
+        file_obj = self.selection.get(self.list_model.highlight_id) if self.list_model.highlight_id else None
+        if not file_obj:
+            self.lbl_status.configure(text="Click a file first to select its folder.")
+            return
+        added = self.selection.select_by_folder(os.path.dirname(file_obj.path))
+        self.panel_source.refresh_checked(added)
+        self.update_ui_state()
 
-        if len(self.selected_ids) > 0:
-            total_size = sum(f.size for f in self.source_files if f.id in self.selected_ids)
+    def update_ui_state(self):
+        # A queued single-file Inspector update must not overwrite what we draw here
+        self.scheduler.cancel("inspector")
 
+        # Aggregates are maintained incrementally by the SelectionModel
+        selected_count = self.selection.selected_count
+        is_blocked, warning_msg = self._capacity_state = self._check_capacity()
         if self.dest_path:
-            dest_free_space = self.panel_dest.free_space
-            if total_size > dest_free_space:
-                is_blocked = True
-                self.panel_dest.set_alert_mode(True)
-                
-                def fmt(b): 
-                    for u in ['B','KB','MB','GB']: 
-                        if b<1024: return f"{b:.2f}{u}"
-                        b/=1024
-                    return f"{b:.2f}TB"
-                
-                deficit = total_size - dest_free_space
-                warning_msg = (f"REQUIRED: {fmt(total_size)}\n"
-                               f"AVAILABLE: {fmt(dest_free_space)}\n"
-                               f"FREE UP: {fmt(deficit)}")
-            else:
-                self.panel_dest.set_alert_mode(False)
+            self.panel_dest.set_alert_mode(is_blocked)
 
-        if len(self.selected_ids) > 0:
-            self.panel_inspector.show_batch(len(self.selected_ids), total_size, warning_msg)
-        elif self.highlighted_id:
-            file_obj = next((f for f in self.source_files if f.id == self.highlighted_id), None)
+        if selected_count > 0:
+            self.panel_inspector.show_batch(self.selection, warning_msg)
+        elif self.list_model.highlight_id:
+            file_obj = self.selection.get(self.list_model.highlight_id)
             if file_obj: self.panel_inspector.show_file(file_obj)
         else:
             self.panel_inspector.clear_view()
 
-        if len(self.selected_ids) > 0 and self.dest_path:
+        if selected_count > 0 and self.dest_path:
             if is_blocked:
                 self.btn_transfer.configure(state="disabled", text="INSUFFICIENT DISK SPACE", fg_color="#550000")
             else:
-                self.btn_transfer.configure(state="normal", text=f"TRANSFER {len(self.selected_ids)} FILES", fg_color="#c42b1c")
+                self.btn_transfer.configure(state="normal", text=f"TRANSFER {selected_count} FILES", fg_color="#c42b1c")
         else:
             self.btn_transfer.configure(state="disabled", text="SELECT FILES TO TRANSFER")
 
+    def _check_capacity(self):
+        """(blocked, warning) for the selected MISSING files on the destination, as on-disk bytes"""
+        if not self.dest_path or not self.selection.selected_count: return False, None
+        fmt = FileObj.format_size
+        plan = self.capacity.plan(self.dest_path, self.selection.selected_missing_footprint,
+                                  self.selection.selected_missing_inodes)
+        if plan is None:
+            # Volume could not be probed: fall back to raw bytes vs the storage bar's figure
+            required, available = self.selection.selected_missing_bytes, self.panel_dest.free_space
+            if required <= available: return False, None
+            return True, (f"REQUIRED: {fmt(required)}\n"
+                          f"AVAILABLE: {fmt(available)}\n"
+                          f"FREE UP: {fmt(required - available)}")
+        if plan.ok:
+            return False, None
+        if plan.shortfall == 0:
+            return True, (f"FILES: {plan.inodes:,}\n"
+                          f"INODES LEFT: {max(0, plan.volume.inodes_free - plan.reserved_inodes):,}")
+        reserved = f"RESERVED BY JOBS: {fmt(plan.reserved)} ({plan.jobs})\n" if plan.reserved else ""
+        return True, (f"REQUIRED: {fmt(plan.required)}\n"
+                      f"AVAILABLE: {fmt(plan.available)}\n"
+                      f"{reserved}"
+                      f"FREE UP: {fmt(plan.shortfall)}")
+
+    def _on_capacity_changed(self):
+        """Planner thread: free space or job reservations moved"""
+        self.scheduler.post(self._apply_capacity, Priority.NORMAL, key="capacity")
+
+    def _apply_capacity(self):
+        volume = self.capacity.volume(self.dest_path) if self.dest_path else None
+        if volume: self.panel_dest.set_storage(volume.total, volume.free)
+        # Only redraw the batch view / button when the verdict itself changed
+        if self._check_capacity() != self._capacity_state:
+            self.update_ui_state()
+        elif self._capacity_state[0]:
+            self.panel_dest.set_alert_mode(True)
+
     def start_transfer(self):
-        files_to_transfer = [
-            f for f in self.source_files 
-            if f.id in self.selected_ids and f.status == SyncStatus.MISSING
-        ]
+        files_to_transfer = self.selection.selected_with_status(SyncStatus.MISSING)
         
         if not files_to_transfer:
             self.lbl_status.configure(text="Selected files are already synced!")
             return
 
-        self.btn_transfer.configure(state="disabled", text="TRANSFERRING...")
-        
-        # Pass the new Update callback that expects a file object
-        self.transfer_engine.run_transfer(
-            files=files_to_transfer,
-            dest_folder=self.dest_path,
-            on_progress=self.update_progress, # Use method instead of lambda
-            on_complete=self.on_transfer_complete
-        )
+        # Queued, not started: the job waits while another job is using the card or the drive
+        job = self.job_queue.submit(self.source_path, [self.dest_path], files=files_to_transfer)
+        self.lbl_status.configure(text=f"Queued: {job.label} ({len(files_to_transfer)} files)")
+        self.selection.clear()
+        self.panel_source.refresh_checked()
+        self.update_ui_state()
 
     def on_transfer_complete(self):
+        # Jobs finish in the background: keep whatever the user has selected since (the rescan keeps ids)
         self.lbl_status.configure(text="Transfer Complete. Verifying...")
-        self.selected_ids.clear() 
         self.refresh_view()
         self.panel_dest.update_storage(self.dest_path)
 
+    # --- JOB QUEUE ---
+    def _on_job_changed(self, job):
+        """Worker thread: job queued / started / finished"""
+        self.scheduler.post(self._refresh_jobs, Priority.NORMAL, key="jobs")
+        self.capacity.poke()
+        finished = not job.is_active
+        if finished and job.source == self.source_path:
+            self.scheduler.post(self.on_transfer_complete, Priority.INPUT)
+
+    def _on_job_progress(self, job, msg, file_obj=None):
+        # Only the card on screen has rows to update; other jobs just report text
+        if job.source != self.source_path: file_obj = None
+        self.update_progress(msg, file_obj, job.current_dest)
+
+    def _refresh_jobs(self):
+        self.panel_jobs.update_jobs(self.job_queue.jobs, self.job_queue.counts())
+
+    def _pump_jobs(self):
+        self.job_queue.pump()
+        self._refresh_jobs()
+        self.after(5000, self._pump_jobs)
+
+    def cancel_job(self, job_id):
+        self.job_queue.cancel(job_id)
+        self._refresh_jobs()
+
+    def resume_job(self, job_id):
+        self.job_queue.resume(job_id)
+        self._refresh_jobs()
+
+    def clear_finished_jobs(self):
+        self.job_queue.clear_finished()
+        self._refresh_jobs()
+
     # --- NEW UPDATE METHOD ---
-    def update_progress(self, msg, file_obj=None):
+    def update_progress(self, msg, file_obj=None, destination=None):
         """Thread-safe UI update"""
-        # Always run on main thread
-        self.after(0, lambda: self._apply_update(msg, file_obj))
-
-    def _apply_update(self, msg, file_obj):
-        self.lbl_status.configure(text=msg)
+        # The engine reports every chunk; keyed posts coalesce so only the latest text / row state is painted
+        self.scheduler.post(lambda: self.lbl_status.configure(text=msg), Priority.NORMAL, key="status_label")
         if file_obj:
-            # Force the Source row to redraw (showing the Spinner/Check)
-            self.panel_source.refresh_row(file_obj)
+            priority = Priority.VISIBLE if self.panel_source.is_row_visible(file_obj.id) else Priority.NORMAL
+            self.scheduler.post(lambda: self._apply_row_update(file_obj, destination), priority, key=("row", file_obj.id))
+
+    def _apply_row_update(self, file_obj, destination=None):
+        self.selection.update_status(file_obj)
+        # Published once, applied to both Source and Destination columns
+        self.list_model.publish_status(file_obj, destination)
+
+    def set_speed_cap(self, label):
+        GOVERNOR.set_transfer_cap(self.SPEED_CAPS.get(label, 0) * MB)
+
+    def _speed_cap_label(self, bytes_per_s):
+        for label, mbps in self.SPEED_CAPS.items():
+            if mbps * MB == bytes_per_s: return label
+        return f"Cap {bytes_per_s / MB:.0f} MB/s"  # Set via LASTLOOK_TRANSFER_CAP_MBPS
 
     def toggle_night_shift(self):
         self.night_shift_on = not self.night_shift_on
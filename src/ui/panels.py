@@ -1,29 +1,48 @@
 import customtkinter as ctk
+import os
 import shutil
 import tkinter
-import concurrent.futures
-from typing import List, Generator
-from .widgets import FileRow
+from typing import List
+from .widgets import VirtualFileList
+from .scheduler import Priority
+from ..model.list_model import FileListModel
 from ..model.file_obj import FileObj, SyncStatus, FileType
-from ..core.thumbnails import ThumbnailGenerator
+from ..model.sequence import SequenceObj
+from ..model.types import PREVIEW_TYPES
 
 class FileListPanel(ctk.CTkFrame):
-    def __init__(self, master, title, is_dest=False, on_select_missing=None, on_background_click=None):
+    # Sort menu label -> (FileIndex sort key, descending)
+    SORT_OPTIONS = {
+        "Scan Order": ("scan", False),
+        "Name": ("name", False),
+        "Size (Largest)": ("size", True),
+        "Date (Newest)": ("date", True),
+        "Status": ("status", False),
+    }
+    # Select menu label -> FileType to add (None: the folder of the clicked file)
+    SELECT_OPTIONS = {
+        "All Video": FileType.VIDEO,
+        "All Audio": FileType.AUDIO,
+        "All Images": FileType.IMAGE,
+        "All Sequences": FileType.SEQUENCE,
+        "This Folder": None,
+    }
+    SELECT_PROMPT = "Select..."
+
+    def __init__(self, master, title, model: FileListModel, is_dest=False, on_select_missing=None,
+                 on_background_click=None, on_row_click=None, on_row_toggle=None, is_checked=None,
+                 on_viewport_changed=None, scheduler=None, on_query_changed=None,
+                 on_select_type=None, on_select_folder=None):
         super().__init__(master)
         self.is_dest = is_dest
-        self.rows = [] 
+        self.model = model
+        self.column = FileListModel.DEST if is_dest else FileListModel.SOURCE
         self.on_select_missing = on_select_missing
+        self.on_select_type = on_select_type
+        self.on_select_folder = on_select_folder
         self.on_background_click = on_background_click
-        
-        # --- PERFORMANCE TRACKING ---
-        self.current_file_hashes = [] 
-        self.row_map = {} 
-        self.active_highlight_id = None 
-        
-        # The Generator: Keeps track of where we are in the rendering loop
-        self.render_generator: Generator = None
-        # The Task ID: Allows us to cancel the loop if the user switches folders fast
-        self.render_task_id = None
+        self.scheduler = scheduler
+        self.on_query_changed = on_query_changed
         
         # --- CAPACITY TRACKING ---
         self.free_space = 0
@@ -38,58 +57,118 @@ class FileListPanel(ctk.CTkFrame):
         self.progress_bar = ctk.CTkProgressBar(self, height=8)
         self.progress_bar.set(0)
         self.progress_bar.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.lbl_count = ctk.CTkLabel(self, text="Files", text_color="gray")
+        self.lbl_count.pack(padx=10, anchor="w")
+
+        # Search / Sort / Filter (Source pane only; both panes show the same projection of the shared model)
+        if not is_dest:
+            self._build_query_bar()
         
-        # Scrollable Area
-        self.scroll_frame = ctk.CTkScrollableFrame(self, label_text="Files")
-        self.scroll_frame.pack(expand=True, fill="both", padx=5, pady=5)
-        
-        # Bind background click to deselect
-        if self.on_background_click:
-            try:
-                self.scroll_frame._parent_canvas.bind("<Button-1>", lambda e: self.on_background_click())
-            except:
-                pass 
+        # Virtual List: a view over the shared model. Only the visible rows (+ overscan) exist as canvas items.
+        # Dest rows have no checkbox (selection is driven from the Source pane).
+        self.list_view = VirtualFileList(
+            self,
+            column=self.column,
+            on_click=on_row_click,
+            on_toggle=on_row_toggle,
+            on_background_click=self.on_background_click,
+            is_checked=None if is_dest else is_checked,
+            on_viewport_changed=on_viewport_changed,
+            scheduler=scheduler
+        )
+        self.list_view.pack(expand=True, fill="both", padx=5, pady=5)
+        self.list_view.set_model(model)
+        model.subscribe(self)
 
         # Footer (Only for Source Pane)
         if not is_dest:
+            footer = ctk.CTkFrame(self, fg_color="transparent")
+            footer.pack(fill="x", padx=10, pady=10)
             self.btn_select_missing = ctk.CTkButton(
-                self, 
+                footer, 
                 text="Select All Missing Files", 
                 fg_color="transparent", 
                 border_width=1, 
                 text_color="gray",
                 command=self._handle_select_missing
             )
-            self.btn_select_missing.pack(fill="x", padx=10, pady=10)
-
-        # PRE-WARMER: Build 200 invisible rows on startup so the first click feels instant
-        self.after(100, self._start_prewarm)
+            self.btn_select_missing.pack(side="left", fill="x", expand=True)
+            # Adds to the selection (mask-based, like Select All Missing)
+            self.opt_select = ctk.CTkOptionMenu(footer, values=list(self.SELECT_OPTIONS), width=130,
+                                                command=self._handle_select_option)
+            self.opt_select.set(self.SELECT_PROMPT)
+            self.opt_select.pack(side="left", padx=(5, 0))
+
+    def _build_query_bar(self):
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", padx=10, pady=(5, 0))
+
+        self.search_var = tkinter.StringVar()
+        self.entry_search = ctk.CTkEntry(bar, placeholder_text="Search files...", textvariable=self.search_var)
+        self.entry_search.pack(side="left", fill="x", expand=True)
+        self.search_var.trace_add("write", lambda *_: self._queue_query())
+
+        self.opt_sort = ctk.CTkOptionMenu(bar, values=list(self.SORT_OPTIONS), width=130,
+                                          command=lambda _: self._queue_query())
+        self.opt_sort.pack(side="left", padx=(5, 0))
+
+        toggles = ctk.CTkFrame(self, fg_color="transparent")
+        toggles.pack(fill="x", padx=10, pady=(5, 0))
+        self.chk_missing = ctk.CTkCheckBox(toggles, text="Missing only", command=self._queue_query,
+                                           checkbox_width=16, checkbox_height=16)
+        self.chk_missing.pack(side="left")
+        self.chk_video = ctk.CTkCheckBox(toggles, text="Video only", command=self._queue_query,
+                                         checkbox_width=16, checkbox_height=16)
+        self.chk_video.pack(side="left", padx=(10, 0))
+
+    def _queue_query(self):
+        # Keyed: a burst of keystrokes inside one frame re-projects once
+        if self.scheduler:
+            self.scheduler.post(self._apply_query, Priority.INPUT, key="list_query")
+        else:
+            self._apply_query()
 
-    def _start_prewarm(self):
-        """Silently builds 200 rows in the background."""
-        dummy = FileObj("dummy", "Init...", "", 0, 0.0, FileType.OTHER, SyncStatus.MISSING)
-        # We re-use the generator logic but with a 'prewarm' flag
-        self.render_generator = self._create_row_generator([dummy]*200, None, None, set(), prewarm=True)
-        self._process_render_queue()
+    def _apply_query(self):
+        sort, descending = self.SORT_OPTIONS.get(self.opt_sort.get(), ("scan", False))
+        filters = [name for name, box in (("missing", self.chk_missing), ("video", self.chk_video)) if box.get()]
+        self.model.set_query(text=self.search_var.get(), sort=sort, descending=descending, filters=filters)
+        self.reset_scroll()
+        if self.on_query_changed: self.on_query_changed()
 
     def _handle_select_missing(self):
         if self.on_select_missing:
             self.on_select_missing()
 
+    def _handle_select_option(self, choice):
+        self.opt_select.set(self.SELECT_PROMPT)  # An action, not a mode
+        file_type = self.SELECT_OPTIONS.get(choice)
+        if file_type is None:
+            if choice in self.SELECT_OPTIONS and self.on_select_folder:
+                self.on_select_folder()
+        elif self.on_select_type:
+            self.on_select_type(file_type)
+
     def update_storage(self, path):
         if not path: return
         try:
             total, used, free = shutil.disk_usage(path)
-            self.free_space = free
-            self.total_space = total
-            self.progress_bar.set(used / total)
-            color = "#1f6aa5" 
-            if (used/total) > 0.9: color = "#c42b1c"
-            self.progress_bar.configure(progress_color=color)
+            self.set_storage(total, free)
         except:
             self.progress_bar.set(0)
             self.free_space = 0
 
+    def set_storage(self, total, free):
+        """Storage bar from figures already probed (the capacity planner's background statvfs)"""
+        if total <= 0: return
+        self.free_space = free
+        self.total_space = total
+        used = total - free
+        self.progress_bar.set(used / total)
+        color = "#1f6aa5" 
+        if (used/total) > 0.9: color = "#c42b1c"
+        self.progress_bar.configure(progress_color=color)
+
     def set_alert_mode(self, is_alert: bool):
         if is_alert:
             self.progress_bar.configure(progress_color="#c42b1c") 
@@ -99,130 +178,45 @@ class FileListPanel(ctk.CTkFrame):
                 color = "#1f6aa5" if percent <= 0.9 else "#c42b1c"
                 self.progress_bar.configure(progress_color=color)
 
-    def render_files(self, files: List[FileObj], on_row_click, on_row_toggle, selected_ids):
-        """
-        THE TIME-SLICED RENDERER
-        This function sets up the job, but doesn't do the heavy lifting immediately.
-        It creates a 'Generator' that yields control back to the UI every few items.
-        """
-        
-        # 1. STOP previous job: If user switches folders rapidly, cancel the old render
-        if self.render_task_id:
-            self.after_cancel(self.render_task_id)
-            self.render_task_id = None
+    # --- MODEL OBSERVER (Header count only; the list view does the drawing) ---
+    def model_reset(self):
+        count = self.model.row_count(self.column)
+        if count and self.model.is_filtered:
+            self.lbl_count.configure(text=f"Files ({count:,} of {self.model.total_count:,})")
+        else:
+            self.lbl_count.configure(text=f"Files ({count:,})")
 
-        # 2. Reset Lookups
-        self.row_map = {} 
-        self.active_highlight_id = None
+    def model_rows_changed(self, indices):
+        pass
 
-        # 3. Create the Plan: Make a generator object
-        self.render_generator = self._create_row_generator(files, on_row_click, on_row_toggle, selected_ids)
-        
-        # 4. Start the Engine: Process the first batch
-        self._process_render_queue()
-
-    def _create_row_generator(self, files, on_click, on_toggle, selected_ids, prewarm=False):
-        """
-        This is a Python Generator. It runs code until it hits 'yield', then pauses.
-        This allows us to process 20 items, pause to let the UI draw, then resume.
-        """
-        count_files = len(files)
-        count_rows = len(self.rows)
-        
-        # --- PHASE 1: UPDATE EXISTING ROWS (Recycling) ---
-        # Instead of doing all 170 at once (which freezes the UI), we yield every 20.
-        recycle_limit = min(count_files, count_rows)
-        
-        for i in range(recycle_limit):
-            row = self.rows[i]
-            row.on_click = on_click
-            row.on_toggle = on_toggle
-            
-            # Smart Update: widgets.py will only repaint if data changed
-            row.update_data(files[i]) 
-            
-            if not prewarm:
-                # If row was hidden, show it
-                if not row.winfo_viewable(): row.pack(fill="x", pady=2, padx=2)
-                
-                # Update checkbox state
-                should_check = (selected_ids and files[i].id in selected_ids)
-                row.set_checked(should_check)
-                self.row_map[files[i].id] = row
-            
-            # THE MAGIC: Pause every 20 items to keep UI responsive
-            if i % 20 == 0:
-                yield 
-
-        # --- PHASE 2: HIDE EXTRA ROWS ---
-        # If new folder has fewer files, hide the leftovers
-        if count_rows > count_files:
-            for i in range(count_files, count_rows):
-                self.rows[i].pack_forget()
-                if i % 20 == 0: yield # Pause here too
-
-        # --- PHASE 3: CREATE NEW ROWS ---
-        # If new folder has MORE files, create new widgets
-        if count_files > count_rows:
-            for i in range(count_rows, count_files):
-                row = FileRow(self.scroll_frame, files[i], on_click=on_click, on_toggle=on_toggle)
-                if not prewarm:
-                    row.pack(fill="x", pady=2, padx=2)
-                    should_check = (selected_ids and files[i].id in selected_ids)
-                    row.set_checked(should_check)
-                    self.row_map[files[i].id] = row
-                
-                self.rows.append(row)
-                if i % 20 == 0: yield # Pause here too
-
-    def _process_render_queue(self):
-        """
-        This runs periodically (every 5ms).
-        It grabs the next batch of work from the generator.
-        """
-        if not self.render_generator: return
+    def model_highlight_changed(self, old_id, new_id):
+        pass
 
-        try:
-            # Execute the next ~20 items (until the generator yields)
-            # We call next() once, which runs the generator until it hits 'yield'
-            next(self.render_generator)
-            
-            # Schedule the next batch ASAP (5ms delay allows Tkinter to redraw)
-            self.render_task_id = self.after(5, self._process_render_queue)
-            
-        except StopIteration:
-            # Generator is empty, work is done!
-            self.render_generator = None
-            self.render_task_id = None
-
-    def highlight_file(self, file_id):
-        # Optimization: Only touch the 2 rows that need changing
-        if self.active_highlight_id and self.active_highlight_id in self.row_map:
-            if self.active_highlight_id != file_id:
-                self.row_map[self.active_highlight_id].set_selected(False)
-        
-        if file_id and file_id in self.row_map:
-            self.row_map[file_id].set_selected(True)
-            
-        self.active_highlight_id = file_id
+    def reset_scroll(self):
+        self.list_view.scroll_to_top()
 
-    # --- NEW METHOD: Force Single Row Update (For MD5 Status) ---
-    def refresh_row(self, file_obj: FileObj):
-        """Updates a specific row if it exists (for real-time status updates)"""
-        if file_obj.id in self.row_map:
-            self.row_map[file_obj.id].update_data(file_obj)
+    def is_row_visible(self, file_id) -> bool:
+        return self.list_view.is_visible(file_id)
+
+    def refresh_checked(self, file_ids=None):
+        """Repaints checkboxes for the given rows (bulk selection without a full re-render)"""
+        self.list_view.refresh_checked(file_ids)
 
 class InspectorPanel(ctk.CTkFrame):
-    def __init__(self, master):
+    # Parallel ffmpeg processes for thumbnails (a visible page fills in parallel)
+    THUMBNAIL_WORKERS = min(4, max(1, (os.cpu_count() or 2) // 2))
+
+    def __init__(self, master, scheduler):
         super().__init__(master, width=250)
+        self.scheduler = scheduler
         self.lbl_header = ctk.CTkLabel(self, text="INSPECTOR", font=("Arial", 12, "bold"), text_color="gray")
         self.lbl_header.pack(pady=20)
         
         self.current_image = None
         self.active_file_id = None
-        self.thumbnail_cache = {} 
-        # ThreadPool: Runs heavy FFmpeg tasks off the main thread
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # Thumbnail stack (PIL decode, ffmpeg plumbing, disk cache) is built on first use, not at startup
+        self.thumb_cache = None
+        self._thumbs = None
 
         self.preview_box = ctk.CTkFrame(self, height=150, fg_color="#1a1a1a")
         self.preview_box.pack(fill="x", padx=20, pady=10)
@@ -231,6 +225,22 @@ class InspectorPanel(ctk.CTkFrame):
         self.info_label = ctk.CTkLabel(self, text="", justify="left", anchor="w")
         self.info_label.pack(fill="x", padx=20, pady=20)
 
+    @property
+    def thumbs(self):
+        if self._thumbs is None:
+            from ..core.thumb_cache import ThumbnailCache
+            from ..core.thumb_service import ThumbnailService
+            # Two-tier cache: RAM LRU (bounded by bytes) + persistent on-disk JPEGs
+            self.thumb_cache = ThumbnailCache()
+            # Prioritized pool: Inspector file first, then visible rows, then neighbors. Stale jobs get killed.
+            self._thumbs = ThumbnailService(self.thumb_cache, max_workers=self.THUMBNAIL_WORKERS)
+        return self._thumbs
+
+    def _release_thumbnail(self):
+        # Nothing to release if the stack was never needed
+        if self._thumbs is not None:
+            self._thumbs.release_selection()
+
     def _create_preview_label(self):
         self.lbl_preview = ctk.CTkLabel(self.preview_box, text="No Selection")
         self.lbl_preview.place(relx=0.5, rely=0.5, anchor="center")
@@ -243,7 +253,7 @@ class InspectorPanel(ctk.CTkFrame):
             pass
         self._create_preview_label()
 
-    def show_file(self, file_obj: FileObj):
+    def show_file(self, file_obj: FileObj, neighbors=()):
         self.active_file_id = file_obj.id
 
         try:
@@ -254,16 +264,23 @@ class InspectorPanel(ctk.CTkFrame):
             self.lbl_preview.configure(text=file_obj.file_type.name)
 
         # 2. THUMBNAIL LOGIC
-        if file_obj.file_type == FileType.VIDEO:
-            if file_obj.path in self.thumbnail_cache:
-                self._apply_image(self.thumbnail_cache[file_obj.path])
+        # Video frames come from ffmpeg; stills from their embedded/draft-decoded JPEG; audio is a waveform
+        if file_obj.file_type in PREVIEW_TYPES:
+            thumbs = self.thumbs
+            pil_image = self.thumb_cache.get_memory(thumbs.key_for(file_obj))
+            if pil_image is not None:
+                thumbs.release_selection()
+                self._apply_image(self._to_ctk_image(pil_image))
             else:
                 try:
                     self.lbl_preview.configure(text="Generating...", image=None)
-                    self.executor.submit(self._threaded_generation, file_obj.path, file_obj.id)
                 except Exception:
                     self._rebuild_label()
                     self.lbl_preview.configure(text="Generating...")
+                previewable = [f for f in neighbors if f.file_type in PREVIEW_TYPES]
+                thumbs.select(file_obj, self._on_thumbnail_done, neighbors=previewable)
+        else:
+            self._release_thumbnail()
         
         # 3. METADATA
         details = (
@@ -272,24 +289,44 @@ class InspectorPanel(ctk.CTkFrame):
             f"STATUS:\n{file_obj.status.value.upper()}\n\n"
             f"PATH:\n{file_obj.path}"
         )
+        if isinstance(file_obj, SequenceObj):
+            gaps = file_obj.gaps()
+            gap_text = ", ".join(f"{a}-{b}" if a != b else f"{a}" for a, b in gaps[:5]) or "None"
+            if len(gaps) > 5: gap_text += f" (+{len(gaps) - 5} more)"
+            details += (
+                f"\n\nFRAMES:\n{file_obj.first_frame}-{file_obj.last_frame} ({file_obj.frame_count:,})\n\n"
+                f"SYNCED:\n{file_obj.count_with_status(SyncStatus.SYNCED):,} / {file_obj.frame_count:,}\n\n"
+                f"GAPS:\n{gap_text}"
+            )
         self.info_label.configure(text=details, text_color=["black", "white"])
 
-    def _threaded_generation(self, path, requested_id):
-        if self.active_file_id != requested_id: return
-        try:
-            pil_image = ThumbnailGenerator.generate_thumbnail(path)
-            if pil_image:
-                self.after(0, lambda: self._on_thumbnail_ready(path, requested_id, pil_image))
-            else:
-                self.after(0, lambda: self._on_thumbnail_failed(requested_id))
-        except Exception as e:
-            print(f"BG Thread Error: {e}")
+    def prefetch(self, visible, neighbors=()):
+        """Warms the cache for on-screen video/still/audio rows (and the page around them)"""
+        visible = [f for f in visible if f.file_type in PREVIEW_TYPES]
+        neighbors = [f for f in neighbors if f.file_type in PREVIEW_TYPES]
+        if not visible and not neighbors and self._thumbs is None: return
+        self.thumbs.set_visible(visible, neighbors)
+
+    def _on_thumbnail_done(self, file_obj, pil_image):
+        """Runs on a ThumbnailService worker thread"""
+        requested_id = file_obj.id
+        if pil_image:
+            self.scheduler.post(lambda: self._on_thumbnail_ready(requested_id, pil_image),
+                                Priority.VISIBLE, key=("thumb", requested_id))
+        else:
+            self.scheduler.post(lambda: self._on_thumbnail_failed(requested_id),
+                                Priority.VISIBLE, key=("thumb", requested_id))
 
-    def _on_thumbnail_ready(self, path, requested_id, pil_image):
-        ctk_img = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(200, 110))
-        self.thumbnail_cache[path] = ctk_img
+    def _on_thumbnail_ready(self, requested_id, pil_image):
         if self.active_file_id == requested_id:
-            self._apply_image(ctk_img)
+            self._apply_image(self._to_ctk_image(pil_image))
+
+    @staticmethod
+    def _to_ctk_image(pil_image):
+        # Fit inside 200x110 without stretching (stills are rarely 16:9)
+        scale = min(200 / pil_image.width, 110 / pil_image.height)
+        size = (max(1, round(pil_image.width * scale)), max(1, round(pil_image.height * scale)))
+        return ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=size)
 
     def _on_thumbnail_failed(self, requested_id):
         if self.active_file_id == requested_id:
@@ -307,8 +344,11 @@ class InspectorPanel(ctk.CTkFrame):
             self.current_image = ctk_img
             self.lbl_preview.configure(image=self.current_image, text="")
 
-    def show_batch(self, count, total_size_bytes, warning_msg=None):
+    def show_batch(self, selection, warning_msg=None):
+        """Reads the SelectionModel's running aggregates directly (no list walk)"""
         self.active_file_id = None
+        self._release_thumbnail()
+        count = selection.selected_count
         text_color = "#c42b1c" if warning_msg else ["black", "white"]
         header_text = "⚠️ INSUFFICIENT SPACE" if warning_msg else f"{count} Items"
 
@@ -316,17 +356,12 @@ class InspectorPanel(ctk.CTkFrame):
         self.lbl_preview.configure(image=None, text=header_text, text_color=text_color)
         self.current_image = None
 
-        size_str = f"{total_size_bytes} B"
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if total_size_bytes < 1024:
-                size_str = f"{total_size_bytes:.2f} {unit}"
-                break
-            total_size_bytes /= 1024
-            
+        missing_count = selection.selected_status_counts[SyncStatus.MISSING]
         details = (
             f"BATCH SELECTION\n\n"
             f"ITEMS SELECTED:\n{count}\n\n"
-            f"TOTAL SIZE:\n{size_str}\n\n"
+            f"TOTAL SIZE:\n{self._format_bytes(selection.selected_bytes)}\n\n"
+            f"TO COPY:\n{missing_count} ({self._format_bytes(selection.selected_missing_bytes)})\n\n"
         )
         
         if warning_msg:
@@ -334,9 +369,79 @@ class InspectorPanel(ctk.CTkFrame):
             
         self.info_label.configure(text=details, text_color=text_color)
 
+    @staticmethod
+    def _format_bytes(size_bytes):
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size_bytes < 1024:
+                return f"{size_bytes:.2f} {unit}"
+            size_bytes /= 1024
+        return f"{size_bytes:.2f} PB"
+
     def clear_view(self):
         self.active_file_id = None
+        self._release_thumbnail()
         self._rebuild_label()
         self.lbl_preview.configure(image=None, text="No Selection", text_color=["black", "white"])
         self.current_image = None
-        self.info_label.configure(text="")
\ No newline at end of file
+        self.info_label.configure(text="")
+
+class JobQueuePanel(ctk.CTkFrame):
+    """Compact list of ingest jobs (queued / running / done) under the Inspector."""
+    MAX_ROWS = 6
+    STATE_COLORS = {
+        "queued": "gray",
+        "paused": "#d9a400",
+        "running": "#3b8ed0",
+        "done": "#2fa572",
+        "failed": "#c42b1c",
+        "cancelled": "gray",
+    }
+
+    def __init__(self, master, on_clear=None, on_cancel=None, on_resume=None):
+        super().__init__(master, fg_color="transparent")
+        self.on_cancel = on_cancel
+        self.on_resume = on_resume
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x")
+        self.lbl_title = ctk.CTkLabel(header, text="JOBS", font=("Arial", 12, "bold"), text_color="gray")
+        self.lbl_title.pack(side="left")
+        self.btn_clear = ctk.CTkButton(header, text="Clear", width=50, height=20, fg_color="transparent",
+                                       border_width=1, text_color="gray", command=on_clear)
+        self.btn_clear.pack(side="right")
+        self.rows = []
+
+    def update_jobs(self, jobs, counts):
+        """Rebuilt on change only (a handful of labels; the scheduler coalesces bursts)."""
+        summary = " · ".join(f"{n} {state.value}" for state, n in counts.items() if n)
+        self.lbl_title.configure(text=f"JOBS  {summary}" if summary else "JOBS")
+        for row in self.rows:
+            row.destroy()
+        self.rows = []
+        # Active jobs first, then the most recent finished ones
+        active = [j for j in jobs if j.is_active]
+        finished = [j for j in reversed(jobs) if not j.is_active]
+        for job in (active + finished)[:self.MAX_ROWS]:
+            progress = f" {job.files_done}/{job.files_total}" if job.files_total else ""
+            detail = f"\n{job.message}" if job.message else ""
+            row = ctk.CTkFrame(self, fg_color="transparent")
+            row.pack(fill="x", pady=2)
+            if job.is_active:
+                # Buttons first so the label gets whatever width is left
+                ctk.CTkButton(row, text="Cancel", width=50, height=20, fg_color="transparent", border_width=1,
+                              text_color="gray", command=lambda job_id=job.id: self._cancel(job_id)
+                              ).pack(side="right", padx=(4, 0))
+                if job.state.value == "paused":
+                    ctk.CTkButton(row, text="Resume", width=55, height=20, fg_color="transparent", border_width=1,
+                                  text_color="#d9a400", command=lambda job_id=job.id: self._resume(job_id)
+                                  ).pack(side="right", padx=(4, 0))
+            ctk.CTkLabel(row, text=f"{job.label}\n{job.state.value.upper()}{progress}{detail}",
+                         justify="left", anchor="w", font=("Arial", 11),
+                         text_color=self.STATE_COLORS.get(job.state.value, "gray")).pack(side="left", fill="x", expand=True)
+            self.rows.append(row)
+
+    def _cancel(self, job_id):
+        if self.on_cancel: self.on_cancel(job_id)
+
+    def _resume(self, job_id):
+        if self.on_resume: self.on_resume(job_id)
+
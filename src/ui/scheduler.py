@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Deque, Dict, Hashable, Optional
+
+class Priority(IntEnum):
+    INPUT = 0       # Direct response to a click / keypress (inspector, highlight)
+    VISIBLE = 1     # Something the user can currently see (on-screen rows, thumbnails)
+    NORMAL = 2      # Off-screen row patches, status text
+    BACKGROUND = 3  # Prefetch / housekeeping
+
+class _Task:
+    __slots__ = ("fn", "gen", "key", "priority")
+
+    def __init__(self, fn, gen, key, priority):
+        self.fn = fn
+        self.gen = gen
+        self.key = key
+        self.priority = priority
+
+class FrameScheduler:
+    """
+    THE FRAME PUMP
+    One main-thread loop for all queued UI work. Each frame it runs tasks in
+    priority order until the per-frame time budget (perf_counter) is spent,
+    then hands control back to Tk so it can paint and take input.
+
+    - post() is thread-safe: worker threads use it instead of widget.after(0, ...).
+    - Tasks with the same key coalesce: only the latest status patch for a row runs.
+    - Generator tasks are resumed across frames, in batches sized from their measured cost.
+    - The budget adapts: if Tk falls behind (late frames) we do less per frame,
+      if frames arrive on time we grow back towards MAX_BUDGET_MS.
+    """
+    FRAME_MS = 1000 / 60
+    MIN_BUDGET_MS = 2.0
+    MAX_BUDGET_MS = 12.0
+
+    def __init__(self, root, budget_ms: float = 8.0):
+        self.root = root
+        self.budget_ms = budget_ms
+
+        self._lock = threading.Lock()
+        self._queues: Dict[Priority, Deque[_Task]] = {p: deque() for p in Priority}
+        self._keyed: Dict[Hashable, _Task] = {}
+        self._scheduled = False
+        self._last_frame_end = None
+        self._next_delay_ms = 0
+
+        # Per-generator cost estimate (seconds per next() call), for batch sizing
+        self._unit_cost: Dict[Hashable, float] = {}
+
+        # Stats (for tuning / benchmarks)
+        self.frames = 0
+        self.tasks_run = 0
+        self.late_frames = 0
+        self.last_frame_ms = 0.0
+
+    # --- SUBMISSION ---
+    def post(self, fn: Callable[[], None], priority: Priority = Priority.NORMAL, key: Optional[Hashable] = None):
+        """Queues a one-shot callable. Safe to call from any thread."""
+        self._enqueue(_Task(fn, None, key, priority))
+
+    def post_generator(self, gen, priority: Priority = Priority.NORMAL, key: Optional[Hashable] = None):
+        """Queues a generator; each next() is one unit of work, resumed over as many frames as needed."""
+        self._enqueue(_Task(None, gen, key, priority))
+
+    def cancel(self, key: Hashable):
+        with self._lock:
+            task = self._keyed.pop(key, None)
+            if task: task.fn = task.gen = None  # Tombstone: skipped when popped
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    def _enqueue(self, task: _Task):
+        with self._lock:
+            if task.key is not None:
+                existing = self._keyed.get(task.key)
+                if existing is not None and existing.priority <= task.priority and existing.gen is None and task.gen is None:
+                    # Coalesce: keep the queue position, run the newest callable
+                    existing.fn = task.fn
+                    return
+                if existing is not None:
+                    existing.fn = existing.gen = None
+                self._keyed[task.key] = task
+            self._queues[task.priority].append(task)
+            wake = not self._scheduled
+            self._scheduled = True
+
+        if wake:
+            try:
+                self.root.after(self._next_delay_ms, self._run_frame)
+            except RuntimeError:
+                # Tk refuses calls during interpreter shutdown
+                pass
+
+    # --- THE FRAME ---
+    def _pop(self) -> Optional[_Task]:
+        with self._lock:
+            for p in Priority:
+                q = self._queues[p]
+                while q:
+                    task = q.popleft()
+                    if task.fn is None and task.gen is None: continue  # Cancelled / replaced
+                    if task.key is not None and self._keyed.get(task.key) is task and task.gen is None:
+                        del self._keyed[task.key]
+                    return task
+        return None
+
+    def _requeue_front(self, task: _Task):
+        with self._lock:
+            self._queues[task.priority].appendleft(task)
+
+    def _run_frame(self):
+        start = time.perf_counter()
+        self._adapt_budget(start)
+        deadline = start + self.budget_ms / 1000
+
+        while time.perf_counter() < deadline:
+            task = self._pop()
+            if task is None: break
+            if task.gen is not None:
+                if not self._run_generator(task, deadline):
+                    self._requeue_front(task)
+                    break
+            else:
+                try:
+                    task.fn()
+                except Exception as e:
+                    print(f"UI Task Error: {e}")
+                self.tasks_run += 1
+
+        end = time.perf_counter()
+        self.frames += 1
+        self.last_frame_ms = (end - start) * 1000
+        self._last_frame_end = end
+
+        with self._lock:
+            more = any(self._queues[p] for p in Priority)
+            self._scheduled = more
+        if more:
+            # Leave the rest of the frame to Tk for painting and input
+            self._next_delay_ms = max(1, int(self.FRAME_MS - self.last_frame_ms))
+            self.root.after(self._next_delay_ms, self._run_frame)
+        else:
+            self._next_delay_ms = 0
+
+    def _run_generator(self, task: _Task, deadline: float) -> bool:
+        """Runs a batch of generator units. Returns True when the generator is exhausted."""
+        cost_key = task.key if task.key is not None else id(task.gen)
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0: return False
+
+            # Adaptive batch: as many units as the estimate says fit in the remaining budget
+            # (a single probe unit until we have a measurement)
+            unit = self._unit_cost.get(cost_key)
+            batch = 1 if unit is None else max(1, int(remaining / unit))
+
+            t0 = time.perf_counter()
+            done = 0
+            finished = False
+            try:
+                for _ in range(batch):
+                    next(task.gen)
+                    done += 1
+            except StopIteration:
+                finished = True
+            except Exception as e:
+                print(f"UI Task Error: {e}")
+                finished = True
+
+            if done:
+                measured = (time.perf_counter() - t0) / done
+                self._unit_cost[cost_key] = measured if unit is None else 0.7 * unit + 0.3 * measured
+                self.tasks_run += done
+            if finished:
+                self._finish_generator(task, cost_key)
+                return True
+
+    def _finish_generator(self, task: _Task, cost_key):
+        with self._lock:
+            if task.key is not None and self._keyed.get(task.key) is task:
+                del self._keyed[task.key]
+        self._unit_cost.pop(cost_key, None)
+
+    def _adapt_budget(self, now: float):
+        """AIMD on the work budget, driven by how late this frame started."""
+        if self._last_frame_end is None:
+            return
+        lateness_ms = (now - self._last_frame_end) * 1000 - self._next_delay_ms
+        if self._next_delay_ms and lateness_ms > self.FRAME_MS / 2:
+            # Tk is struggling to paint: back off quickly
+            self.late_frames += 1
+            self.budget_ms = max(self.MIN_BUDGET_MS, self.budget_ms * 0.75)
+        else:
+            self.budget_ms = min(self.MAX_BUDGET_MS, self.budget_ms + 0.5)
@@ -0,0 +1,75 @@
+from typing import Optional, Tuple
+
+class ViewportWindow:
+    """
+    Pure scroll math for the virtual file list (no Tk imports).
+    Answers "which rows are on screen right now?" so the list only ever
+    draws the visible slice plus a small overscan, whatever the file count.
+    """
+
+    def __init__(self, row_height: int = 32, overscan: int = 4):
+        self.row_height = row_height
+        self.overscan = overscan
+        self.count = 0
+        self.height = 0     # Viewport height in px
+        self.top = 0        # Scroll offset in px
+
+    @property
+    def content_height(self) -> int:
+        return self.count * self.row_height
+
+    @property
+    def max_top(self) -> int:
+        return max(0, self.content_height - self.height)
+
+    def set_count(self, count: int):
+        self.count = max(0, count)
+        self.scroll_to(self.top)
+
+    def set_height(self, height: int):
+        self.height = max(0, height)
+        self.scroll_to(self.top)
+
+    def scroll_to(self, top: float):
+        self.top = int(min(max(0, top), self.max_top))
+
+    def scroll_by(self, delta_px: float):
+        self.scroll_to(self.top + delta_px)
+
+    def visible_range(self) -> Tuple[int, int]:
+        """Half-open [first, last) row range to draw, including overscan."""
+        if self.count == 0 or self.height == 0:
+            return 0, 0
+        first = self.top // self.row_height - self.overscan
+        last = (self.top + self.height) // self.row_height + 1 + self.overscan
+        return max(0, first), min(self.count, last)
+
+    def slot_capacity(self) -> int:
+        """How many row slots a full viewport needs (used to size the recycle pool)."""
+        return self.height // self.row_height + 2 + 2 * self.overscan
+
+    def row_top(self, index: int) -> int:
+        """Row position in content coordinates."""
+        return index * self.row_height
+
+    def row_at(self, content_y: float) -> Optional[int]:
+        """Row under a content-space y coordinate, or None for the empty area below the list."""
+        if content_y < 0:
+            return None
+        index = int(content_y // self.row_height)
+        return index if index < self.count else None
+
+    def ensure_visible(self, index: int):
+        """Scrolls the minimum amount needed to bring a row fully on screen."""
+        top = self.row_top(index)
+        if top < self.top:
+            self.scroll_to(top)
+        elif top + self.row_height > self.top + self.height:
+            self.scroll_to(top + self.row_height - self.height)
+
+    def fractions(self) -> Tuple[float, float]:
+        """(first, last) visible fractions, in the format Tk scrollbars expect."""
+        total = self.content_height
+        if total <= 0 or total <= self.height:
+            return 0.0, 1.0
+        return self.top / total, min(1.0, (self.top + self.height) / total)
@@ -1,146 +1,406 @@
+import sys
+import tkinter
+import tkinter.font as tkfont
 import customtkinter as ctk
-from PIL import Image
+from typing import Callable, Dict, List, Optional
 from ..model.file_obj import FileObj, SyncStatus
+from ..model.list_model import FileListModel
 from ..utils.assets import get_asset_path
+from .viewport import ViewportWindow
+from .scheduler import Priority
 
-class FileRow(ctk.CTkFrame):
-    # Singleton Image Cache
-    IMG_CHECK = None
-    IMG_ERROR = None
-    IMG_WAIT = None   # New: Hourglass
-    IMG_VERIFY = None # New: Magnifying Glass
-    IMG_WARN = None   # New: Warning Triangle
+# Status -> (icon key, row background). Same "Traffic Light" palette as before.
+STATUS_STYLE = {
+    SyncStatus.SYNCED: ("check", "#1c3a1c"),         # Green Check
+    SyncStatus.MISSING: ("error", "#3a1c1c"),        # Red X
+    SyncStatus.PENDING: ("hourglass", "#2a2a2a"),
+    SyncStatus.TRANSFERRING: ("hourglass", "#1c2e3a"),
+    SyncStatus.VERIFYING: ("magnify", "#3a2e1c"),
+    SyncStatus.ERROR: ("warning", "#4a1c1c"),        # Warning Triangle
+}
 
-    def __init__(self, master, file_obj: FileObj, on_click=None, on_toggle=None):
-        super().__init__(master)
-        self.file_obj = file_obj
-        self.on_click = on_click
-        self.on_toggle = on_toggle
-        
-        # State Tracking
-        self._last_status = None
-        self._last_filename = None
-        
-        # LOAD ALL ICONS ONCE
-        if FileRow.IMG_CHECK is None:
+HIGHLIGHT_FILL = "#2b4b6b"
+HIGHLIGHT_OUTLINE = "#3b8ed0"
+CHECKBOX_COLOR = "#3b8ed0"
+
+class RowIcons:
+    # Singleton Image Cache (canvas items need plain Tk PhotoImages, not CTkImages)
+    images: Dict[str, "ImageTk.PhotoImage"] = {}
+    _loaded = False
+
+    @classmethod
+    def load(cls):
+        """LOAD ALL ICONS ONCE. Needs a Tk root to exist. Deferred until the first row is drawn."""
+        if cls._loaded: return
+        cls._loaded = True
+        from PIL import Image, ImageTk
+        for key in ("check", "error", "hourglass", "magnify", "warning"):
             try:
-                # Standard Icons
-                FileRow.IMG_CHECK = ctk.CTkImage(Image.open(get_asset_path("check.png")), size=(20, 20))
-                FileRow.IMG_ERROR = ctk.CTkImage(Image.open(get_asset_path("error.png")), size=(20, 20))
-                
-                # New Status Icons (The "Wonky" Fix)
-                FileRow.IMG_WAIT = ctk.CTkImage(Image.open(get_asset_path("hourglass.png")), size=(20, 20))
-                FileRow.IMG_VERIFY = ctk.CTkImage(Image.open(get_asset_path("magnify.png")), size=(20, 20))
-                FileRow.IMG_WARN = ctk.CTkImage(Image.open(get_asset_path("warning.png")), size=(20, 20))
+                img = Image.open(get_asset_path(f"{key}.png")).resize((20, 20), Image.LANCZOS)
+                cls.images[key] = ImageTk.PhotoImage(img)
             except Exception as e:
-                print(f"Warning: Could not load icons: {e}")
+                print(f"Warning: Could not load icon {key}: {e}")
 
-        # Base Styling
-        self.default_color = "transparent"
-        self.configure(corner_radius=6)
+class CanvasRow:
+    """
+    One recycled row slot. Instead of a CTkFrame with 4 child widgets, a row is
+    6 canvas items that get re-pointed at whichever file scrolled into view.
+    """
+    # Column layout (px)
+    CHECK_X = 10
+    CHECK_SIZE = 18
+    ICON_X = 50
+    NAME_X = 70
+    SIZE_PAD = 12
+    SIZE_COLUMN = 90
 
-        # Layout Grid
-        self.grid_columnconfigure(2, weight=1) 
+    def __init__(self, canvas: tkinter.Canvas, font: tkfont.Font, row_height: int, show_checkbox: bool, text_color: str):
+        self.canvas = canvas
+        self.font = font
+        self.row_height = row_height
+        self.show_checkbox = show_checkbox
 
-        # 0. Checkbox
-        self.checkbox = ctk.CTkCheckBox(self, text="", width=24, command=self._handle_toggle)
-        self.checkbox.grid(row=0, column=0, padx=(10, 5), pady=5)
+        self.index: Optional[int] = None
+        self.file_obj: Optional[FileObj] = None
+        self.is_selected = False
+        self.is_checked = False
+        self.default_color = ""  # Empty fill == transparent on a canvas
 
-        # 1. Icon Label
-        self.lbl_icon = ctk.CTkLabel(self, text="", width=30)
-        self.lbl_icon.grid(row=0, column=1, padx=5, pady=5)
+        # State Tracking (Smart Update)
+        self._last_status = None
+        self._last_text = None
+        self._last_width = None
 
-        # 2. Filename
-        self.lbl_name = ctk.CTkLabel(self, text="", anchor="w", font=("Arial", 12, "bold"))
-        self.lbl_name.grid(row=0, column=2, sticky="ew", padx=5)
+        c = canvas
+        self.item_bg = c.create_rectangle(0, 0, 0, 0, width=0, fill="", tags=("row",))
+        self.item_box = c.create_rectangle(0, 0, 0, 0, outline=CHECKBOX_COLOR, width=2, fill="", tags=("row",))
+        self.item_tick = c.create_text(0, 0, text="✓", fill="white", font=("Arial", 11, "bold"), tags=("row",))
+        self.item_icon = c.create_image(0, 0, anchor="center", tags=("row",))
+        self.item_name = c.create_text(0, 0, anchor="w", font=font, fill=text_color, tags=("row", "name"))
+        self.item_size = c.create_text(0, 0, anchor="e", fill="gray", tags=("row",))
+        self.hide()
 
-        # 3. Size
-        self.lbl_size = ctk.CTkLabel(self, text="", width=80, anchor="e", text_color="gray")
-        self.lbl_size.grid(row=0, column=3, padx=10)
+    # --- POSITIONING ---
+    def place(self, y: int, width: int):
+        """Moves the slot to viewport y and lays out for the given width."""
+        c = self.canvas
+        h = self.row_height
+        c.coords(self.item_bg, 2, y + 1, width - 2, y + h - 1)
+        box_top = y + (h - self.CHECK_SIZE) / 2
+        c.coords(self.item_box, self.CHECK_X, box_top, self.CHECK_X + self.CHECK_SIZE, box_top + self.CHECK_SIZE)
+        c.coords(self.item_tick, self.CHECK_X + self.CHECK_SIZE / 2, y + h / 2)
+        c.coords(self.item_icon, self.ICON_X, y + h / 2)
+        c.coords(self.item_name, self.NAME_X, y + h / 2)
+        c.coords(self.item_size, width - self.SIZE_PAD, y + h / 2)
 
-        # Bindings
-        self.bind("<Button-1>", self._handle_click)
-        self.lbl_icon.bind("<Button-1>", self._handle_click)
-        self.lbl_name.bind("<Button-1>", self._handle_click)
-        self.lbl_size.bind("<Button-1>", self._handle_click)
-
-        # Initial Render
-        self.update_data(file_obj, force=True)
-
-    def update_data(self, file_obj: FileObj, force=False):
-        """Smart Update with Full Icon Support"""
-        
-        if not force and self.file_obj == file_obj and self._last_status == file_obj.status:
+        if self._last_width != width:
+            self._last_width = width
+            self._last_text = None  # Re-truncate the name for the new width
+            if self.file_obj: self.update_data(self.file_obj, self._last_status, force=True)
+
+    def show(self):
+        c = self.canvas
+        for item in (self.item_bg, self.item_icon, self.item_name, self.item_size):
+            c.itemconfigure(item, state="normal")
+        c.itemconfigure(self.item_box, state="normal" if self.show_checkbox else "hidden")
+        c.itemconfigure(self.item_tick, state="normal" if (self.show_checkbox and self.is_checked) else "hidden")
+
+    def hide(self):
+        for item in (self.item_bg, self.item_box, self.item_tick, self.item_icon, self.item_name, self.item_size):
+            self.canvas.itemconfigure(item, state="hidden")
+        self.index = None
+
+    # --- DATA ---
+    def update_data(self, file_obj: FileObj, status: Optional[SyncStatus] = None, force=False):
+        """Smart Update: only touches canvas items whose content actually changed"""
+        status = status or file_obj.status
+        if not force and self.file_obj == file_obj and self._last_status == status:
             return
 
         self.file_obj = file_obj
-        
+
         # 1. Text Update
-        if self._last_filename != file_obj.filename:
-            self.lbl_name.configure(text=file_obj.filename)
-            self.lbl_size.configure(text=file_obj.formatted_size)
-            self._last_filename = file_obj.filename
-        
-        # 2. Visual Update (Now using Images for everything)
-        if self._last_status != file_obj.status:
-            
-            # SYNCED (Green Check)
-            if file_obj.status == SyncStatus.SYNCED:
-                img = FileRow.IMG_CHECK
-                self.default_color = "#1c3a1c"
-            
-            # MISSING (Red X)
-            elif file_obj.status == SyncStatus.MISSING:
-                img = FileRow.IMG_ERROR
-                self.default_color = "#3a1c1c"
-            
-            # TRANSFERRING (Hourglass)
-            elif file_obj.status == SyncStatus.TRANSFERRING:
-                img = FileRow.IMG_WAIT
-                self.default_color = "#1c2e3a"
-            
-            # VERIFYING (Magnifying Glass)
-            elif file_obj.status == SyncStatus.VERIFYING:
-                img = FileRow.IMG_VERIFY
-                self.default_color = "#3a2e1c"
-                
-            # ERROR (Warning Triangle)
-            elif file_obj.status == SyncStatus.ERROR:
-                img = FileRow.IMG_WARN
-                self.default_color = "#4a1c1c"
-                
-            else:
-                img = None
-                self.default_color = "transparent"
-            
-            # Apply Image (Fallback to text only if image load failed)
+        text_key = (file_obj.filename, file_obj.size)
+        if force or self._last_text != text_key:
+            max_px = (self._last_width or 0) - self.NAME_X - self.SIZE_COLUMN
+            self.canvas.itemconfigure(self.item_name, text=self._truncate(file_obj.filename, max_px))
+            self.canvas.itemconfigure(self.item_size, text=file_obj.formatted_size)
+            self._last_text = text_key
+
+        # 2. Visual Update
+        if force or self._last_status != status:
+            icon_key, color = STATUS_STYLE.get(status, (None, ""))
+            img = RowIcons.images.get(icon_key)
             if img:
-                self.lbl_icon.configure(image=img, text="")
+                self.canvas.itemconfigure(self.item_icon, image=img)
             else:
                 # Fallback for dev mode without assets
-                self.lbl_icon.configure(image=None, text="?")
-
-            self.configure(fg_color=self.default_color)
-            self._last_status = file_obj.status
-
-    def _handle_click(self, event):
-        if self.on_click:
-            self.on_click(self.file_obj)
+                self.canvas.itemconfigure(self.item_icon, image="")
+            self.default_color = color
+            if not self.is_selected:
+                self.canvas.itemconfigure(self.item_bg, fill=self.default_color)
+            self._last_status = status
 
-    def _handle_toggle(self):
-        if self.on_toggle:
-            self.on_toggle(self.file_obj, self.checkbox.get())
+    def _truncate(self, text: str, max_px: int) -> str:
+        if max_px <= 0 or self.font.measure(text) <= max_px:
+            return text
+        # Binary chop to the longest prefix that fits with an ellipsis
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.font.measure(text[:mid] + "…") <= max_px:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo] + "…"
 
     def set_selected(self, is_selected: bool):
+        self.is_selected = is_selected
         if is_selected:
-            self.configure(fg_color="#2b4b6b", border_width=1, border_color="#3b8ed0")
+            self.canvas.itemconfigure(self.item_bg, fill=HIGHLIGHT_FILL, outline=HIGHLIGHT_OUTLINE, width=1)
         else:
-            self.configure(fg_color=self.default_color, border_width=0)
-    
+            self.canvas.itemconfigure(self.item_bg, fill=self.default_color, width=0)
+
     def set_checked(self, is_checked: bool):
-        # Only update if different to avoid recursion/lag
-        if bool(self.checkbox.get()) != is_checked:
-            if is_checked:
-                self.checkbox.select()
-            else:
-                self.checkbox.deselect()
\ No newline at end of file
+        # Only update if different to avoid lag
+        if self.is_checked == is_checked: return
+        self.is_checked = is_checked
+        self.canvas.itemconfigure(self.item_box, fill=CHECKBOX_COLOR if is_checked else "")
+        if self.show_checkbox and self.index is not None:
+            self.canvas.itemconfigure(self.item_tick, state="normal" if is_checked else "hidden")
+
+class VirtualFileList(ctk.CTkFrame):
+    """
+    THE VIRTUAL LIST
+    A single Canvas that only draws the rows inside the viewport (+ overscan).
+    Row slots are recycled as you scroll, so 100 files and 100,000 files cost
+    the same number of Tk items.
+
+    It is a view over a shared FileListModel: it owns no copy of the file list,
+    and repaints when the model publishes a change.
+    """
+    ROW_HEIGHT = 32
+
+    def __init__(self, master, column=FileListModel.SOURCE, on_click=None, on_toggle=None,
+                 on_background_click=None, is_checked=None, on_viewport_changed=None, overscan=4,
+                 scheduler=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.scheduler = scheduler
+        self.column = column
+        self.on_click = on_click
+        self.on_toggle = on_toggle
+        self.on_background_click = on_background_click
+        # on_viewport_changed(first, last): the drawn row range moved (used for thumbnail prefetch)
+        self.on_viewport_changed = on_viewport_changed
+        self._last_range = (0, 0)
+        # Checkbox state lives in the SelectionModel; the view only asks
+        self.is_checked: Optional[Callable[[str], bool]] = is_checked
+        self.show_checkbox = is_checked is not None
+
+        # --- DATA ---
+        self.window = ViewportWindow(self.ROW_HEIGHT, overscan)
+        self.model: Optional[FileListModel] = None
+
+        # --- RECYCLING POOL ---
+        self.active_slots: Dict[int, CanvasRow] = {}
+        self.free_slots: List[CanvasRow] = []
+        self._width = 0
+        self._drawn_top = 0  # Scroll offset the canvas items currently reflect
+
+        # --- UI LAYOUT ---
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.canvas = tkinter.Canvas(self, highlightthickness=0, bd=0, bg=self._canvas_bg())
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.font = tkfont.Font(family="Arial", size=12, weight="bold")
+        self._prewarm_done = False
+
+        # Bindings
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        if sys.platform.startswith("linux"):
+            self.canvas.bind("<Button-4>", lambda e: self.scroll_by(-3 * self.ROW_HEIGHT))
+            self.canvas.bind("<Button-5>", lambda e: self.scroll_by(3 * self.ROW_HEIGHT))
+        else:
+            # Wheel events go to the focused widget on some platforms, so listen globally
+            self.canvas.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+
+    # --- THEME ---
+    def _canvas_bg(self):
+        return self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["top_fg_color"])
+
+    def _text_color(self):
+        return self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._canvas_bg())
+        self.canvas.itemconfigure("name", fill=self._text_color())
+
+    # --- MODEL BINDING ---
+    def set_model(self, model: FileListModel):
+        if self.model is not None:
+            self.model.unsubscribe(self)
+        self.model = model
+        model.subscribe(self)
+
+    def model_reset(self):
+        """The model swapped its list: O(visible) re-bind, no per-file work."""
+        self.window.set_count(self.model.row_count(self.column))
+        # Release every slot so each visible row is re-bound to its new file
+        for index in list(self.active_slots):
+            self._release(index)
+        self._drawn_top = self.window.top
+        self._sync_slots()
+
+    def model_rows_changed(self, indices):
+        """Repaints rows that are on screen; off-screen rows pick it up when scrolled in."""
+        for index in indices:
+            slot = self.active_slots.get(index)
+            if slot:
+                file_obj = self.model[index]
+                slot.update_data(file_obj, self.model.status_for(file_obj, self.column))
+
+    def model_highlight_changed(self, old_id, new_id):
+        # Optimization: Only touch the 2 slots that need changing
+        old = self._slot_for(old_id)
+        if old: old.set_selected(False)
+        new = self._slot_for(new_id)
+        if new: new.set_selected(True)
+
+    # --- PUBLIC API ---
+    def scroll_to_top(self):
+        self._scroll_to(0)
+
+    def scroll_by(self, delta_px):
+        self._scroll_to(self.window.top + delta_px)
+
+    def is_visible(self, file_id: str) -> bool:
+        return self._slot_for(file_id) is not None
+
+    def refresh_checked(self, file_ids=None):
+        """Re-reads checkbox state for the given ids (or every visible row)."""
+        if not self.show_checkbox: return
+        if file_ids is None:
+            slots = self.active_slots.values()
+        else:
+            slots = [slot for slot in (self._slot_for(i) for i in file_ids) if slot]
+        for slot in slots:
+            slot.set_checked(self.is_checked(slot.file_obj.id))
+
+    # --- RECYCLING ---
+    def _slot_for(self, file_id) -> Optional[CanvasRow]:
+        if file_id is None or self.model is None: return None
+        index = self.model.index_of(file_id)
+        return self.active_slots.get(index) if index is not None else None
+
+    def _new_slot(self) -> CanvasRow:
+        RowIcons.load()
+        return CanvasRow(self.canvas, self.font, self.ROW_HEIGHT, self.show_checkbox, self._text_color())
+
+    def _acquire(self, index: int) -> CanvasRow:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = self._new_slot()
+        file_obj = self.model[index]
+        slot.index = index
+        slot.place(self.window.row_top(index) - self._drawn_top, self._width)
+        slot.update_data(file_obj, self.model.status_for(file_obj, self.column))
+        slot.set_checked(self.show_checkbox and self.is_checked(file_obj.id))
+        slot.set_selected(file_obj.id == self.model.highlight_id)
+        slot.show()
+        self.active_slots[index] = slot
+        return slot
+
+    def _release(self, index: int):
+        slot = self.active_slots.pop(index)
+        slot.hide()
+        self.free_slots.append(slot)
+
+    def _sync_slots(self):
+        """Recycles slots that left the viewport into rows that entered it."""
+        first, last = self.window.visible_range()
+        for index in [i for i in self.active_slots if i < first or i >= last]:
+            self._release(index)
+        for index in range(first, last):
+            if index not in self.active_slots:
+                self._acquire(index)
+        self.scrollbar.set(*self.window.fractions())
+
+        if self.on_viewport_changed and (first, last) != self._last_range:
+            self._last_range = (first, last)
+            self.on_viewport_changed(first, last)
+
+    def _prewarm(self):
+        """
+        Idle-time pool fill: builds the slots one viewport needs, one per unit of
+        scheduler work, so the first scan binds rows instead of creating them.
+        Sized from the real viewport height (not a fixed count) and never runs before the first <Configure>.
+        """
+        while len(self.active_slots) + len(self.free_slots) < self.window.slot_capacity():
+            self.free_slots.append(self._new_slot())
+            yield
+
+    def _scroll_to(self, top):
+        self.window.scroll_to(top)
+        if self.scheduler:
+            # A burst of wheel events collapses into one redraw per frame
+            self.scheduler.post(self._apply_scroll, Priority.INPUT, key=(id(self), "scroll"))
+        else:
+            self._apply_scroll()
+
+    def _apply_scroll(self):
+        dy = self.window.top - self._drawn_top
+        if dy == 0: return
+        self._drawn_top = self.window.top
+        # One canvas call shifts every visible slot; only rows crossing the edge are re-bound
+        self.canvas.move("row", 0, -dy)
+        self._sync_slots()
+
+    # --- EVENTS ---
+    def _on_configure(self, event):
+        self._width = event.width
+        self.window.set_height(event.height)
+        if not self._prewarm_done and event.height > 1 and self.scheduler:
+            self._prewarm_done = True
+            self.scheduler.post_generator(self._prewarm(), Priority.BACKGROUND, key=(id(self), "prewarm"))
+        self._drawn_top = self.window.top
+        for index, slot in self.active_slots.items():
+            slot.place(self.window.row_top(index) - self._drawn_top, self._width)
+        if self.model is not None:
+            self._sync_slots()
+
+    def _on_scrollbar(self, *args):
+        if not args: return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * self.window.content_height)
+        elif args[0] == "scroll":
+            step = self.ROW_HEIGHT if args[2] == "units" else max(self.ROW_HEIGHT, self.window.height - self.ROW_HEIGHT)
+            self.scroll_by(int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        if self.canvas.winfo_containing(event.x_root, event.y_root) is not self.canvas: return
+        if sys.platform == "darwin":
+            self.scroll_by(-event.delta * 4)
+        else:
+            self.scroll_by(-event.delta / 120 * 3 * self.ROW_HEIGHT)
+
+    def _on_canvas_click(self, event):
+        index = self.window.row_at(self._drawn_top + event.y)
+        if index is None or self.model is None:
+            if self.on_background_click: self.on_background_click()
+            return
+
+        file_obj = self.model[index]
+        if self.show_checkbox and event.x < CanvasRow.ICON_X - 14:
+            if self.on_toggle:
+                self.on_toggle(file_obj, not self.is_checked(file_obj.id))
+            self.refresh_checked([file_obj.id])
+        elif self.on_click:
+            self.on_click(file_obj)
@@ -12,4 +12,32 @@ def get_asset_path(filename: str) -> str:
 def get_ffmpeg_path() -> str:
     """Returns path to the ffmpeg executable."""
     filename = "ffmpeg.exe" if os.name == 'nt' else "ffmpeg"
-    return get_asset_path(filename)
\ No newline at end of file
+    return get_asset_path(filename)
+
+def get_cache_dir(*parts: str) -> str:
+    """Returns (and creates) a per-user cache folder that survives restarts."""
+    if os.name == 'nt':
+        base_path = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        root = os.path.join(base_path, "LastLook", "Cache")
+    elif sys.platform == "darwin":
+        root = os.path.expanduser("~/Library/Caches/LastLook")
+    else:
+        base_path = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        root = os.path.join(base_path, "lastlook")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def get_data_dir(*parts: str) -> str:
+    """Returns (and creates) a per-user folder for state that must NOT be purged like a cache (job queue)."""
+    if os.name == 'nt':
+        base_path = os.environ.get("APPDATA") or os.path.expanduser("~")
+        root = os.path.join(base_path, "LastLook")
+    elif sys.platform == "darwin":
+        root = os.path.expanduser("~/Library/Application Support/LastLook")
+    else:
+        base_path = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        root = os.path.join(base_path, "lastlook")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path